@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ListingView
+from .models import ListingView, ListingViewDaily
 
 
 @admin.register(ListingView)
@@ -13,4 +13,15 @@ class ListingViewAdmin(admin.ModelAdmin):
         return False
 
     def has_change_permission(self, request, obj=None):
-        return False
\ No newline at end of file
+        return False
+
+
+@admin.register(ListingViewDaily)
+class ListingViewDailyAdmin(admin.ModelAdmin):
+    list_display = ['listing', 'date', 'views_count', 'unique_viewers']
+    list_filter = ['date']
+    search_fields = ['listing__title']
+    readonly_fields = ['listing', 'date', 'views_count', 'unique_viewers', 'last_view_id']
+
+    def has_add_permission(self, request):
+        return False
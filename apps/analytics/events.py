@@ -0,0 +1,389 @@
+"""
+✅ Буферизований запис аналітики (SearchHistory / ListingView)
+
+Read-ендпоінти не пишуть в основну БД:
+- record_search() / record_listing_view() кладуть подію в локальну чергу
+  (SQLite-спул на диску, переживає перезапуск процесу, або пам'ять)
+- фоновий потік (або команда flush_analytics) забирає пачки подій
+  і вставляє їх через bulk_create за порогом розміру або часу
+- дедуплікація переглядів (1 перегляд за 24 години) виконується при flush
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from collections import deque
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.common.cache import TAG_SEARCH_QUERIES, invalidate_tags
+
+logger = logging.getLogger(__name__)
+
+EVENT_SEARCH = 'search'
+EVENT_LISTING_VIEW = 'listing_view'
+
+# Один перегляд оголошення на користувача (або IP гостя) за цей період
+VIEW_DEDUP_WINDOW = timedelta(hours=24)
+
+DEFAULT_BUFFER_SETTINGS = {
+    'SPOOL_PATH': None,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 5,
+    'BACKGROUND_FLUSH': True,
+}
+
+
+class MemorySpool:
+    """Черга подій у пам'яті процесу (без збереження між перезапусками)"""
+
+    def __init__(self):
+        self._events = deque()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def push(self, kind, payload):
+        with self._lock:
+            self._events.append((self._next_id, kind, payload))
+            self._next_id += 1
+
+    def size(self):
+        return len(self._events)
+
+    def consume(self, limit, handler):
+        """Передати до limit подій у handler; якщо він впав - повернути їх у чергу"""
+        with self._lock:
+            batch = [self._events.popleft() for _ in range(min(limit, len(self._events)))]
+        if not batch:
+            return 0
+
+        try:
+            handler(batch)
+        except Exception:
+            with self._lock:
+                self._events.extendleft(reversed(batch))
+            raise
+        return len(batch)
+
+
+class SQLiteSpool:
+    """
+    Черга подій у локальному SQLite-файлі
+
+    Кілька процесів можуть писати в один файл; flush забирає і видаляє пачку
+    в короткій транзакції BEGIN IMMEDIATE, тому одна подія не вставиться двічі.
+    Запис в основну БД іде вже поза транзакцією спулу - push() із запитів
+    не чекає на bulk_create. Якщо запис впав, пачка повертається в спул
+    з тими самими id (порядок зберігається).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            # WAL: читання (size) не блокуються записом
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS events ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'kind TEXT NOT NULL, '
+                'payload TEXT NOT NULL)'
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def push(self, kind, payload):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO events (kind, payload) VALUES (?, ?)',
+                (kind, json.dumps(payload)),
+            )
+
+    def size(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+
+    def _claim(self, limit):
+        """Забрати і видалити до limit подій (блокування спулу - тільки на цей час)"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute(
+                'SELECT id, kind, payload FROM events ORDER BY id LIMIT ?', (limit,)
+            ).fetchall()
+            if rows:
+                conn.execute('DELETE FROM events WHERE id <= ?', (rows[-1][0],))
+            conn.execute('COMMIT')
+            return rows
+        finally:
+            conn.close()
+
+    def _restore(self, rows):
+        """Повернути пачку в спул після невдалого запису"""
+        conn = self._connect()
+        try:
+            conn.executemany(
+                'INSERT OR IGNORE INTO events (id, kind, payload) VALUES (?, ?, ?)', rows
+            )
+        finally:
+            conn.close()
+
+    def consume(self, limit, handler):
+        """Передати до limit подій у handler; якщо він впав - повернути їх у спул"""
+        rows = self._claim(limit)
+        if not rows:
+            return 0
+
+        try:
+            handler([(event_id, kind, json.loads(payload)) for event_id, kind, payload in rows])
+        except Exception:
+            self._restore(rows)
+            raise
+        return len(rows)
+
+
+class AnalyticsEventBuffer:
+    """
+    Буфер аналітичних подій з пакетним flush
+
+    Налаштування: settings.ANALYTICS_BUFFER
+    - SPOOL_PATH: шлях до SQLite-спулу (None = черга в пам'яті)
+    - BATCH_SIZE: поріг кількості подій для flush
+    - FLUSH_INTERVAL: поріг часу (секунди) для фонового flush
+    - BACKGROUND_FLUSH: flush у фоновому потоці (False = при досягненні порогу в запиті)
+    """
+
+    def __init__(self, options=None):
+        self.options = {**DEFAULT_BUFFER_SETTINGS, **(options or {})}
+        spool_path = self.options['SPOOL_PATH']
+        self.spool = SQLiteSpool(spool_path) if spool_path else MemorySpool()
+        self._pending = 0
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(getattr(settings, 'ANALYTICS_BUFFER', None))
+
+    # ============================================
+    # ЗАПИС ПОДІЙ
+    # ============================================
+
+    def record(self, kind, payload):
+        """Поставити подію в чергу (без запитів до основної БД)"""
+        try:
+            self.spool.push(kind, payload)
+        except Exception:
+            # Аналітика не повинна ламати read-ендпоінти
+            logger.exception('Failed to spool analytics event %s', kind)
+            return
+
+        self._pending += 1
+
+        if self.options['BACKGROUND_FLUSH']:
+            self._ensure_thread()
+            if self._pending >= self.options['BATCH_SIZE']:
+                self._wakeup.set()
+        elif self._pending >= self.options['BATCH_SIZE']:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Analytics flush failed, events stay in spool')
+
+    # ============================================
+    # FLUSH
+    # ============================================
+
+    def flush(self):
+        """
+        Вставити всі накопичені події пачками по BATCH_SIZE
+
+        Returns:
+            int: Кількість оброблених подій
+        """
+        self._pending = 0
+        total = 0
+        while True:
+            consumed = self.spool.consume(self.options['BATCH_SIZE'], write_events)
+            total += consumed
+            if consumed < self.options['BATCH_SIZE']:
+                return total
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='analytics-flush',
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _run(self):
+        from django.db import connection
+
+        while True:
+            self._wakeup.wait(self.options['FLUSH_INTERVAL'])
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Analytics flush failed, events stay in spool')
+            finally:
+                connection.close()
+
+
+def write_events(events):
+    """
+    Записати пачку подій у БД (по одному bulk_create на тип)
+
+    Args:
+        events: Список (id, kind, payload)
+    """
+    searches = [payload for _, kind, payload in events if kind == EVENT_SEARCH]
+    views = [payload for _, kind, payload in events if kind == EVENT_LISTING_VIEW]
+
+    with transaction.atomic():
+        if searches:
+            _write_searches(searches)
+        if views:
+            _write_listing_views(views)
+
+
+def _existing_ids(model, ids):
+    """ID, які ще існують (подія могла пережити видалення об'єкта)"""
+    ids = {pk for pk in ids if pk is not None}
+    if not ids:
+        return set()
+    return set(model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+
+
+def _write_searches(payloads):
+    from django.contrib.auth import get_user_model
+    from apps.search.models import SearchHistory
+
+    users = _existing_ids(get_user_model(), (p['user_id'] for p in payloads))
+
+    SearchHistory.objects.bulk_create([
+        SearchHistory(
+            user_id=p['user_id'] if p['user_id'] in users else None,
+            query=p['query'],
+            filters=p['filters'],
+            results_count=p['results_count'],
+        )
+        for p in payloads
+    ])
+
+    # Популярні запити змінилися
+    invalidate_tags(TAG_SEARCH_QUERIES)
+
+
+def _view_key(payload):
+    """Ключ дедуплікації: користувач, а для гостей - IP"""
+    if payload['user_id'] is not None:
+        return payload['listing_id'], 'user', payload['user_id']
+    return payload['listing_id'], 'ip', payload['ip']
+
+
+def _write_listing_views(payloads):
+    from django.contrib.auth import get_user_model
+    from apps.analytics.models import ListingView
+    from apps.listings.models import Listing
+
+    listings = _existing_ids(Listing, (p['listing_id'] for p in payloads))
+    users = _existing_ids(get_user_model(), (p['user_id'] for p in payloads))
+
+    payloads = [p for p in payloads if p['listing_id'] in listings]
+    if not payloads:
+        return
+
+    for p in payloads:
+        p['viewed_at'] = parse_datetime(p['viewed_at'])
+        if p['user_id'] not in users:
+            p['user_id'] = None
+
+    # Останній перегляд для кожного ключа - одним запитом
+    since = min(p['viewed_at'] for p in payloads) - VIEW_DEDUP_WINDOW
+    last_seen = {}
+    recent = ListingView.objects.filter(
+        listing_id__in={p['listing_id'] for p in payloads},
+        created_at__gte=since,
+    ).values('listing_id', 'user_id', 'ip', 'created_at')
+    for row in recent:
+        key = _view_key(row)
+        last_seen[key] = max(last_seen.get(key, row['created_at']), row['created_at'])
+
+    new_views = []
+    for p in sorted(payloads, key=lambda item: item['viewed_at']):
+        # Гість без IP - дедуплікувати нема за чим
+        if p['user_id'] is not None or p['ip']:
+            key = _view_key(p)
+            previous = last_seen.get(key)
+            if previous is not None and p['viewed_at'] - previous < VIEW_DEDUP_WINDOW:
+                continue
+            last_seen[key] = p['viewed_at']
+
+        new_views.append(ListingView(
+            listing_id=p['listing_id'],
+            user_id=p['user_id'],
+            ip=p['ip'],
+            user_agent=p['user_agent'],
+            created_at=p['viewed_at'],
+        ))
+
+    ListingView.bulk_create_viewed(new_views)
+
+
+# ============================================
+# ПУБЛІЧНИЙ API
+# ============================================
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """Буфер процесу (створюється при першому використанні)"""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = AnalyticsEventBuffer.from_settings()
+    return _buffer
+
+
+def record_search(user, query, filters, results_count):
+    """Поставити в чергу запис SearchHistory"""
+    get_buffer().record(EVENT_SEARCH, {
+        'user_id': user.pk if user is not None else None,
+        'query': query,
+        'filters': filters,
+        'results_count': results_count,
+    })
+
+
+def record_listing_view(listing_id, user, ip, user_agent):
+    """Поставити в чергу перегляд оголошення (дедуплікація при flush)"""
+    get_buffer().record(EVENT_LISTING_VIEW, {
+        'listing_id': listing_id,
+        'user_id': user.pk if user is not None else None,
+        'ip': ip,
+        'user_agent': user_agent,
+        'viewed_at': timezone.now().isoformat(),
+    })
+
+
+def flush_events():
+    """Негайно записати всі події з черги"""
+    return get_buffer().flush()
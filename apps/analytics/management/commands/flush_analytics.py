@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics.events import AnalyticsEventBuffer
+
+
+class Command(BaseCommand):
+    help = 'Записує накопичені події аналітики (SearchHistory, ListingView) зі спулу в БД'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Працювати як воркер: flush кожні FLUSH_INTERVAL секунд'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=None,
+            help='Інтервал між flush у режимі --loop (секунди)'
+        )
+
+    def handle(self, *args, **options):
+        # Окремий буфер без фонового потоку - flush виконує сама команда
+        buffer = AnalyticsEventBuffer.from_settings()
+        buffer.options['BACKGROUND_FLUSH'] = False
+        interval = options['interval'] or buffer.options['FLUSH_INTERVAL']
+
+        if not options['loop']:
+            flushed = buffer.flush()
+            self.stdout.write(self.style.SUCCESS(f'✅ Записано подій: {flushed}'))
+            return
+
+        self.stdout.write(self.style.WARNING(f'Flush аналітики кожні {interval} с (Ctrl+C - вихід)'))
+        try:
+            while True:
+                flushed = buffer.flush()
+                if flushed:
+                    self.stdout.write(f'✅ Записано подій: {flushed}')
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Воркер зупинено'))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics.models import ListingViewDaily
+
+
+class Command(BaseCommand):
+    help = 'Інкрементально оновлює денні агрегати переглядів (ListingViewDaily, ListingViewer)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Кількість сирих переглядів за одну пачку'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Працювати періодично (кожні --interval секунд)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=300,
+            help='Інтервал між rollup у режимі --loop (секунди)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = ListingViewDaily.rollup(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'✅ Враховано переглядів: {processed}'))
+
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_initial'),
+        ('listings', '0005_listingavailability'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingViewDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('date', models.DateField()),
+                ('views_count', models.PositiveIntegerField(default=0)),
+                ('unique_viewers', models.PositiveIntegerField(default=0)),
+                ('last_view_id', models.BigIntegerField(default=0, help_text='Найбільший ListingView.id, врахований rollup')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ListingViewer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('viewer_key', models.CharField(max_length=64)),
+                ('first_seen', models.DateField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='listingview',
+            index=models.Index(fields=['listing', 'created_at'], name='analytics_l_listing_20a509_idx'),
+        ),
+        migrations.AddField(
+            model_name='listingviewdaily',
+            name='listing',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='listings.listing'),
+        ),
+        migrations.AddField(
+            model_name='listingviewer',
+            name='listing',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='viewers', to='listings.listing'),
+        ),
+        migrations.AddIndex(
+            model_name='listingviewdaily',
+            index=models.Index(fields=['date'], name='analytics_l_date_e98ef3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listingviewdaily',
+            index=models.Index(fields=['last_view_id'], name='analytics_l_last_vi_9aa9f8_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='listingviewdaily',
+            constraint=models.UniqueConstraint(fields=('listing', 'date'), name='unique_listing_view_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='listingviewer',
+            constraint=models.UniqueConstraint(fields=('listing', 'viewer_key'), name='unique_listing_viewer'),
+        ),
+    ]
@@ -1,4 +1,13 @@
-from django.db import models
+from datetime import datetime, time, timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Case, CharField, Count, Max, Q, Value, When
+from django.db.models.functions import Cast, Concat, TruncDate
+from django.utils import timezone
+from apps.common.constants import ANALYTICS_ROLLUP_RESCAN_IDS
 from apps.common.models import TimeModel
 from django.contrib.auth import get_user_model
 
@@ -15,4 +24,221 @@ class ListingView(TimeModel):
         indexes = [
             models.Index(fields=['listing']),
             models.Index(fields=['user']),
-        ]
\ No newline at end of file
+            models.Index(fields=['listing', 'created_at']),
+        ]
+
+    @classmethod
+    def bulk_create_viewed(cls, views):
+        """
+        ✅ bulk_create зі збереженням часу перегляду
+
+        auto_now_add підставляє в created_at час вставки (flush буфера),
+        тому реальний час переглядів відновлюється одним UPDATE ... CASE.
+        """
+        viewed_at = [view.created_at for view in views]
+        cls.objects.bulk_create(views)
+
+        whens = [
+            When(pk=view.pk, then=Value(created_at))
+            for view, created_at in zip(views, viewed_at)
+            if view.pk is not None and created_at is not None
+        ]
+        if whens:
+            cls.objects.filter(pk__in=[view.pk for view in views]).update(
+                created_at=Case(*whens, output_field=models.DateTimeField())
+            )
+        for view, created_at in zip(views, viewed_at):
+            if created_at is not None:
+                view.created_at = created_at
+
+    @staticmethod
+    def viewer_key(user_id, ip) -> str:
+        """Унікальний глядач: користувач, а для гостей - IP"""
+        if user_id is not None:
+            return f'u:{user_id}'
+        if ip:
+            return f'ip:{ip}'
+        return 'anon'
+
+    @staticmethod
+    def viewer_key_expression():
+        """viewer_key(), обчислений на стороні БД"""
+        return Case(
+            When(user__isnull=False, then=Concat(Value('u:'), Cast('user_id', CharField()))),
+            When(ip__gt='', then=Concat(Value('ip:'), 'ip')),
+            default=Value('anon'),
+            output_field=CharField(),
+        )
+
+
+class ListingViewDaily(TimeModel):
+    """
+    ✅ Денний агрегат переглядів оголошення (rollup)
+
+    Оновлюється інкрементально командою rollup_listing_views:
+    перераховуються тільки дні, в яких з'явилися нові перегляди
+    (ListingView.id > максимального last_view_id). Вікно id нижче watermark
+    перечитується на початку rollup - перегляди, закомічені із запізненням.
+    """
+
+    listing = models.ForeignKey(
+        'listings.Listing',
+        on_delete=models.CASCADE,
+        related_name='daily_views'
+    )
+    date = models.DateField()
+    views_count = models.PositiveIntegerField(default=0)
+    unique_viewers = models.PositiveIntegerField(default=0)
+    last_view_id = models.BigIntegerField(
+        default=0,
+        help_text='Найбільший ListingView.id, врахований rollup'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['listing', 'date'], name='unique_listing_view_day'),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+            models.Index(fields=['last_view_id']),
+        ]
+
+    def __str__(self):
+        return f'{self.listing_id} {self.date}: {self.views_count}'
+
+    @classmethod
+    def watermark(cls) -> int:
+        """ID останнього переглянутого ListingView, вже врахованого в rollup"""
+        return cls.objects.aggregate(last=Max('last_view_id'))['last'] or 0
+
+    @classmethod
+    def rollup(cls, batch_size=10000, rescan_ids=ANALYTICS_ROLLUP_RESCAN_IDS) -> int:
+        """
+        Врахувати нові перегляди пачками по batch_size
+
+        Args:
+            rescan_ids: Скільки id нижче watermark перечитати (перерахунок днів
+                точний, тому повторна обробка вже врахованих переглядів безпечна)
+
+        Returns:
+            int: Кількість оброблених нових сирих переглядів
+        """
+        watermark = cls.watermark()
+        if watermark and rescan_ids:
+            rows = list(cls._view_rows(
+                id__gt=max(watermark - rescan_ids, 0), id__lte=watermark
+            ))
+            cls._rollup_rows(rows, watermark)
+
+        processed = 0
+        while True:
+            count = cls._rollup_batch(batch_size)
+            processed += count
+            if count < batch_size:
+                return processed
+
+    @staticmethod
+    def _view_rows(**filters):
+        return (
+            ListingView.objects
+            .filter(**filters)
+            .order_by('id')
+            .values('id', 'listing_id', 'user_id', 'ip', 'created_at')
+        )
+
+    @staticmethod
+    def _day_bounds(day):
+        """[початок дня, початок наступного) у поточному часовому поясі"""
+        start = datetime.combine(day, time.min)
+        end = start + timedelta(days=1)
+        if not settings.USE_TZ:
+            return start, end
+        return timezone.make_aware(start), timezone.make_aware(end)
+
+    @classmethod
+    def _rollup_batch(cls, batch_size) -> int:
+        rows = list(cls._view_rows(id__gt=cls.watermark())[:batch_size])
+        if rows:
+            cls._rollup_rows(rows, rows[-1]['id'])
+        return len(rows)
+
+    @classmethod
+    def _rollup_rows(cls, rows, last_id):
+        """Перерахувати дні оголошень, зачеплені rows, і записати глядачів"""
+        if not rows:
+            return
+
+        listing_ids = {row['listing_id'] for row in rows}
+        days = {timezone.localdate(row['created_at']) for row in rows}
+
+        # Точний перерахунок зачеплених днів з сирих даних: діапазони created_at
+        # по днях, щоб працював індекс (listing, created_at)
+        day_ranges = []
+        for day in days:
+            start, end = cls._day_bounds(day)
+            day_ranges.append(Q(created_at__gte=start, created_at__lt=end))
+
+        daily = (
+            ListingView.objects
+            .filter(reduce(or_, day_ranges), listing_id__in=listing_ids)
+            .annotate(day=TruncDate('created_at'))
+            .values('listing_id', 'day')
+            .annotate(
+                views=Count('id'),
+                viewers=Count(ListingView.viewer_key_expression(), distinct=True),
+            )
+        )
+
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        listing_id=item['listing_id'],
+                        date=item['day'],
+                        views_count=item['views'],
+                        unique_viewers=item['viewers'],
+                        last_view_id=last_id,
+                    )
+                    for item in daily
+                ],
+                update_conflicts=True,
+                unique_fields=['listing', 'date'],
+                update_fields=['views_count', 'unique_viewers', 'last_view_id', 'updated_at'],
+            )
+
+            ListingViewer.objects.bulk_create(
+                [
+                    ListingViewer(
+                        listing_id=row['listing_id'],
+                        viewer_key=ListingView.viewer_key(row['user_id'], row['ip']),
+                        first_seen=timezone.localdate(row['created_at']),
+                    )
+                    for row in rows
+                ],
+                ignore_conflicts=True,
+            )
+
+
+class ListingViewer(TimeModel):
+    """
+    ✅ Реєстр унікальних глядачів оголошення (точний distinct за весь час)
+
+    Один рядок на пару (оголошення, глядач) - кількість унікальних глядачів
+    рахується по цій таблиці замість DISTINCT по всіх сирих переглядах.
+    """
+
+    listing = models.ForeignKey(
+        'listings.Listing',
+        on_delete=models.CASCADE,
+        related_name='viewers'
+    )
+    viewer_key = models.CharField(max_length=64)
+    first_seen = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['listing', 'viewer_key'], name='unique_listing_viewer'),
+        ]
+
+    def __str__(self):
+        return f'{self.listing_id}: {self.viewer_key}'
@@ -1,3 +1,265 @@
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.analytics.events import (
+    EVENT_LISTING_VIEW,
+    EVENT_SEARCH,
+    AnalyticsEventBuffer,
+    SQLiteSpool,
+)
+from apps.analytics.models import ListingView, ListingViewDaily, ListingViewer
+from apps.common.enums import CancellationPolicy, PropertyType
+from apps.common.models import Location
+from apps.listings.models import Listing
+from apps.search.models import SearchHistory
+
+
+class AnalyticsFixtureMixin:
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(
+            email='analytics-owner@example.com',
+            username='analytics-owner',
+            password='password123',
+        )
+        self.viewer = User.objects.create_user(
+            email='analytics-viewer@example.com',
+            username='analytics-viewer',
+            password='password123',
+        )
+        location = Location.objects.create(
+            country='Україна',
+            city='Полтава',
+            address='вул. Аналітична 1',
+        )
+        self.listing = Listing.objects.create(
+            owner=self.owner,
+            title='Квартира для аналітики',
+            description='Дуже довгий опис квартири, що перевищує мінімальну довжину.',
+            location=location,
+            property_type=PropertyType.APARTMENT,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('100.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+
+
+class AnalyticsEventBufferTests(AnalyticsFixtureMixin, TestCase):
+    def _buffer(self, **options):
+        return AnalyticsEventBuffer({'BATCH_SIZE': 50, 'BACKGROUND_FLUSH': False, **options})
+
+    def _view(self, user_id=None, ip='10.0.0.1', listing_id=None):
+        return {
+            'listing_id': listing_id or self.listing.pk,
+            'user_id': user_id,
+            'ip': ip,
+            'user_agent': 'tests',
+            'viewed_at': timezone.now().isoformat(),
+        }
+
+    def test_events_are_written_in_batches_on_flush(self):
+        buffer = self._buffer()
+        for index in range(3):
+            buffer.record(EVENT_SEARCH, {
+                'user_id': self.viewer.pk,
+                'query': f'query {index}',
+                'filters': {},
+                'results_count': index,
+            })
+
+        self.assertEqual(SearchHistory.objects.count(), 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(buffer.flush(), 3)
+
+        inserts = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+
+        self.assertEqual(SearchHistory.objects.filter(user=self.viewer).count(), 3)
+
+    def test_size_threshold_triggers_flush(self):
+        buffer = self._buffer(BATCH_SIZE=2)
+        search = {'user_id': None, 'query': 'loft', 'filters': {}, 'results_count': 0}
+
+        buffer.record(EVENT_SEARCH, search)
+        self.assertEqual(SearchHistory.objects.count(), 0)
+        buffer.record(EVENT_SEARCH, search)
+        self.assertEqual(SearchHistory.objects.count(), 2)
+
+    def test_views_are_deduplicated_per_user_and_guest_ip(self):
+        buffer = self._buffer()
+        buffer.record(EVENT_LISTING_VIEW, self._view(user_id=self.viewer.pk))
+        buffer.record(EVENT_LISTING_VIEW, self._view(user_id=self.viewer.pk, ip='10.0.0.2'))
+        buffer.record(EVENT_LISTING_VIEW, self._view())
+        buffer.record(EVENT_LISTING_VIEW, self._view())
+        buffer.record(EVENT_LISTING_VIEW, self._view(ip='10.0.0.3'))
+        buffer.flush()
+
+        self.assertEqual(ListingView.objects.filter(user=self.viewer).count(), 1)
+        self.assertEqual(ListingView.objects.filter(user__isnull=True).count(), 2)
+
+        # Повторний перегляд того ж користувача вже є в БД
+        buffer.record(EVENT_LISTING_VIEW, self._view(user_id=self.viewer.pk))
+        buffer.flush()
+        self.assertEqual(ListingView.objects.filter(user=self.viewer).count(), 1)
+
+    def test_events_for_deleted_listing_are_dropped(self):
+        buffer = self._buffer()
+        buffer.record(EVENT_LISTING_VIEW, self._view(listing_id=self.listing.pk + 1000))
+
+        self.assertEqual(buffer.flush(), 1)
+        self.assertFalse(ListingView.objects.exists())
+
+    def test_sqlite_spool_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            spool_path = Path(tmp) / 'spool.sqlite3'
+
+            self._buffer(SPOOL_PATH=spool_path).record(EVENT_LISTING_VIEW, self._view())
+
+            restarted = self._buffer(SPOOL_PATH=spool_path)
+            self.assertEqual(restarted.spool.size(), 1)
+            self.assertEqual(restarted.flush(), 1)
+            self.assertEqual(restarted.spool.size(), 0)
+
+        self.assertEqual(ListingView.objects.count(), 1)
+
+    def test_sqlite_spool_is_not_locked_while_writing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            spool = SQLiteSpool(Path(tmp) / 'spool.sqlite3')
+            spool.push(EVENT_SEARCH, {'query': 'first'})
+            spool.push(EVENT_SEARCH, {'query': 'second'})
+
+            def failing_handler(events):
+                # Запит у цей момент кладе подію без очікування блокування
+                spool.push(EVENT_SEARCH, {'query': 'during flush'})
+                raise RuntimeError('main database is down')
+
+            with self.assertRaises(RuntimeError):
+                spool.consume(10, failing_handler)
+
+            consumed = []
+            spool.consume(10, consumed.extend)
+            self.assertEqual(
+                [payload['query'] for _, _, payload in consumed],
+                ['first', 'second', 'during flush'],
+            )
+
+    def test_view_keeps_original_time(self):
+        viewed_at = timezone.now() - timedelta(hours=3)
+        buffer = self._buffer()
+        buffer.record(EVENT_LISTING_VIEW, {**self._view(), 'viewed_at': viewed_at.isoformat()})
+        buffer.flush()
+
+        self.assertEqual(ListingView.objects.get().created_at, viewed_at)
+
+
+class AnalyticsEndpointTests(AnalyticsFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def test_search_records_single_history_entry(self):
+        response = self.client.get('/api/search/', {'query': 'Квартира'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(SearchHistory.objects.count(), 1)
+
+    def test_retrieve_records_one_view_per_day(self):
+        self.client.force_authenticate(self.viewer)
+
+        for _ in range(2):
+            response = self.client.get(f'/api/listings/{self.listing.pk}/')
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(ListingView.objects.filter(listing=self.listing).count(), 1)
+
+
+class ListingViewRollupTests(AnalyticsFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def _views(self, *viewers, days_ago=0):
+        for user, ip in viewers:
+            view = ListingView.objects.create(listing=self.listing, user=user, ip=ip)
+            if days_ago:
+                ListingView.objects.filter(pk=view.pk).update(
+                    created_at=view.created_at - timedelta(days=days_ago)
+                )
+
+    def _rollup(self):
+        call_command('rollup_listing_views', batch_size=2, stdout=StringIO())
+
+    def test_rollup_is_incremental_and_exact(self):
+        self._views((self.viewer, None), (None, '10.0.0.1'), (None, '10.0.0.1'), days_ago=1)
+        self._views((self.viewer, None))
+        self._rollup()
+
+        today = timezone.localdate()
+        daily = {row.date: row for row in ListingViewDaily.objects.filter(listing=self.listing)}
+        self.assertEqual(daily[today - timedelta(days=1)].views_count, 3)
+        self.assertEqual(daily[today - timedelta(days=1)].unique_viewers, 2)
+        self.assertEqual(daily[today].views_count, 1)
+        self.assertEqual(ListingViewer.objects.filter(listing=self.listing).count(), 2)
+
+        # Повторний rollup без нових даних нічого не змінює
+        self._rollup()
+        self.assertEqual(ListingViewDaily.objects.get(listing=self.listing, date=today).views_count, 1)
+
+        # Нові перегляди за сьогодні - перераховується тільки цей день
+        self._views((self.owner, None), (None, '10.0.0.2'))
+        self._rollup()
+
+        today_row = ListingViewDaily.objects.get(listing=self.listing, date=today)
+        self.assertEqual((today_row.views_count, today_row.unique_viewers), (3, 3))
+        self.assertEqual(ListingViewer.objects.filter(listing=self.listing).count(), 4)
+
+    def test_rollup_picks_up_views_committed_below_watermark(self):
+        self._views((self.viewer, None), (None, '10.0.0.1'), (None, '10.0.0.2'))
+        late = ListingView.objects.order_by('id')[1]
+        late_id = late.pk
+        # Рядок з меншим id ще "не закомічений", коли rollup просунув watermark
+        late.delete()
+        self._rollup()
+
+        today = timezone.localdate()
+        self.assertEqual(ListingViewDaily.objects.get(listing=self.listing, date=today).views_count, 2)
+
+        ListingView.objects.create(pk=late_id, listing=self.listing, ip='10.0.0.1')
+        self._rollup()
+
+        today_row = ListingViewDaily.objects.get(listing=self.listing, date=today)
+        self.assertEqual((today_row.views_count, today_row.unique_viewers), (3, 3))
+
+    def test_endpoints_read_rollups(self):
+        self._views((self.viewer, None), (None, '10.0.0.1'), (None, '10.0.0.1'))
+        self._rollup()
+        self.client.force_authenticate(self.owner)
+
+        with CaptureQueriesContext(connection) as ctx:
+            stats = self.client.get('/api/listing-views/my_listings_stats/')
+        raw_queries = [q['sql'] for q in ctx.captured_queries if '"analytics_listingview"' in q['sql']]
+        self.assertEqual(raw_queries, [])
+        self.assertEqual(stats.data['listings_stats'], [{
+            'listing_id': self.listing.pk,
+            'listing_title': self.listing.title,
+            'total_views': 3,
+            'unique_viewers': 2,
+        }])
 
-# Create your tests here.
+        popular = self.client.get('/api/listing-views/popular_listings/')
+        self.assertEqual(popular.data[0]['id'], self.listing.pk)
+        self.assertEqual(popular.data[0]['views_count'], 3)
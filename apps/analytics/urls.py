@@ -28,6 +28,8 @@ GET     /api/listing-views/popular_listings/          - Топ-10 популяр
 GET     /api/listing-views/my_views/                  - Останні перегляди користувача
 GET     /api/listing-views/my_listings_stats/         - Статистика переглядів моїх оголошень
 
+Статистика читається з rollup-таблиць: python manage.py rollup_listing_views
+
 ═══════════════════════════════════════════════════════════════════════════
 """
 
@@ -2,9 +2,9 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.db.models import Count, Q, Sum
 
-from .models import ListingView
+from .models import ListingView, ListingViewDaily, ListingViewer
 from .serializers import ListingViewSerializer
 from apps.listings.serializers import ListingListSerializer
 
@@ -18,6 +18,10 @@ class ListingViewViewSet(viewsets.ReadOnlyModelViewSet):
     - GET /listing-views/{id}/ - Деталі перегляду
     - GET /listing-views/popular_listings/ - Популярні оголошення
     - GET /listing-views/my_views/ - Мої перегляди
+
+    Статистика (popular_listings, popular_nearby, my_listings_stats) читається
+    з rollup-таблиць ListingViewDaily / ListingViewer.
+    Оновлення: python manage.py rollup_listing_views
     """
 
     serializer_class = ListingViewSerializer
@@ -43,14 +47,16 @@ class ListingViewViewSet(viewsets.ReadOnlyModelViewSet):
         """
         from apps.listings.models import Listing
 
-        # Рахуємо перегляди для кожного listing
-        popular = ListingView.objects.values('listing').annotate(
-            views_count=Count('id')
+        # ✅ Рахуємо перегляди з денних агрегатів (rollup), а не з сирих ListingView
+        popular = ListingViewDaily.objects.values('listing').annotate(
+            views_count=Sum('views_count')
         ).order_by('-views_count')[:10]
 
         # Отримуємо самі listing
         listing_ids = [item['listing'] for item in popular]
-        listings = Listing.objects.filter(id__in=listing_ids)
+        listings = Listing.objects.filter(id__in=listing_ids).select_related(
+            'location', 'owner', 'rating_stats'
+        ).prefetch_related(Listing.main_photo_prefetch())
 
         # Додаємо кількість переглядів
         views_dict = {item['listing']: item['views_count'] for item in popular}
@@ -86,26 +92,35 @@ class ListingViewViewSet(viewsets.ReadOnlyModelViewSet):
         # Мої оголошення
         my_listings = Listing.objects.filter(owner=request.user)
 
-        # Рахуємо перегляди
-        stats = []
-        for listing in my_listings:
-            views_count = ListingView.objects.filter(listing=listing).count()
-            unique_users = ListingView.objects.filter(
-                listing=listing
-            ).values('user').distinct().count()
-
-            stats.append({
-                'listing_id': listing.id,
-                'listing_title': listing.title,
-                'total_views': views_count,
-                'unique_viewers': unique_users
-            })
+        # ✅ Два групових запити по rollup-таблицях замість двох запитів на оголошення
+        views_map = dict(
+            ListingViewDaily.objects.filter(listing__owner=request.user)
+            .values('listing')
+            .annotate(total=Sum('views_count'))
+            .values_list('listing', 'total')
+        )
+        viewers_map = dict(
+            ListingViewer.objects.filter(listing__owner=request.user)
+            .values('listing')
+            .annotate(total=Count('id'))
+            .values_list('listing', 'total')
+        )
+
+        stats = [
+            {
+                'listing_id': listing_id,
+                'listing_title': title,
+                'total_views': views_map.get(listing_id, 0),
+                'unique_viewers': viewers_map.get(listing_id, 0),
+            }
+            for listing_id, title in my_listings.values_list('id', 'title')
+        ]
 
         # Сортуємо по кількості переглядів
         stats = sorted(stats, key=lambda x: x['total_views'], reverse=True)
 
         return Response({
-            'total_listings': my_listings.count(),
+            'total_listings': len(stats),
             'listings_stats': stats
         })
 
@@ -131,13 +146,13 @@ class ListingViewViewSet(viewsets.ReadOnlyModelViewSet):
         from apps.listings.models import Listing
 
         popular = (
-            ListingView.objects
+            ListingViewDaily.objects
             .filter(
                 listing__location__city__iexact=city,
                 listing__location__country__iexact=country
             )
             .values("listing")
-            .annotate(views_count=Count("id"))
+            .annotate(views_count=Sum("views_count"))
             .order_by("-views_count")[:10]
         )
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Booking
+from .models import Booking, BookingStats
 
 
 @admin.register(Booking)
@@ -66,3 +66,20 @@ class BookingAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         return qs.select_related('customer', 'listing')
+
+
+@admin.register(BookingStats)
+class BookingStatsAdmin(admin.ModelAdmin):
+    list_display = [
+        'user',
+        'scope',
+        'total_count',
+        'pending_count',
+        'confirmed_count',
+        'completed_count',
+        'total_revenue',
+        'updated_at',
+    ]
+    list_filter = ['scope']
+    search_fields = ['user__email']
+    readonly_fields = [field.name for field in BookingStats._meta.fields]
@@ -0,0 +1,62 @@
+from apps.common.enums import BookingStatus
+from apps.jobs.outbox import consumer
+from apps.notifications.models import Notification
+
+
+STATUS_MESSAGES = {
+    BookingStatus.PENDING: 'очікує підтвердження',
+    BookingStatus.CONFIRMED: 'підтверджено',
+    BookingStatus.CANCELLED: 'скасовано',
+    BookingStatus.COMPLETED: 'завершено',
+    BookingStatus.REJECTED: 'відхилено',
+    BookingStatus.IN_PROGRESS: 'у процесі',
+    BookingStatus.EXPIRED: 'прострочено',
+}
+
+
+@consumer('booking.created')
+def notify_booking_created(payloads):
+    """Сповіщення клієнту і власнику про нові бронювання (один bulk_create)"""
+    notifications = []
+    for payload in payloads:
+        booking_id = payload['booking_id']
+        notifications.append(Notification(
+            user_id=payload['customer_id'],
+            title='Нове бронювання',
+            message=f'Бронювання #{booking_id} створено, чекайте підтвердження',
+            notification_type='BOOKING',
+            related_object_id=booking_id,
+            related_object_type='booking',
+        ))
+        notifications.append(Notification(
+            user_id=payload['owner_id'],
+            title='Новий запит на бронювання',
+            message=f'Новий букінг #{booking_id}, прийміть або скасуйте',
+            notification_type='BOOKING',
+            related_object_id=booking_id,
+            related_object_type='booking',
+        ))
+
+    Notification.objects.bulk_create(notifications)
+
+
+@consumer('booking.status_changed')
+def notify_booking_status_changed(payloads):
+    """Сповіщення клієнтам про новий статус бронювання (один bulk_create)"""
+    Notification.objects.bulk_create([
+        status_change_notification(payload) for payload in payloads
+    ])
+
+
+def status_change_notification(payload):
+    status = payload['status']
+    status_message = STATUS_MESSAGES.get(status, BookingStatus(status).label.lower())
+
+    return Notification(
+        user_id=payload['customer_id'],
+        title='Статус бронювання оновлено',
+        message=f'Бронювання #{payload["booking_id"]} {status_message}.',
+        notification_type='BOOKING',
+        related_object_id=payload['booking_id'],
+        related_object_type='booking',
+    )
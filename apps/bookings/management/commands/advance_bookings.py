@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.bookings.models import Booking
+from apps.common.constants import BOOKING_ADVANCE_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Переводить бронювання за часом: PENDING -> EXPIRED, '
+        'CONFIRMED -> IN_PROGRESS -> COMPLETED'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BOOKING_ADVANCE_BATCH_SIZE,
+            help='Кількість бронювань за одну пачку'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Працювати періодично (кожні --interval секунд)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=600,
+            help='Інтервал між запусками в режимі --loop (секунди)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            counts = Booking.advance_by_time(batch_size=options['batch_size'])
+            summary = ', '.join(f'{status}: {count}' for status, count in counts.items())
+            self.stdout.write(self.style.SUCCESS(f'✅ Змінено статусів - {summary}'))
+
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
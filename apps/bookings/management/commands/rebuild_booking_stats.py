@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.bookings.models import BookingStats
+
+
+class Command(BaseCommand):
+    help = 'Повністю перераховує матеріалізовану статистику бронювань BookingStats (звірка)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID користувача (можна вказати кілька разів)'
+        )
+
+    def handle(self, *args, **options):
+        stats = BookingStats.objects.all()
+        if options['user_ids']:
+            stats = stats.filter(user_id__in=options['user_ids'])
+
+        # Перераховуються тільки вже створені рядки (решта створиться при читанні)
+        rows = list(stats.values_list('user_id', 'scope'))
+        for user_id, scope in rows:
+            BookingStats.rebuild(user_id, scope)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Перераховано зрізів: {len(rows)}'))
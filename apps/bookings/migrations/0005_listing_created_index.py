@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_alter_booking_num_nights'),
+        ('common', '0002_location_geohash'),
+        ('listings', '0006_keyset_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['listing', '-created_at'], name='bookings_bo_listing_3ce071_idx'),
+        ),
+    ]
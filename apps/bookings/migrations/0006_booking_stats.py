@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:17
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_listing_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('owner', 'Як власник'), ('customer', 'Як клієнт')], max_length=20, verbose_name='Зріз')),
+                ('total_count', models.PositiveIntegerField(default=0, verbose_name='Всього')),
+                ('pending_count', models.PositiveIntegerField(default=0, verbose_name='Очікують')),
+                ('confirmed_count', models.PositiveIntegerField(default=0, verbose_name='Підтверджені')),
+                ('rejected_count', models.PositiveIntegerField(default=0, verbose_name='Відхилені')),
+                ('cancelled_count', models.PositiveIntegerField(default=0, verbose_name='Скасовані')),
+                ('completed_count', models.PositiveIntegerField(default=0, verbose_name='Завершені')),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Виручка')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_stats', to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Booking stats',
+                'verbose_name_plural': 'Booking stats',
+                'constraints': [models.UniqueConstraint(fields=('user', 'scope'), name='unique_booking_stats_scope')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:17
+
+from django.db import migrations, models
+
+
+def drop_stale_stats(apps, schema_editor):
+    # IN_PROGRESS тепер має лічильник і входить у виручку - рядки
+    # перераховуються при першому читанні (BookingStats.for_user)
+    apps.get_model('bookings', 'BookingStats').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_time_transition_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookingstats',
+            name='in_progress_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='In progress'),
+        ),
+        migrations.RunPython(drop_stale_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:26
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_booking_stats_in_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bookingstats',
+            name='cancelled_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Cancelled'),
+        ),
+        migrations.AlterField(
+            model_name='bookingstats',
+            name='completed_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Completed'),
+        ),
+        migrations.AlterField(
+            model_name='bookingstats',
+            name='confirmed_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Confirmed'),
+        ),
+        migrations.AlterField(
+            model_name='bookingstats',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Pending'),
+        ),
+        migrations.AlterField(
+            model_name='bookingstats',
+            name='rejected_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Rejected'),
+        ),
+        migrations.AlterField(
+            model_name='bookingstats',
+            name='scope',
+            field=models.CharField(choices=[('owner', 'Як власник'), ('customer', 'Як клієнт')], max_length=20, verbose_name='Scope'),
+        ),
+        migrations.AlterField(
+            model_name='bookingstats',
+            name='total_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Total'),
+        ),
+        migrations.AlterField(
+            model_name='bookingstats',
+            name='total_revenue',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Revenue'),
+        ),
+        migrations.AlterField(
+            model_name='bookingstats',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_stats', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+    ]
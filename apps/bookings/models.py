@@ -1,14 +1,23 @@
 from decimal import Decimal
 from datetime import datetime, timedelta
 
-from django.db import models
+from django.db import OperationalError, connection, models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.dispatch import Signal
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 
 from apps.common.models import Location, TimeModel
-from apps.common.enums import BookingStatus, PaymentStatus, CancellationPolicy
+from apps.common.enums import (
+    ACTIVE_BOOKING_STATUSES,
+    REVENUE_BOOKING_STATUSES,
+    BookingStatsScope,
+    BookingStatus,
+    PaymentStatus,
+    CancellationPolicy,
+)
 from apps.common.constants import (
     # Booking constraints
     MIN_BOOKING_DURATION_DAYS,
@@ -30,8 +39,52 @@ from apps.common.constants import (
 
     # Fees
     PLATFORM_FEE_PERCENTAGE,
+
+    # Time-based transitions
+    PENDING_BOOKING_EXPIRY_HOURS,
+    BOOKING_ADVANCE_BATCH_SIZE,
+
+    # Lock errors
+    DB_LOCK_ERROR_MARKERS,
+    DB_LOCK_ERROR_CODES,
 )
-from apps.listings.models import ListingPrice
+from apps.listings.models import ListingAvailability, ListingPrice
+
+
+# ✅ Зміна статусу через Booking.transition() (UPDATE без save(), тому без post_save)
+# Аргументи: booking, old_status, new_status
+booking_status_changed = Signal()
+
+
+# ✅ Масова зміна статусу через Booking.bulk_transition()
+# Аргументи: bookings (вже з новим статусом), old_statuses {pk: старий статус}, new_status
+bookings_status_changed = Signal()
+
+
+class BookingTransitionError(Exception):
+    """
+    Недозволений перехід статусу
+
+    conflict=True - статус змінився паралельно (UPDATE не знайшов рядок з очікуваним статусом)
+    """
+
+    def __init__(self, message, conflict=False):
+        super().__init__(message)
+        self.message = message
+        self.conflict = conflict
+
+
+class BookingConflictError(Exception):
+    """
+    Бронювання не створено: дати вже зайняті
+
+    busy=True - не вдалося дочекатися замка оголошення (таймаут блокування/deadlock)
+    """
+
+    def __init__(self, message, busy=False):
+        super().__init__(message)
+        self.message = message
+        self.busy = busy
 
 
 class Booking(TimeModel):
@@ -200,11 +253,16 @@ class Booking(TimeModel):
         verbose_name_plural = 'Bookings'
         indexes = [
             models.Index(fields=['customer', '-created_at']),
+            models.Index(fields=['listing', '-created_at']),  # ✅ історія бронювань власника
             models.Index(fields=['listing', 'check_in', 'check_out']),
             models.Index(fields=['location']),
             models.Index(fields=['status']),
             models.Index(fields=['payment_status']),
             models.Index(fields=['check_in', 'check_out']),
+            # ✅ Фонові переходи статусів (advance_bookings)
+            models.Index(fields=['status', 'check_in']),
+            models.Index(fields=['status', 'check_out']),
+            models.Index(fields=['status', 'created_at']),
         ]
 
     def __str__(self):
@@ -315,14 +373,14 @@ class Booking(TimeModel):
         if not all([self.check_in, self.check_out, self.listing_id]):
             return
 
-        # Знаходимо перетинаючі бронювання
+        # ✅ Швидка перевірка по бітовій карті зайнятості (один запит по PK)
+        if ListingAvailability.is_range_available(self.listing_id, self.check_in, self.check_out):
+            return
+
+        # Ночі зайняті - уточнюємо по Booking (можливо, це саме це бронювання)
         overlapping = Booking.objects.filter(
             listing=self.listing,
-            status__in=[
-                BookingStatus.PENDING,
-                BookingStatus.CONFIRMED,
-                BookingStatus.IN_PROGRESS
-            ]
+            status__in=ACTIVE_BOOKING_STATUSES
         ).exclude(
             pk=self.pk if self.pk else None
         ).filter(
@@ -331,8 +389,8 @@ class Booking(TimeModel):
             check_out__gt=self.check_in
         )
 
-        if overlapping.exists():
-            conflicting = overlapping.first()
+        conflicting = overlapping.first()
+        if conflicting:
             raise ValidationError({
                 'check_in': (
                     f'These dates overlap with another booking '
@@ -493,3 +551,598 @@ class Booking(TimeModel):
         # Валідація перед збереженням
         self.full_clean()
         super().save(*args, **kwargs)
+
+    # ============================================
+    # СТВОРЕННЯ БРОНЮВАННЯ
+    # ============================================
+
+    DATES_TAKEN_MESSAGE = 'These dates are already booked'
+    LISTING_BUSY_MESSAGE = 'Listing is being booked by another request, try again'
+
+    @classmethod
+    def reserve(cls, **fields):
+        """
+        ✅ Створити бронювання без гонки "перевірив - вставив"
+
+        1. Швидка перевірка по бітовій карті без замка - зайняті дати
+           відхиляються одразу, не стаючи в чергу
+        2. У транзакції - замок рядка ListingAvailability оголошення
+           (SELECT ... FOR UPDATE, на SQLite - блокування на запис),
+           повторна перевірка дат під замком і INSERT
+        3. post_save позначає ночі в карті ще до зняття замка
+
+        Конфлікт - одразу BookingConflictError, без повторних спроб.
+
+        Args:
+            **fields: Поля Booking (listing, customer, check_in, check_out, ...)
+
+        Raises:
+            BookingConflictError
+            ValidationError: з full_clean()
+        """
+        booking = cls(**fields)
+        check_in, check_out = booking.check_in, booking.check_out
+
+        try:
+            # Індексу ще немає - його побудує lock() вже під замком
+            availability = ListingAvailability.objects.filter(listing_id=booking.listing_id).first()
+            if availability and not availability.is_free(check_in, check_out):
+                raise BookingConflictError(cls.DATES_TAKEN_MESSAGE)
+
+            with transaction.atomic():
+                availability = ListingAvailability.lock(booking.listing_id)
+                if not availability.is_free(check_in, check_out):
+                    raise BookingConflictError(cls.DATES_TAKEN_MESSAGE)
+                booking.save()
+        except OperationalError as exc:
+            # Таймаут очікування замка / deadlock / "database is locked",
+            # інші помилки БД (немає таблиці, обрив з'єднання) - не "зайнято"
+            if not cls.is_lock_error(exc):
+                raise
+            raise BookingConflictError(cls.LISTING_BUSY_MESSAGE, busy=True) from exc
+
+        return booking
+
+    @staticmethod
+    def is_lock_error(exc) -> bool:
+        """Чи означає OperationalError зайнятий замок (таймаут очікування / deadlock)"""
+        if getattr(exc.__cause__, 'pgcode', None) in DB_LOCK_ERROR_CODES:
+            return True
+        message = str(exc).lower()
+        return any(marker in message for marker in DB_LOCK_ERROR_MARKERS)
+
+    # ============================================
+    # ПЕРЕХОДИ СТАТУСІВ
+    # ============================================
+
+    # Новий статус -> статуси, з яких у нього можна перейти
+    STATUS_TRANSITIONS = {
+        BookingStatus.CONFIRMED: (BookingStatus.PENDING,),
+        BookingStatus.REJECTED: (BookingStatus.PENDING,),
+        BookingStatus.CANCELLED: (
+            BookingStatus.PENDING,
+            BookingStatus.CONFIRMED,
+            BookingStatus.IN_PROGRESS,
+        ),
+        BookingStatus.IN_PROGRESS: (BookingStatus.CONFIRMED,),
+        BookingStatus.COMPLETED: (BookingStatus.CONFIRMED, BookingStatus.IN_PROGRESS),
+        BookingStatus.EXPIRED: (BookingStatus.PENDING,),
+    }
+
+    # {allowed} - назви дозволених статусів, {status} - назва поточного (BookingStatus.label)
+    STATUS_TRANSITION_ERRORS = {
+        BookingStatus.CONFIRMED: 'Can only approve bookings with {allowed} status',
+        BookingStatus.REJECTED: 'Can only reject bookings with {allowed} status',
+        BookingStatus.CANCELLED: 'Cannot cancel booking with "{status}" status',
+        BookingStatus.IN_PROGRESS: 'Can only start bookings with {allowed} status',
+        BookingStatus.COMPLETED: 'Can only complete bookings with {allowed} status',
+        BookingStatus.EXPIRED: 'Can only expire bookings with {allowed} status',
+    }
+
+    TRANSITION_CONFLICT_MESSAGE = 'Booking status was changed by another request, reload and try again'
+
+    def transition_error(self, new_status, today=None):
+        """
+        Причина, з якої перехід неможливий (None - перехід дозволений)
+
+        Перевіряє тільки завантажений стан, без запитів до БД.
+        """
+        allowed = self.STATUS_TRANSITIONS.get(new_status, ())
+        if self.status not in allowed:
+            message = self.STATUS_TRANSITION_ERRORS.get(
+                new_status, 'Cannot change status to "{new_status}"'
+            )
+            return message.format(
+                allowed=' or '.join(f'"{BookingStatus(value).label}"' for value in allowed),
+                status=BookingStatus(self.status).label,
+                new_status=BookingStatus(new_status).label,
+            )
+
+        today = today or timezone.now().date()
+        if new_status == BookingStatus.CANCELLED and self.check_in <= today:
+            return 'Cannot cancel booking that has already started'
+        if new_status == BookingStatus.COMPLETED and self.check_out > today:
+            return 'Cannot complete booking before check-out date'
+        return None
+
+    def transition_values(self, new_status, reason='', now=None) -> dict:
+        """Колонки, що змінюються при переході"""
+        now = now or timezone.now()
+        values = {'status': new_status, 'updated_at': now}
+        if new_status == BookingStatus.CANCELLED:
+            values['cancelled_at'] = now
+        if reason and new_status in (BookingStatus.CANCELLED, BookingStatus.REJECTED):
+            values['cancellation_reason'] = reason
+        return values
+
+    def transition(self, new_status, reason='', fields=None, validated=False):
+        """
+        ✅ Змінити статус одним UPDATE ... WHERE id = ? AND status = ?
+
+        Без save()/full_clean()/перерахунку цін: ціни і дати при зміні статусу
+        не змінюються. Якщо статус встиг змінитися паралельно - BookingTransitionError
+        (conflict=True). Після UPDATE - сигнал booking_status_changed
+        (календар, статистика, сповіщення).
+
+        Args:
+            new_status: Новий статус (BookingStatus)
+            reason: Причина (для скасування/відхилення)
+            fields: Інші поля, що записуються тим самим UPDATE
+            validated: Перехід уже перевірено (BookingStatusUpdateSerializer) -
+                таблиця переходів і дати не перевіряються, тільки конкуренція
+
+        Raises:
+            BookingTransitionError
+        """
+        error = None if validated else self.transition_error(new_status)
+        if error:
+            raise BookingTransitionError(error)
+
+        old_status = self.status
+        values = {**self.transition_values(new_status, reason), **(fields or {})}
+
+        with transaction.atomic():
+            updated = Booking.objects.filter(pk=self.pk, status=old_status).update(**values)
+            if not updated:
+                raise BookingTransitionError(self.TRANSITION_CONFLICT_MESSAGE, conflict=True)
+
+            for field, value in values.items():
+                setattr(self, field, value)
+            self._set_snapshot(values, replace=False)
+
+            booking_status_changed.send(
+                sender=Booking,
+                booking=self,
+                old_status=old_status,
+                new_status=new_status,
+            )
+        return self
+
+    @classmethod
+    def bulk_transition(cls, bookings, new_status, reason='', today=None):
+        """
+        ✅ Змінити статус багатьох бронювань set-based UPDATE-ами
+
+        Один UPDATE ... WHERE id IN (...) AND status = ? на кожен старий статус.
+        Перевірка, які саме рядки оновлено, - окремим запитом тільки якщо
+        частину статусів встигли змінити паралельно. Після UPDATE - один сигнал
+        bookings_status_changed на всю пачку.
+
+        Args:
+            bookings: Завантажені бронювання (з listing)
+            new_status: Новий статус (BookingStatus)
+            reason: Причина (для скасування/відхилення)
+            today: Дата для перевірки переходів (за замовчуванням - сьогодні)
+
+        Returns:
+            tuple: (змінені бронювання, {pk: BookingTransitionError})
+        """
+        now = timezone.now()
+        today = today or now.date()
+        errors = {}
+        by_status = {}
+
+        for booking in bookings:
+            error = booking.transition_error(new_status, today)
+            if error:
+                errors[booking.pk] = BookingTransitionError(error)
+            else:
+                by_status.setdefault(booking.status, []).append(booking)
+
+        if not by_status:
+            return [], errors
+
+        expected = [booking for group in by_status.values() for booking in group]
+        values = expected[0].transition_values(new_status, reason, now)
+
+        with transaction.atomic():
+            updated = 0
+            for old_status, group in by_status.items():
+                updated += cls.objects.filter(
+                    pk__in=[booking.pk for booking in group],
+                    status=old_status,
+                ).update(**values)
+
+            changed = expected
+            if updated != len(expected):
+                # Частину рядків змінив інший запит - які оновили саме ми
+                updated_ids = set(cls.objects.filter(
+                    pk__in=[booking.pk for booking in expected],
+                    status=new_status,
+                    updated_at=now,
+                ).values_list('pk', flat=True))
+                changed = [booking for booking in expected if booking.pk in updated_ids]
+                for booking in expected:
+                    if booking.pk not in updated_ids:
+                        errors[booking.pk] = BookingTransitionError(
+                            cls.TRANSITION_CONFLICT_MESSAGE, conflict=True
+                        )
+
+            old_statuses = {booking.pk: booking.status for booking in changed}
+            for booking in changed:
+                for field, value in values.items():
+                    setattr(booking, field, value)
+                booking._set_snapshot(values, replace=False)
+
+            if changed:
+                bookings_status_changed.send(
+                    sender=cls,
+                    bookings=changed,
+                    old_statuses=old_statuses,
+                    new_status=new_status,
+                )
+        return changed, errors
+
+    # ============================================
+    # ПЕРЕХОДИ ЗА ЧАСОМ (advance_bookings)
+    # ============================================
+
+    @classmethod
+    def time_transitions(cls, now=None) -> list:
+        """
+        Переходи, що настають з часом: [(новий статус, умова), ...]
+
+        Порядок важливий: підтверджене бронювання, що вже закінчилося,
+        одразу стає COMPLETED, а не IN_PROGRESS.
+        """
+        now = now or timezone.now()
+        today = now.date()
+        expires_before = now - timedelta(hours=PENDING_BOOKING_EXPIRY_HOURS)
+
+        return [
+            (BookingStatus.COMPLETED, Q(
+                status__in=[BookingStatus.CONFIRMED, BookingStatus.IN_PROGRESS],
+                check_out__lte=today,
+            )),
+            (BookingStatus.IN_PROGRESS, Q(
+                status=BookingStatus.CONFIRMED,
+                check_in__lte=today,
+                check_out__gt=today,
+            )),
+            (BookingStatus.EXPIRED, Q(status=BookingStatus.PENDING) & (
+                Q(check_in__lte=today) | Q(created_at__lt=expires_before)
+            )),
+        ]
+
+    @classmethod
+    def advance_by_time(cls, now=None, batch_size=BOOKING_ADVANCE_BATCH_SIZE) -> dict:
+        """
+        ✅ Провести бронювання через переходи за часом пачками
+
+        PENDING -> EXPIRED (заїзд настав або власник не відповів вчасно),
+        CONFIRMED -> IN_PROGRESS -> COMPLETED.
+
+        Пачки вибираються по індексу (status, дата) з keyset по pk, кожна пачка -
+        Booking.bulk_transition() (set-based UPDATE, одне bulk_create сповіщень).
+        Безпечно запускати паралельно: UPDATE умовний (WHERE status = старий),
+        а де БД підтримує SKIP LOCKED - воркери беруть різні пачки.
+
+        Returns:
+            dict: {новий статус: кількість змінених бронювань}
+        """
+        now = now or timezone.now()
+        today = now.date()
+        counts = {}
+
+        for new_status, condition in cls.time_transitions(now):
+            counts[new_status] = 0
+            last_pk = 0
+
+            while True:
+                with transaction.atomic():
+                    queryset = cls.objects.select_related('listing').filter(
+                        condition, pk__gt=last_pk
+                    ).order_by('pk')
+
+                    if connection.features.has_select_for_update_skip_locked:
+                        queryset = queryset.select_for_update(
+                            skip_locked=True,
+                            **({'of': ('self',)} if connection.features.has_select_for_update_of else {}),
+                        )
+
+                    chunk = list(queryset[:batch_size])
+                    if not chunk:
+                        break
+
+                    changed, _ = cls.bulk_transition(chunk, new_status, today=today)
+
+                counts[new_status] += len(changed)
+                last_pk = chunk[-1].pk
+                if len(chunk) < batch_size:
+                    break
+
+        return counts
+
+    # ============================================
+    # СТАТИСТИКА
+    # ============================================
+
+    # Кошики статусів у відповіді API -> статус
+    STATUS_BUCKETS = {
+        'waiting': BookingStatus.PENDING,
+        'agreed': BookingStatus.CONFIRMED,
+        'in_progress': BookingStatus.IN_PROGRESS,
+        'rejected': BookingStatus.REJECTED,
+        'canceled': BookingStatus.CANCELLED,
+        'completed': BookingStatus.COMPLETED,
+    }
+
+    @staticmethod
+    def _time_bucket_filters(today):
+        return {
+            'upcoming': Q(
+                check_in__gte=today,
+                status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
+            ),
+            'current': Q(
+                check_in__lte=today,
+                check_out__gte=today,
+                status__in=[BookingStatus.CONFIRMED, BookingStatus.IN_PROGRESS],
+            ),
+            'past': Q(check_out__lt=today),
+        }
+
+    @classmethod
+    def statistics(cls, queryset, today=None) -> dict:
+        """
+        ✅ Вся статистика одним запитом (умовна агрегація)
+
+        Args:
+            queryset: Бронювання, по яких рахується статистика
+            today: Дата для часових кошиків (за замовчуванням - сьогодні)
+
+        Returns:
+            dict: total, by_status, by_time, total_revenue
+        """
+        today = today or timezone.now().date()
+        time_filters = cls._time_bucket_filters(today)
+
+        row = queryset.order_by().aggregate(
+            total=Count('pk'),
+            total_revenue=Sum(
+                'total_price',
+                filter=Q(status__in=REVENUE_BOOKING_STATUSES),
+                default=Decimal('0.00'),
+            ),
+            **{
+                f'status_{name}': Count('pk', filter=Q(status=status))
+                for name, status in cls.STATUS_BUCKETS.items()
+            },
+            **{
+                f'time_{name}': Count('pk', filter=condition)
+                for name, condition in time_filters.items()
+            },
+        )
+
+        return {
+            'total': row['total'],
+            'by_status': {name: row[f'status_{name}'] for name in cls.STATUS_BUCKETS},
+            'by_time': {name: row[f'time_{name}'] for name in time_filters},
+            'total_revenue': row['total_revenue'],
+        }
+
+    @classmethod
+    def time_statistics(cls, queryset, today=None) -> dict:
+        """Тільки часові кошики (залежать від дати, тому не матеріалізуються)"""
+        today = today or timezone.now().date()
+        time_filters = cls._time_bucket_filters(today)
+
+        row = queryset.order_by().aggregate(**{
+            name: Count('pk', filter=condition)
+            for name, condition in time_filters.items()
+        })
+        return {name: row[name] for name in time_filters}
+
+
+class BookingStats(models.Model):
+    """
+    ✅ Матеріалізована статистика бронювань користувача
+
+    Один рядок на (користувач, зріз): як власник - бронювання його оголошень,
+    як клієнт - його бронювання. Лічильники статусів і виручка оновлюються
+    інкрементально (F-вирази) при зміні бронювань; рядок створюється
+    при першому читанні повним перерахунком (rebuild_booking_stats - звірка).
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='booking_stats',
+        verbose_name='User'
+    )
+
+    scope = models.CharField(
+        max_length=20,
+        choices=BookingStatsScope.choices,
+        verbose_name='Scope'
+    )
+
+    total_count = models.PositiveIntegerField(default=0, verbose_name='Total')
+    pending_count = models.PositiveIntegerField(default=0, verbose_name='Pending')
+    confirmed_count = models.PositiveIntegerField(default=0, verbose_name='Confirmed')
+    in_progress_count = models.PositiveIntegerField(default=0, verbose_name='In progress')
+    rejected_count = models.PositiveIntegerField(default=0, verbose_name='Rejected')
+    cancelled_count = models.PositiveIntegerField(default=0, verbose_name='Cancelled')
+    completed_count = models.PositiveIntegerField(default=0, verbose_name='Completed')
+
+    total_revenue = models.DecimalField(
+        max_digits=PRICE_MAX_DIGITS + 4,
+        decimal_places=PRICE_DECIMAL_PLACES,
+        default=Decimal('0.00'),
+        verbose_name='Revenue'
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Статус -> лічильник
+    STATUS_COUNTERS = {
+        BookingStatus.PENDING: 'pending_count',
+        BookingStatus.CONFIRMED: 'confirmed_count',
+        BookingStatus.IN_PROGRESS: 'in_progress_count',
+        BookingStatus.REJECTED: 'rejected_count',
+        BookingStatus.CANCELLED: 'cancelled_count',
+        BookingStatus.COMPLETED: 'completed_count',
+    }
+
+    class Meta:
+        verbose_name = 'Booking stats'
+        verbose_name_plural = 'Booking stats'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'scope'], name='unique_booking_stats_scope'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} ({self.scope}): {self.total_count}"
+
+    @staticmethod
+    def scope_filter(user_id, scope) -> Q:
+        """Бронювання, що входять у зріз"""
+        if scope == BookingStatsScope.OWNER:
+            return Q(listing__owner_id=user_id)
+        return Q(customer_id=user_id)
+
+    @classmethod
+    def contribution(cls, status, total_price) -> dict:
+        """Внесок одного бронювання в лічильники"""
+        values = {'total_count': 1}
+        counter = cls.STATUS_COUNTERS.get(status)
+        if counter:
+            values[counter] = 1
+        if status in REVENUE_BOOKING_STATUSES:
+            values['total_revenue'] = total_price or Decimal('0.00')
+        return values
+
+    @classmethod
+    def delta(cls, old=None, new=None) -> dict:
+        """
+        Зміна лічильників при переході бронювання old -> new
+
+        Args:
+            old: (status, total_price) до зміни або None
+            new: (status, total_price) після зміни або None
+        """
+        delta = {}
+        for values, sign in ((old, -1), (new, 1)):
+            if values is None:
+                continue
+            for field, amount in cls.contribution(*values).items():
+                delta[field] = delta.get(field, 0) + sign * amount
+        return {field: amount for field, amount in delta.items() if amount}
+
+    @classmethod
+    def apply_change(cls, user_id, scope, old=None, new=None):
+        """
+        ✅ Інкрементальне оновлення зрізу (одним UPDATE)
+
+        Args:
+            old: (status, total_price) до зміни або None
+            new: (status, total_price) після зміни або None
+        """
+        cls.apply_changes(scope, [(user_id, old, new)])
+
+    @classmethod
+    def apply_changes(cls, scope, changes):
+        """
+        ✅ Зміни багатьох бронювань - один UPDATE на користувача
+
+        Args:
+            changes: [(user_id, old, new), ...]
+        """
+        deltas = {}
+        for user_id, old, new in changes:
+            if user_id is None:
+                continue
+            total = deltas.setdefault(user_id, {})
+            for field, amount in cls.delta(old, new).items():
+                total[field] = total.get(field, 0) + amount
+
+        for user_id, delta in deltas.items():
+            delta = {field: amount for field, amount in delta.items() if amount}
+            if not delta:
+                continue
+            # Якщо рядка ще немає - його створить перше читання повним перерахунком
+            cls.objects.filter(user_id=user_id, scope=scope).update(**{
+                field: F(field) + amount for field, amount in delta.items()
+            })
+
+    @classmethod
+    def compute(cls, user_id, scope) -> dict:
+        """Повний перерахунок зрізу одним агрегатним запитом"""
+        bookings = Booking.objects.filter(cls.scope_filter(user_id, scope)).order_by()
+        row = bookings.aggregate(
+            total_count=Count('pk'),
+            total_revenue=Sum(
+                'total_price',
+                filter=Q(status__in=REVENUE_BOOKING_STATUSES),
+                default=Decimal('0.00'),
+            ),
+            **{
+                counter: Count('pk', filter=Q(status=status))
+                for status, counter in cls.STATUS_COUNTERS.items()
+            },
+        )
+        return row
+
+    @classmethod
+    def rebuild(cls, user_id, scope):
+        """
+        ✅ Перерахувати і зберегти зріз (звірка, створення при першому читанні)
+
+        Порожній рядок комітиться до перерахунку: зміни бронювань, що прийдуть
+        далі, оновлюють його дельтою (apply_changes), а не губляться. Перерахунок -
+        під замком рядка, тому дельта, що вже чекає на замок, додається після
+        нього і вже не входить у перерахунок.
+        """
+        cls.objects.bulk_create([cls(user_id=user_id, scope=scope)], ignore_conflicts=True)
+
+        with transaction.atomic():
+            rows = cls.objects.filter(user_id=user_id, scope=scope)
+            if not connection.features.has_select_for_update:
+                # SQLite ігнорує FOR UPDATE - UPDATE першим запитом бере блокування на запис
+                rows.update(updated_at=timezone.now())
+            stats = rows.select_for_update().get()
+
+            for field, value in cls.compute(user_id, scope).items():
+                setattr(stats, field, value)
+            stats.save()
+        return stats
+
+    @classmethod
+    def for_user(cls, user_id, scope):
+        """Зріз користувача (створюється повним перерахунком при першому читанні)"""
+        stats = cls.objects.filter(user_id=user_id, scope=scope).first()
+        if stats is not None:
+            return stats
+        return cls.rebuild(user_id, scope)
+
+    def as_statistics(self, time_buckets) -> dict:
+        """Відповідь у форматі BookingViewSet.statistics"""
+        return {
+            'total': self.total_count,
+            'by_status': {
+                name: getattr(self, self.STATUS_COUNTERS[status])
+                for name, status in Booking.STATUS_BUCKETS.items()
+            },
+            'by_time': time_buckets,
+            'total_revenue': self.total_revenue,
+        }
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from apps.common.constants import BULK_TRANSITION_MAX_BOOKINGS
 from apps.common.enums import BookingStatus
-from .models import Booking
-from apps.listings.models import Listing, ListingPhoto
+from .models import Booking, BookingConflictError
+from apps.listings.models import Listing, ListingAvailability, ListingPhoto
 from apps.listings.serializers import LocationSerializer as ListingLocationSerializer
 
 
@@ -25,7 +26,7 @@ class ListingSerializer(serializers.ModelSerializer):
         ]
 
     def get_main_photo(self, obj):
-        photo = obj.photos.filter(is_main=True).first()
+        photo = obj.main_photo
         if photo:
             request = self.context.get('request')
             if request:
@@ -133,15 +134,8 @@ class BookingCreateSerializer(serializers.ModelSerializer):
                 "Це оголошення недоступне для бронювання"
             )
 
-        # Перевірка що дати не зайняті
-        overlapping = Booking.objects.filter(
-            listing=listing,
-            status__in=['PENDING', 'CONFIRMED'],
-            check_in__lt=check_out,
-            check_out__gt=check_in
-        ).exists()
-
-        if overlapping:
+        # Перевірка що дати не зайняті (бітова карта зайнятості оголошення)
+        if not ListingAvailability.is_range_available(listing.pk, check_in, check_out):
             raise serializers.ValidationError(
                 "Ці дати вже заброньовані"
             )
@@ -157,10 +151,14 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         num_days = (check_out - check_in).days
         total_price = listing.price * num_days
 
-        booking = Booking.objects.create(
-            total_price=total_price,
-            **validated_data  # location вже тут
-        )
+        # Створення під замком оголошення (паралельні запити на ті ж дати)
+        try:
+            booking = Booking.reserve(
+                total_price=total_price,
+                **validated_data  # location вже тут
+            )
+        except BookingConflictError as exc:
+            raise serializers.ValidationError(exc.message)
 
         return booking
 
@@ -264,3 +262,30 @@ class BookingStatusUpdateSerializer(serializers.ModelSerializer):
                 })
 
         return data
+
+
+class BookingBulkTransitionSerializer(serializers.Serializer):
+    """
+    ✅ Масова зміна статусу бронювань
+    Тіло: {"ids": [1, 2, 3], "status": "confirmed", "reason": "..."}
+    """
+
+    # Статуси, які користувач може встановити вручну
+    STATUS_CHOICES = [
+        BookingStatus.CONFIRMED,
+        BookingStatus.REJECTED,
+        BookingStatus.CANCELLED,
+        BookingStatus.COMPLETED,
+    ]
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_TRANSITION_MAX_BOOKINGS,
+    )
+    status = serializers.ChoiceField(choices=STATUS_CHOICES)
+    reason = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate_ids(self, value):
+        # Дублікати прибираємо, порядок зберігаємо (для відповіді)
+        return list(dict.fromkeys(value))
@@ -1,55 +1,134 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from apps.bookings.models import Booking
-from apps.common.enums import BookingStatus
-from apps.notifications.models import Notification
+from apps.bookings.models import (
+    Booking,
+    BookingStats,
+    booking_status_changed,
+    bookings_status_changed,
+)
+from apps.common.enums import ACTIVE_BOOKING_STATUSES, BookingStatsScope, BookingStatus
+from apps.jobs.outbox import emit, emit_many
+from apps.listings.models import Listing, ListingAvailability
 
 
-STATUS_MESSAGES = {
-    BookingStatus.PENDING: 'очікує підтвердження',
-    BookingStatus.CONFIRMED: 'підтверджено',
-    BookingStatus.CANCELLED: 'скасовано',
-    BookingStatus.COMPLETED: 'завершено',
-    BookingStatus.REJECTED: 'відхилено',
-    BookingStatus.IN_PROGRESS: 'у процесі',
-    BookingStatus.EXPIRED: 'прострочено',
-}
+# Поля, попередні значення яких потрібні обробникам
+TRACKED_FIELDS = ('status', 'listing_id', 'check_in', 'check_out', 'customer_id', 'total_price')
 
 
 @receiver(pre_save, sender=Booking)
-def store_previous_status(sender, instance, **kwargs):
-    if not instance.pk:
+def store_previous_state(sender, instance, **kwargs):
+    """
+    ✅ Попередній стан береться зі знімка TimeModel (без запиту)
+
+    Запит до БД - тільки для об'єкта, створеного не з БД (немає знімка).
+    """
+    instance._previous_state = None
+    if instance._state.adding or instance.pk is None:
+        return
+    if instance.previous_values(*TRACKED_FIELDS) is None:
+        instance._previous_state = Booking.objects.filter(pk=instance.pk).values(
+            *TRACKED_FIELDS
+        ).first()
+
+
+def _previous_state(instance):
+    """Стан бронювання до збереження (None для нового)"""
+    return instance.previous_values(*TRACKED_FIELDS) or getattr(instance, '_previous_state', None)
+
+
+def _occupied_range(status, check_in, check_out):
+    if status in ACTIVE_BOOKING_STATUSES and check_in and check_out:
+        return check_in, check_out
+    return None
+
+
+@receiver(post_save, sender=Booking)
+def update_listing_availability(sender, instance, created, **kwargs):
+    """Синхронізує бітову карту зайнятості оголошення зі станом бронювання"""
+    claimed = _occupied_range(instance.status, instance.check_in, instance.check_out)
+    previous = None if created else _previous_state(instance)
+
+    if previous is None:
+        ListingAvailability.apply_change(instance.listing_id, claimed=claimed)
+        return
+
+    released = _occupied_range(
+        previous['status'], previous['check_in'], previous['check_out']
+    )
+
+    if previous['listing_id'] != instance.listing_id:
+        ListingAvailability.apply_change(previous['listing_id'], released=released)
+        ListingAvailability.apply_change(instance.listing_id, claimed=claimed)
+        return
+
+    if released == claimed:
         return
 
-    try:
-        instance._previous_status = Booking.objects.get(pk=instance.pk).status
-    except Booking.DoesNotExist:
-        instance._previous_status = None
+    ListingAvailability.apply_change(
+        instance.listing_id,
+        released=released,
+        claimed=claimed,
+    )
+
+
+@receiver(post_delete, sender=Booking)
+def release_listing_availability(sender, instance, **kwargs):
+    released = _occupied_range(instance.status, instance.check_in, instance.check_out)
+    ListingAvailability.apply_change(instance.listing_id, released=released)
+
+
+def _apply_stats_change(owner_id, customer_id, old, new):
+    BookingStats.apply_change(owner_id, BookingStatsScope.OWNER, old, new)
+    BookingStats.apply_change(customer_id, BookingStatsScope.CUSTOMER, old, new)
+
+
+@receiver(post_save, sender=Booking)
+def update_booking_stats(sender, instance, created, **kwargs):
+    """✅ Інкрементально оновити матеріалізовану статистику власника і клієнта"""
+    new = (instance.status, instance.total_price)
+    owner_id = instance.listing.owner_id
+    previous = None if created else _previous_state(instance)
+
+    if previous is None:
+        _apply_stats_change(owner_id, instance.customer_id, None, new)
+        return
+
+    old = (previous['status'], previous['total_price'])
+    if previous['listing_id'] == instance.listing_id and previous['customer_id'] == instance.customer_id:
+        if old != new:
+            _apply_stats_change(owner_id, instance.customer_id, old, new)
+        return
+
+    previous_owner_id = Listing.objects.filter(pk=previous['listing_id']).values_list(
+        'owner_id', flat=True
+    ).first()
+    _apply_stats_change(previous_owner_id, previous['customer_id'], old, None)
+    _apply_stats_change(owner_id, instance.customer_id, None, new)
+
+
+@receiver(post_delete, sender=Booking)
+def release_booking_stats(sender, instance, **kwargs):
+    owner_id = Listing.objects.filter(pk=instance.listing_id).values_list(
+        'owner_id', flat=True
+    ).first()
+    _apply_stats_change(owner_id, instance.customer_id, (instance.status, instance.total_price), None)
 
 
 @receiver(post_save, sender=Booking)
 def create_booking_notifications(sender, instance, created, update_fields=None, **kwargs):
+    """✅ Подія в outbox замість вставки сповіщень (їх створить споживач)"""
     if created:
-        Notification.objects.create(
-            user=instance.customer,
-            title='Нове бронювання',
-            message=f'Бронювання #{instance.pk} створено, чекайте підтвердження',
-            notification_type='BOOKING',
-            related_object_id=instance.pk,
-            related_object_type='booking',
-        )
-        Notification.objects.create(
-            user=instance.listing.owner,
-            title='Новий запит на бронювання',
-            message=f'Новий букінг #{instance.pk}, прийміть або скасуйте',
-            notification_type='BOOKING',
-            related_object_id=instance.pk,
-            related_object_type='booking',
+        emit(
+            'booking.created',
+            booking_id=instance.pk,
+            customer_id=instance.customer_id,
+            owner_id=instance.listing.owner_id,
         )
         return
 
-    previous_status = getattr(instance, '_previous_status', None)
+    previous = _previous_state(instance)
+    previous_status = previous['status'] if previous else None
     status_changed = (
         (update_fields and 'status' in update_fields)
         or (previous_status and previous_status != instance.status)
@@ -58,16 +137,72 @@ def create_booking_notifications(sender, instance, created, update_fields=None,
     if not status_changed:
         return
 
-    status_message = STATUS_MESSAGES.get(
-        instance.status,
-        instance.get_status_display().lower(),
-    )
+    emit_many([status_change_event(instance)])
 
-    Notification.objects.create(
-        user=instance.customer,
-        title='Статус бронювання оновлено',
-        message=f'Бронювання #{instance.pk} {status_message}.',
-        notification_type='BOOKING',
-        related_object_id=instance.pk,
-        related_object_type='booking',
-    )
+
+def status_change_event(booking):
+    """Подія booking.status_changed для outbox: (тип, payload)"""
+    return 'booking.status_changed', {
+        'booking_id': booking.pk,
+        'customer_id': booking.customer_id,
+        'status': booking.status,
+    }
+
+
+# ============================================
+# ПЕРЕХОДИ СТАТУСІВ (Booking.transition - UPDATE без post_save)
+# ============================================
+
+def apply_status_change(booking, old_status):
+    """✅ Наслідки зміни статусу: календар, статистика, подія для сповіщення клієнту"""
+    apply_status_changes([booking], {booking.pk: old_status})
+
+
+def apply_status_changes(bookings, old_statuses):
+    """
+    ✅ Наслідки зміни статусу пачки бронювань
+
+    Календар - один UPDATE на оголошення, статистика - один UPDATE на користувача,
+    події для сповіщень - один INSERT в outbox.
+    """
+    released = {}
+    claimed = {}
+    owner_changes = []
+    customer_changes = []
+
+    for booking in bookings:
+        old_status = old_statuses[booking.pk]
+        old_range = _occupied_range(old_status, booking.check_in, booking.check_out)
+        new_range = _occupied_range(booking.status, booking.check_in, booking.check_out)
+        if old_range != new_range:
+            if old_range:
+                released.setdefault(booking.listing_id, []).append(old_range)
+            if new_range:
+                claimed.setdefault(booking.listing_id, []).append(new_range)
+
+        old = (old_status, booking.total_price)
+        new = (booking.status, booking.total_price)
+        owner_changes.append((booking.listing.owner_id, old, new))
+        customer_changes.append((booking.customer_id, old, new))
+
+    for listing_id in sorted({*released, *claimed}):
+        ListingAvailability.apply_changes(
+            listing_id,
+            released=released.get(listing_id, ()),
+            claimed=claimed.get(listing_id, ()),
+        )
+
+    BookingStats.apply_changes(BookingStatsScope.OWNER, owner_changes)
+    BookingStats.apply_changes(BookingStatsScope.CUSTOMER, customer_changes)
+
+    emit_many([status_change_event(booking) for booking in bookings])
+
+
+@receiver(booking_status_changed, sender=Booking)
+def handle_booking_transition(sender, booking, old_status, new_status, **kwargs):
+    apply_status_change(booking, old_status)
+
+
+@receiver(bookings_status_changed, sender=Booking)
+def handle_bulk_booking_transition(sender, bookings, old_statuses, new_status, **kwargs):
+    apply_status_changes(bookings, old_statuses)
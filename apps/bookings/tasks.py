@@ -0,0 +1,23 @@
+import logging
+
+from apps.bookings.models import Booking
+from apps.common.constants import BOOKING_ADVANCE_BATCH_SIZE
+from apps.common.enums import JobPriority
+from apps.jobs.registry import task
+
+logger = logging.getLogger(__name__)
+
+
+@task(priority=JobPriority.LOW)
+def advance_bookings(batch_size=BOOKING_ADVANCE_BATCH_SIZE):
+    """
+    Переходи бронювань за часом (PENDING -> EXPIRED, CONFIRMED -> IN_PROGRESS -> COMPLETED)
+
+    Періодична задача воркерів (JOBS['PERIODIC']); сповіщення учасникам
+    розсилаються через outbox подіями booking.status_changed.
+    """
+    counts = Booking.advance_by_time(batch_size=batch_size)
+    logger.info(
+        "Bookings advanced. %s",
+        ' '.join(f'{status}={count}' for status, count in counts.items()),
+    )
@@ -1,18 +1,35 @@
+import threading
+import time
 from datetime import date, timedelta
 from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-from apps.bookings.models import Booking
+from apps.bookings.models import (
+    Booking,
+    BookingConflictError,
+    BookingStats,
+    BookingTransitionError,
+)
 from apps.common.enums import (
+    BookingStatsScope,
     BookingStatus,
     CancellationPolicy,
     PaymentStatus,
     PropertyType,
+    UserRole,
 )
 from apps.common.models import Location
-from apps.listings.models import Listing, ListingPrice
+from apps.listings.models import Listing, ListingAvailability, ListingPrice
 from apps.notifications.models import Notification
 
 
@@ -122,3 +139,913 @@ class BookingNotificationTests(TestCase):
                 )
 
                 Notification.objects.all().delete()
+
+
+    def test_status_change_uses_snapshot_and_narrow_update(self):
+        booking_id = self._create_booking().pk
+        Notification.objects.all().delete()
+
+        booking = Booking.objects.get(pk=booking_id)
+        booking.status = BookingStatus.CONFIRMED
+
+        with CaptureQueriesContext(connection) as ctx:
+            booking.save(only_changed=True)
+
+        booking_sql = [q['sql'] for q in ctx.captured_queries if '"bookings_booking"' in q['sql']]
+        refetch = [
+            sql for sql in booking_sql
+            if sql.startswith('SELECT') and f'WHERE "bookings_booking"."id" = {booking_id}' in sql
+        ]
+        updates = [sql for sql in booking_sql if sql.startswith('UPDATE')]
+
+        self.assertEqual(refetch, [])
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"status"', updates[0])
+        self.assertNotIn('"total_price"', updates[0])
+        self.assertEqual(Notification.objects.filter(user=self.customer).count(), 1)
+
+
+class ListingAvailabilityIndexTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.customer = User.objects.create_user(
+            email='availability-customer@example.com',
+            username='availability-customer',
+            password='password123',
+        )
+        self.owner = User.objects.create_user(
+            email='availability-owner@example.com',
+            username='availability-owner',
+            password='password123',
+        )
+        self.location = Location.objects.create(
+            country='Україна',
+            city='Львів',
+            address='вул. Городоцька 5',
+        )
+        self.listing = Listing.objects.create(
+            owner=self.owner,
+            title='Квартира біля площі Ринок',
+            description='Дуже довгий опис квартири, що перевищує мінімальну довжину.',
+            location=self.location,
+            property_type=PropertyType.APARTMENT,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('100.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+        self.listing_price = ListingPrice.objects.create(
+            listing=self.listing,
+            amount=Decimal('100.00'),
+        )
+        self.today = date.today()
+
+    def _create_booking(self, start, end, status=BookingStatus.PENDING):
+        return Booking.objects.create(
+            customer=self.customer,
+            listing=self.listing,
+            location=self.location,
+            check_in=self.today + timedelta(days=start),
+            check_out=self.today + timedelta(days=end),
+            num_guests=1,
+            price_per_night=self.listing_price,
+            num_nights=end - start,
+            base_price=Decimal('100.00'),
+            platform_fee=Decimal('10.00'),
+            total_price=Decimal('110.00'),
+            status=status,
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+
+    def _is_free(self, start, end):
+        return ListingAvailability.is_range_available(
+            self.listing.pk,
+            self.today + timedelta(days=start),
+            self.today + timedelta(days=end),
+        )
+
+    def test_bitmap_mark_and_release(self):
+        availability = ListingAvailability(listing=self.listing)
+        availability.mark(date(2030, 1, 10), date(2030, 1, 12))
+        availability.mark(date(2030, 1, 5), date(2030, 1, 7))
+
+        self.assertEqual(availability.base_date, date(2030, 1, 5))
+        self.assertFalse(availability.is_free(date(2030, 1, 11), date(2030, 1, 15)))
+        self.assertTrue(availability.is_free(date(2030, 1, 7), date(2030, 1, 10)))
+        self.assertTrue(availability.is_free(date(2030, 1, 1), date(2030, 1, 5)))
+
+        availability.mark(date(2030, 1, 5), date(2030, 1, 7), booked=False)
+        self.assertEqual(availability.base_date, date(2030, 1, 10))
+        self.assertTrue(availability.is_free(date(2030, 1, 5), date(2030, 1, 10)))
+
+    def test_booking_lifecycle_updates_index(self):
+        booking = self._create_booking(3, 6)
+
+        self.assertFalse(self._is_free(5, 8))
+        self.assertTrue(self._is_free(6, 8))
+        self.assertTrue(self._is_free(1, 3))
+
+        booking.status = BookingStatus.CANCELLED
+        booking.save(update_fields=['status'])
+        self.assertTrue(self._is_free(3, 6))
+
+        booking.status = BookingStatus.PENDING
+        booking.save(update_fields=['status'])
+        booking.delete()
+        self.assertTrue(self._is_free(3, 6))
+
+    def test_overlapping_booking_is_rejected(self):
+        self._create_booking(3, 6)
+
+        with self.assertRaises(ValidationError):
+            self._create_booking(4, 5)
+
+        self._create_booking(6, 8)
+        self.assertEqual(Booking.objects.filter(listing=self.listing).count(), 2)
+
+    def test_index_is_rebuilt_lazily_from_bookings(self):
+        self._create_booking(3, 6, status=BookingStatus.CONFIRMED)
+        self._create_booking(10, 12, status=BookingStatus.REJECTED)
+        ListingAvailability.objects.filter(listing=self.listing).delete()
+
+        self.assertFalse(self._is_free(3, 4))
+        self.assertTrue(self._is_free(10, 12))
+        self.assertTrue(ListingAvailability.objects.filter(listing=self.listing).exists())
+
+    def test_release_keeps_nights_of_overlapping_booking(self):
+        first = self._create_booking(3, 6, status=BookingStatus.CONFIRMED)
+        second = self._create_booking(8, 10, status=BookingStatus.CONFIRMED)
+        # Перетин після правки дат в адмінці (без перевірки доступності)
+        Booking.objects.filter(pk=second.pk).update(
+            check_in=self.today + timedelta(days=4),
+            check_out=self.today + timedelta(days=7),
+        )
+        ListingAvailability.rebuild(self.listing.pk)
+
+        first.transition(BookingStatus.CANCELLED)
+
+        self.assertTrue(self._is_free(3, 4))
+        self.assertFalse(self._is_free(4, 5))
+        self.assertFalse(self._is_free(6, 7))
+        self.assertTrue(self._is_free(7, 10))
+
+    def test_apply_changes_builds_missing_index(self):
+        booking = self._create_booking(3, 6, status=BookingStatus.CONFIRMED)
+        ListingAvailability.objects.filter(listing=self.listing).delete()
+
+        ListingAvailability.apply_change(self.listing.pk, claimed=(booking.check_in, booking.check_out))
+
+        availability = ListingAvailability.objects.get(listing=self.listing)
+        self.assertFalse(availability.is_free(booking.check_in, booking.check_out))
+        self.assertTrue(availability.is_free(booking.check_out, booking.check_out + timedelta(days=2)))
+
+
+class BookingKeysetPaginationTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.customer = User.objects.create_user(
+            email='keyset-customer@example.com',
+            username='keyset-customer',
+            password='password123',
+        )
+        self.owner = User.objects.create_user(
+            email='keyset-owner@example.com',
+            username='keyset-owner',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+        location = Location.objects.create(
+            country='Україна',
+            city='Луцьк',
+            address='вул. Лесі Українки 3',
+        )
+        listing = Listing.objects.create(
+            owner=self.owner,
+            title='Квартира для довгої історії бронювань',
+            description='Дуже довгий опис квартири, що перевищує мінімальну довжину.',
+            location=location,
+            property_type=PropertyType.APARTMENT,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('100.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+        listing_price = ListingPrice.objects.create(listing=listing, amount=Decimal('100.00'))
+
+        today = date.today()
+        self.bookings = [
+            Booking.objects.create(
+                customer=self.customer,
+                listing=listing,
+                location=location,
+                check_in=today + timedelta(days=2 * index + 1),
+                check_out=today + timedelta(days=2 * index + 2),
+                num_guests=1,
+                price_per_night=listing_price,
+                num_nights=1,
+                base_price=Decimal('100.00'),
+                platform_fee=Decimal('10.00'),
+                total_price=Decimal('110.00'),
+                cancellation_policy=CancellationPolicy.FLEXIBLE,
+            )
+            for index in range(5)
+        ]
+        # Однаковий created_at у частини рядків - порядок визначає тай-брейкер id
+        Booking.objects.filter(pk__in=[b.pk for b in self.bookings[1:4]]).update(
+            created_at=self.bookings[1].created_at
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_keyset_pages_cover_history_without_count(self):
+        expected = list(
+            Booking.objects.order_by('-created_at', '-id').values_list('pk', flat=True)
+        )
+
+        url = '/api/bookings/my_listing_bookings/?pagination=keyset&limit=2'
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(seen, expected)
+
+    def test_offset_pagination_still_works(self):
+        response = self.client.get('/api/bookings/', {'limit': 2, 'offset': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_keyset_rejects_bad_cursor_and_unindexed_ordering(self):
+        response = self.client.get('/api/bookings/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get('/api/bookings/', {
+            'pagination': 'keyset',
+            'ordering': 'total_price',
+        })
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get('/api/bookings/', {
+            'pagination': 'keyset',
+            'ordering': 'check_in',
+            'limit': 3,
+        })
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [booking.pk for booking in self.bookings[:3]],
+        )
+
+
+class BookingStatisticsTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.customer = User.objects.create_user(
+            email='stats-customer@example.com',
+            username='stats-customer',
+            password='password123',
+        )
+        self.owner = User.objects.create_user(
+            email='stats-owner@example.com',
+            username='stats-owner',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+        self.location = Location.objects.create(
+            country='Україна',
+            city='Чернівці',
+            address='вул. Кобилянської 7',
+        )
+        self.listing = Listing.objects.create(
+            owner=self.owner,
+            title='Квартира для статистики бронювань',
+            description='Дуже довгий опис квартири, що перевищує мінімальну довжину.',
+            location=self.location,
+            property_type=PropertyType.APARTMENT,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('100.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+        self.listing_price = ListingPrice.objects.create(
+            listing=self.listing,
+            amount=Decimal('100.00'),
+        )
+        self.client = APIClient()
+        self._next_day = 1
+
+    def _create_booking(self, status):
+        check_in = date.today() + timedelta(days=self._next_day)
+        self._next_day += 2
+        return Booking.objects.create(
+            customer=self.customer,
+            listing=self.listing,
+            location=self.location,
+            check_in=check_in,
+            check_out=check_in + timedelta(days=1),
+            num_guests=1,
+            price_per_night=self.listing_price,
+            num_nights=1,
+            base_price=Decimal('100.00'),
+            platform_fee=Decimal('10.00'),
+            total_price=Decimal('110.00'),
+            status=status,
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+
+    def _statistics(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/bookings/statistics/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_statistics_are_computed_in_one_query(self):
+        self._create_booking(BookingStatus.PENDING)
+        confirmed = self._create_booking(BookingStatus.CONFIRMED)
+        self._create_booking(BookingStatus.CANCELLED)
+
+        with self.assertNumQueries(1):
+            stats = Booking.statistics(Booking.objects.all())
+
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['by_status']['waiting'], 1)
+        self.assertEqual(stats['by_status']['agreed'], 1)
+        self.assertEqual(stats['by_status']['canceled'], 1)
+        self.assertEqual(stats['by_time']['upcoming'], 2)
+        self.assertEqual(stats['total_revenue'], confirmed.total_price)
+
+    def test_snapshot_is_updated_incrementally(self):
+        pending = self._create_booking(BookingStatus.PENDING)
+        self._create_booking(BookingStatus.CONFIRMED)
+
+        owner_stats = self._statistics(self.owner)
+        self.assertEqual(owner_stats['total'], 2)
+        self.assertTrue(
+            BookingStats.objects.filter(user=self.owner, scope=BookingStatsScope.OWNER).exists()
+        )
+
+        # Статус змінився - рядок оновлено дельтою, без перерахунку
+        pending.status = BookingStatus.CONFIRMED
+        pending.save()
+        self._create_booking(BookingStatus.REJECTED)
+
+        expected = Booking.statistics(Booking.objects.filter(listing__owner=self.owner))
+        self.assertEqual(self._statistics(self.owner), expected)
+        self.assertEqual(expected['by_status']['agreed'], 2)
+        self.assertEqual(expected['by_status']['rejected'], 1)
+
+        customer_stats = self._statistics(self.customer)
+        self.assertEqual(customer_stats['total'], 3)
+
+        pending.delete()
+        stats = BookingStats.objects.get(user=self.customer, scope=BookingStatsScope.CUSTOMER)
+        self.assertEqual(stats.total_count, 2)
+        self.assertEqual(stats.confirmed_count, 1)
+        self.assertEqual(stats.total_revenue, Decimal('110.00'))
+
+
+class BookingTransitionTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.customer = User.objects.create_user(
+            email='transition-customer@example.com',
+            username='transition-customer',
+            password='password123',
+        )
+        self.owner = User.objects.create_user(
+            email='transition-owner@example.com',
+            username='transition-owner',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+        self.location = Location.objects.create(
+            country='Україна',
+            city='Івано-Франківськ',
+            address='вул. Незалежності 9',
+        )
+        self.listing = Listing.objects.create(
+            owner=self.owner,
+            title='Квартира для переходів статусів',
+            description='Дуже довгий опис квартири, що перевищує мінімальну довжину.',
+            location=self.location,
+            property_type=PropertyType.APARTMENT,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('100.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+        listing_price = ListingPrice.objects.create(listing=self.listing, amount=Decimal('100.00'))
+        self.check_in = date.today() + timedelta(days=3)
+        self.booking = Booking.objects.create(
+            customer=self.customer,
+            listing=self.listing,
+            location=self.location,
+            check_in=self.check_in,
+            check_out=self.check_in + timedelta(days=2),
+            num_guests=1,
+            price_per_night=listing_price,
+            num_nights=2,
+            base_price=Decimal('200.00'),
+            platform_fee=Decimal('20.00'),
+            total_price=Decimal('220.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+        Notification.objects.all().delete()
+        self.client = APIClient()
+
+    def _dates_free(self):
+        return ListingAvailability.is_range_available(
+            self.listing.pk, self.check_in, self.check_in + timedelta(days=2)
+        )
+
+    def test_approve_is_single_conditional_update(self):
+        self.client.force_authenticate(self.owner)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(f'/api/bookings/{self.booking.pk}/approve/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], BookingStatus.CONFIRMED)
+
+        updates = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('UPDATE "bookings_booking"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"bookings_booking"."status" =', updates[0].split('WHERE')[1])
+        self.assertFalse(any('"listings_listingprice"' in q['sql'] for q in ctx.captured_queries))
+
+        self.assertEqual(Notification.objects.filter(user=self.customer).count(), 1)
+        self.assertFalse(self._dates_free())
+
+    def test_cancel_releases_dates_and_updates_stats(self):
+        stats = BookingStats.for_user(self.owner.pk, BookingStatsScope.OWNER)
+        self.assertEqual(stats.pending_count, 1)
+
+        self.booking.transition(BookingStatus.CANCELLED, reason='Змінилися плани')
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, BookingStatus.CANCELLED)
+        self.assertEqual(self.booking.cancellation_reason, 'Змінилися плани')
+        self.assertIsNotNone(self.booking.cancelled_at)
+        self.assertTrue(self._dates_free())
+
+        stats.refresh_from_db()
+        self.assertEqual((stats.pending_count, stats.cancelled_count), (0, 1))
+
+    def test_concurrent_transition_is_rejected(self):
+        stale = Booking.objects.get(pk=self.booking.pk)
+        self.booking.transition(BookingStatus.CONFIRMED)
+
+        with self.assertRaises(BookingTransitionError) as ctx:
+            stale.transition(BookingStatus.REJECTED)
+        self.assertTrue(ctx.exception.conflict)
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, BookingStatus.CONFIRMED)
+
+    def test_invalid_transition_returns_400(self):
+        self.client.force_authenticate(self.owner)
+
+        response = self.client.post(f'/api/bookings/{self.booking.pk}/complete/')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data['error'],
+            'Can only complete bookings with "Підтверджено" or "В процесі" status',
+        )
+
+    def _change_status(self, data):
+        self.client.force_authenticate(self.owner)
+        return self.client.patch(
+            f'/api/bookings/{self.booking.pk}/change_status/', data, format='json'
+        )
+
+    def test_change_status_writes_other_fields_in_same_update(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._change_status({
+                'status': BookingStatus.CONFIRMED,
+                'cancellation_reason': 'Гість попередив про пізній заїзд',
+            })
+
+        self.assertEqual(response.status_code, 200)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, BookingStatus.CONFIRMED)
+        self.assertEqual(self.booking.cancellation_reason, 'Гість попередив про пізній заїзд')
+        updates = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('UPDATE "bookings_booking"')
+        ]
+        self.assertEqual(len(updates), 1)
+
+    def test_change_status_keeps_serializer_rules(self):
+        # Перехід, який дозволяв старий ендпоінт (таблиця переходів його не містить)
+        response = self._change_status({'status': BookingStatus.IN_PROGRESS})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], BookingStatus.IN_PROGRESS)
+
+        response = self._change_status({'status': BookingStatus.REJECTED})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', response.data)
+
+
+class BookingBatchFixtureMixin:
+    def setUp(self):
+        User = get_user_model()
+        self.customer = User.objects.create_user(
+            email='bulk-customer@example.com',
+            username='bulk-customer',
+            password='password123',
+        )
+        self.owner = User.objects.create_user(
+            email='bulk-owner@example.com',
+            username='bulk-owner',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+        self.other_owner = User.objects.create_user(
+            email='bulk-other-owner@example.com',
+            username='bulk-other-owner',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+        self.location = Location.objects.create(
+            country='Україна',
+            city='Чернівці',
+            address='вул. Кобилянської 12',
+        )
+        self.listing = self._listing(self.owner, 'Апартаменти для масових дій')
+        self.other_listing = self._listing(self.other_owner, 'Чужі апартаменти')
+
+        self.today = date.today()
+        self.bookings = [self._booking(self.listing, start) for start in (3, 6, 9)]
+        self.foreign = self._booking(self.other_listing, 3)
+        Notification.objects.all().delete()
+        self.client = APIClient()
+
+    def _listing(self, owner, title):
+        listing = Listing.objects.create(
+            owner=owner,
+            title=title,
+            description='Дуже довгий опис квартири, що перевищує мінімальну довжину.',
+            location=self.location,
+            property_type=PropertyType.APARTMENT,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('100.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+        ListingPrice.objects.create(listing=listing, amount=Decimal('100.00'))
+        return listing
+
+    def _booking(self, listing, start):
+        return Booking.objects.create(
+            customer=self.customer,
+            listing=listing,
+            location=self.location,
+            check_in=self.today + timedelta(days=start),
+            check_out=self.today + timedelta(days=start + 2),
+            num_guests=1,
+        )
+
+
+class BookingBulkTransitionTests(BookingBatchFixtureMixin, TestCase):
+    def _bulk(self, user, ids, new_status, **extra):
+        self.client.force_authenticate(user)
+        return self.client.post(
+            '/api/bookings/bulk_transition/',
+            {'ids': ids, 'status': new_status, **extra},
+            format='json',
+        )
+
+    def test_bulk_approve_reports_per_id_results(self):
+        self.bookings[2].transition(BookingStatus.CONFIRMED)
+        Notification.objects.all().delete()
+        stats = BookingStats.for_user(self.owner.pk, BookingStatsScope.OWNER)
+        ids = [booking.pk for booking in self.bookings] + [self.foreign.pk, 999999]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._bulk(self.owner, ids, BookingStatus.CONFIRMED)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['updated'], response.data['failed']), (2, 3))
+        results = {row['id']: row for row in response.data['results']}
+        self.assertTrue(results[self.bookings[0].pk]['success'])
+        self.assertTrue(results[self.bookings[1].pk]['success'])
+        self.assertEqual(
+            results[self.bookings[2].pk]['error'],
+            'Can only approve bookings with "Очікує підтвердження" status',
+        )
+        self.assertEqual(results[self.foreign.pk]['error'], 'Not found')
+        self.assertEqual(results[999999]['error'], 'Not found')
+
+        booking_updates = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('UPDATE "bookings_booking"')
+        ]
+        notification_inserts = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('INSERT INTO "notifications_notification"')
+        ]
+        self.assertEqual(len(booking_updates), 1)
+        self.assertEqual(len(notification_inserts), 1)
+        self.assertEqual(Notification.objects.filter(user=self.customer).count(), 2)
+
+        stats.refresh_from_db()
+        self.assertEqual((stats.pending_count, stats.confirmed_count), (0, 3))
+        self.assertEqual(
+            Booking.objects.get(pk=self.foreign.pk).status, BookingStatus.PENDING
+        )
+
+    def test_bulk_cancel_releases_dates(self):
+        ids = [booking.pk for booking in self.bookings]
+
+        response = self._bulk(self.customer, ids, BookingStatus.CANCELLED, reason='Змінилися плани')
+
+        self.assertEqual(response.data['updated'], 3)
+        for booking in self.bookings:
+            self.assertTrue(ListingAvailability.is_range_available(
+                self.listing.pk, booking.check_in, booking.check_out
+            ))
+        self.assertEqual(
+            set(Booking.objects.filter(pk__in=ids).values_list('cancellation_reason', flat=True)),
+            {'Змінилися плани'},
+        )
+
+    def test_customer_cannot_bulk_approve(self):
+        response = self._bulk(self.customer, [self.bookings[0].pk], BookingStatus.CONFIRMED)
+
+        self.assertEqual(response.data['updated'], 0)
+        self.assertEqual(
+            response.data['results'][0]['error'],
+            'You do not have permission to change this booking',
+        )
+        self.assertFalse(Notification.objects.exists())
+
+    def test_stale_rows_are_reported_as_conflicts(self):
+        stale = list(Booking.objects.select_related('listing').filter(listing=self.listing))
+        self.bookings[0].transition(BookingStatus.REJECTED)
+
+        changed, errors = Booking.bulk_transition(stale, BookingStatus.CONFIRMED)
+
+        self.assertEqual(len(changed), 2)
+        self.assertTrue(errors[self.bookings[0].pk].conflict)
+        self.assertEqual(
+            Booking.objects.get(pk=self.bookings[0].pk).status, BookingStatus.REJECTED
+        )
+
+
+class AdvanceBookingsCommandTests(BookingBatchFixtureMixin, TestCase):
+    def _move(self, booking, check_in=None, check_out=None, created_days_ago=None):
+        values = {}
+        if check_in is not None:
+            values['check_in'] = self.today + timedelta(days=check_in)
+            values['check_out'] = self.today + timedelta(days=check_out)
+        if created_days_ago is not None:
+            values['created_at'] = timezone.now() - timedelta(days=created_days_ago)
+        Booking.objects.filter(pk=booking.pk).update(**values)
+
+    def _advance(self):
+        out = StringIO()
+        call_command('advance_bookings', batch_size=1, stdout=out)
+        return out.getvalue()
+
+    def test_time_based_transitions(self):
+        stale, fresh, started = self.bookings
+        finished = self.foreign
+        for booking in (started, finished):
+            booking.transition(BookingStatus.CONFIRMED)
+        Notification.objects.all().delete()
+        stats = BookingStats.for_user(self.owner.pk, BookingStatsScope.OWNER)
+
+        self._move(stale, created_days_ago=3)
+        self._move(started, check_in=-1, check_out=1)
+        self._move(finished, check_in=-5, check_out=-1)
+
+        self._advance()
+
+        statuses = dict(Booking.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[stale.pk], BookingStatus.EXPIRED)
+        self.assertEqual(statuses[fresh.pk], BookingStatus.PENDING)
+        self.assertEqual(statuses[started.pk], BookingStatus.IN_PROGRESS)
+        self.assertEqual(statuses[finished.pk], BookingStatus.COMPLETED)
+
+        self.assertTrue(ListingAvailability.is_range_available(
+            self.listing.pk, stale.check_in, stale.check_out
+        ))
+        self.assertEqual(Notification.objects.filter(user=self.customer).count(), 3)
+        stats.refresh_from_db()
+        self.assertEqual(
+            (stats.pending_count, stats.confirmed_count, stats.in_progress_count), (1, 0, 1)
+        )
+
+        # Повторний запуск нічого не змінює
+        self._advance()
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_stay_in_progress_keeps_revenue_and_current_bucket(self):
+        started = self.bookings[0]
+        started.transition(BookingStatus.CONFIRMED)
+        self._move(started, check_in=-1, check_out=1)
+        stats = BookingStats.for_user(self.owner.pk, BookingStatsScope.OWNER)
+        revenue = stats.total_revenue
+
+        Booking.advance_by_time()
+
+        stats.refresh_from_db()
+        self.assertEqual((stats.confirmed_count, stats.in_progress_count), (0, 1))
+        self.assertEqual(stats.total_revenue, revenue)
+        self.assertEqual(stats.total_revenue, started.total_price)
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.get('/api/bookings/statistics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['by_status']['in_progress'], 1)
+        self.assertEqual(response.data['by_time']['current'], 1)
+        self.assertEqual(response.data['total_revenue'], started.total_price)
+        self.assertEqual(
+            response.data,
+            Booking.statistics(Booking.objects.filter(listing__owner=self.owner)),
+        )
+
+    def test_pending_booking_expires_when_check_in_arrives(self):
+        self._move(self.bookings[0], check_in=0, check_out=2)
+
+        counts = Booking.advance_by_time()
+
+        self.assertEqual(counts[BookingStatus.EXPIRED], 1)
+        self.assertEqual(
+            Booking.objects.get(pk=self.bookings[0].pk).status, BookingStatus.EXPIRED
+        )
+
+
+class BookingReserveConcurrencyTests(TransactionTestCase):
+    THREADS = 12
+    ROUNDS = 3
+
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(
+            email='reserve-owner@example.com',
+            username='reserve-owner',
+            password='password123',
+        )
+        self.customers = [
+            User.objects.create_user(
+                email=f'reserve-customer-{index}@example.com',
+                username=f'reserve-customer-{index}',
+            )
+            for index in range(self.THREADS)
+        ]
+        self.location = Location.objects.create(
+            country='Україна',
+            city='Ужгород',
+            address='вул. Корзо 3',
+        )
+        self.listing = Listing.objects.create(
+            owner=self.owner,
+            title='Квартира для паралельних бронювань',
+            description='Дуже довгий опис квартири, що перевищує мінімальну довжину.',
+            location=self.location,
+            property_type=PropertyType.APARTMENT,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('100.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+        ListingPrice.objects.create(listing=self.listing, amount=Decimal('100.00'))
+        self.today = date.today()
+
+    def _fields(self, customer, start, end):
+        return {
+            'customer': customer,
+            'listing': self.listing,
+            'location': self.location,
+            'check_in': self.today + timedelta(days=start),
+            'check_out': self.today + timedelta(days=end),
+            'num_guests': 1,
+        }
+
+    def _run_concurrently(self, ranges):
+        """Запустити Booking.reserve з усіх потоків одночасно"""
+        barrier = threading.Barrier(len(ranges))
+        outcomes = []
+
+        def worker(customer, start, end):
+            try:
+                barrier.wait()
+                Booking.reserve(**self._fields(customer, start, end))
+                outcomes.append('created')
+            except BookingConflictError as exc:
+                outcomes.append('busy' if exc.busy else 'conflict')
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=worker, args=(customer, start, end))
+            for customer, (start, end) in zip(self.customers, ranges)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def _assert_no_double_booking(self):
+        bookings = list(Booking.objects.filter(listing=self.listing).order_by('check_in'))
+        for previous, current in zip(bookings, bookings[1:]):
+            self.assertLessEqual(previous.check_out, current.check_in)
+
+        availability = ListingAvailability.objects.get(listing=self.listing)
+        nights = sum((b.check_out - b.check_in).days for b in bookings)
+        self.assertEqual(bin(availability.bits).count('1'), nights)
+        return bookings
+
+    def test_same_dates_are_booked_once(self):
+        for round_index in range(self.ROUNDS):
+            start = 10 + round_index * 5
+            outcomes = self._run_concurrently([(start, start + 3)] * self.THREADS)
+
+            self.assertEqual(len(outcomes), self.THREADS)
+            self.assertLessEqual(outcomes.count('created'), 1)
+
+        bookings = self._assert_no_double_booking()
+        self.assertGreaterEqual(len(bookings), 1)
+
+    def test_overlapping_ranges_never_double_book(self):
+        # Кожен діапазон перетинається з сусідніми
+        ranges = [(20 + index, 23 + index) for index in range(self.THREADS)]
+        outcomes = self._run_concurrently(ranges)
+
+        self.assertEqual(len(outcomes), self.THREADS)
+        bookings = self._assert_no_double_booking()
+        self.assertEqual(len(bookings), outcomes.count('created'))
+
+    def test_booked_dates_fail_fast_without_lock(self):
+        Booking.reserve(**self._fields(self.customers[0], 5, 8))
+
+        with CaptureQueriesContext(connection) as ctx:
+            with self.assertRaises(BookingConflictError) as raised:
+                Booking.reserve(**self._fields(self.customers[1], 6, 7))
+
+        self.assertFalse(raised.exception.busy)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_only_lock_errors_are_reported_as_busy(self):
+        fields = self._fields(self.customers[0], 30, 32)
+
+        with patch.object(ListingAvailability, 'lock', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(BookingConflictError) as raised:
+                Booking.reserve(**fields)
+        self.assertTrue(raised.exception.busy)
+
+        with patch.object(ListingAvailability, 'lock', side_effect=OperationalError('no such table: x')):
+            with self.assertRaises(OperationalError):
+                Booking.reserve(**fields)
+
+
+class BookingStatsConcurrencyTests(BookingBatchFixtureMixin, TransactionTestCase):
+    def test_change_during_first_compute_is_not_lost(self):
+        booking = self.bookings[0]
+        BookingStats.objects.all().delete()
+        compute = BookingStats.compute
+        computed = threading.Event()
+
+        def slow_compute(user_id, scope):
+            values = compute(user_id, scope)
+            computed.set()
+            # Паралельна зміна статусу встигає стартувати до запису зрізу
+            time.sleep(0.5)
+            return values
+
+        def change_status():
+            try:
+                computed.wait(5)
+                Booking.objects.get(pk=booking.pk).transition(BookingStatus.CONFIRMED)
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=change_status)
+        thread.start()
+        with patch.object(BookingStats, 'compute', side_effect=slow_compute):
+            BookingStats.for_user(self.owner.pk, BookingStatsScope.OWNER)
+        thread.join()
+
+        stats = BookingStats.objects.get(user=self.owner, scope=BookingStatsScope.OWNER)
+        expected = BookingStats.compute(self.owner.pk, BookingStatsScope.OWNER)
+        self.assertEqual(expected['confirmed_count'], 1)
+        self.assertEqual(
+            {field: getattr(stats, field) for field in expected},
+            expected,
+        )
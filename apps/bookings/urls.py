@@ -46,6 +46,7 @@ POST    /api/bookings/{id}/cancel/              - Скасувати (customer/o
 POST    /api/bookings/{id}/complete/            - Завершити (owner/admin)
 PATCH   /api/bookings/{id}/change_status/       - Змінити статус (owner/admin)
 POST    /api/bookings/{id}/change_status/       - Змінити статус (owner/admin)
+POST    /api/bookings/bulk_transition/          - Змінити статус багатьох бронювань
 
 
 СТАТИСТИКА ТА ДОДАТКОВО:
@@ -127,7 +128,32 @@ GET     /api/calendar/by_listing/               - Бронювання конк
    }
 
 
-5. СТАТИСТИКА:
+5. МАСОВА ЗМІНА СТАТУСУ:
+   ────────────────────────────────────────────────────────────────────────
+   POST /api/bookings/bulk_transition/
+   Authorization: Bearer <token>
+
+   Request Body:
+   {
+       "ids": [123, 124, 125],
+       "status": "confirmed",
+       "reason": ""
+   }
+
+   Response:
+   {
+       "status": "confirmed",
+       "updated": 2,
+       "failed": 1,
+       "results": [
+           {"id": 123, "success": true},
+           {"id": 124, "success": true},
+           {"id": 125, "success": false, "error": "Can only approve bookings with \"waiting\" status"}
+       ]
+   }
+
+
+6. СТАТИСТИКА:
    ────────────────────────────────────────────────────────────────────────
    GET /api/bookings/statistics/
    Authorization: Bearer <token>
@@ -138,6 +164,7 @@ GET     /api/calendar/by_listing/               - Бронювання конк
        "by_status": {
            "waiting": 5,
            "agreed": 10,
+           "in_progress": 2,
            "rejected": 3,
            "canceled": 7,
            "completed": 20
@@ -151,7 +178,7 @@ GET     /api/calendar/by_listing/               - Бронювання конк
    }
 
 
-6. КАЛЕНДАР ДЛЯ ОГОЛОШЕННЯ:
+7. КАЛЕНДАР ДЛЯ ОГОЛОШЕННЯ:
    ────────────────────────────────────────────────────────────────────────
    GET /api/calendar/by_listing/?listing_id=10
 
@@ -3,23 +3,27 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from django.conf import settings
 from django.db.models import Q, Count
 from django.utils import timezone
 
-from .models import Booking
+from .models import Booking, BookingStats, BookingTransitionError
 from .serializers import (
     BookingSerializer,
     BookingListSerializer,
     BookingCreateSerializer,
     BookingUpdateSerializer,
-    BookingStatusUpdateSerializer
+    BookingStatusUpdateSerializer,
+    BookingBulkTransitionSerializer,
 )
 from .permissions import (
     IsCustomerOrListingOwnerOrAdmin,
     IsListingOwnerOrAdmin,
     IsCustomerRole,
 )
-from apps.common.enums import BookingStatus
+from apps.common.enums import BookingStatsScope, BookingStatus
+from apps.common.pagination import KeysetPagination
+from apps.listings.models import Listing
 
 
 class BookingViewSet(viewsets.ModelViewSet):
@@ -41,6 +45,8 @@ class BookingViewSet(viewsets.ModelViewSet):
         'listing__location',
         'location',
 
+    ).prefetch_related(
+        Listing.main_photo_prefetch('listing__photos'),  # ✅ головне фото без N+1
     ).all()
 
     permission_classes = [permissions.IsAuthenticated]
@@ -79,6 +85,8 @@ class BookingViewSet(viewsets.ModelViewSet):
         'status'
     ]
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
+    keyset_ordering_fields = ['created_at', 'check_in', 'check_out']
 
     def get_serializer_class(self):
         """
@@ -160,7 +168,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         if instance.status != BookingStatus.PENDING:
             from rest_framework.exceptions import ValidationError
             raise ValidationError(
-                "Can only delete bookings with 'waiting' status"
+                f"Can only delete bookings with '{BookingStatus.PENDING.label}' status"
             )
 
         instance.delete()
@@ -306,21 +314,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         POST /api/bookings/{id}/approve/
         Тільки для власника оголошення або адміна
         """
-        booking = self.get_object()
-
-        # Перевірка поточного статусу
-        if booking.status != BookingStatus.PENDING:
-            return Response(
-                {'error': 'Can only approve bookings with "waiting" status'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Зміна статусу
-        booking.status = BookingStatus.CONFIRMED
-        booking.save()
-
-        serializer = BookingSerializer(booking)
-        return Response(serializer.data)
+        return self._transition(self.get_object(), BookingStatus.CONFIRMED)
 
     @action(detail=True, methods=['post'])
     def reject(self, request, pk=None):
@@ -330,26 +324,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         Body: {"reason": "..."} (optional)
         Тільки для власника оголошення або адміна
         """
-        booking = self.get_object()
-
-        # Перевірка поточного статусу
-        if booking.status != BookingStatus.PENDING:
-            return Response(
-                {'error': 'Can only reject bookings with "waiting" status'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Отримуємо причину з request (опціонально)
-        reason = request.data.get('reason', '')
-        if reason:
-            booking.notes = f"{booking.notes}\n\nRejection reason: {reason}".strip()
-
-        # Зміна статусу
-        booking.status = BookingStatus.REJECTED
-        booking.save()
-
-        serializer = BookingSerializer(booking)
-        return Response(serializer.data)
+        return self._transition(self.get_object(), BookingStatus.REJECTED, reason=request.data.get('reason', ''))
 
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
@@ -359,34 +334,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         Body: {"reason": "..."} (optional)
         Для клієнта або власника оголошення або адміна
         """
-        booking = self.get_object()
-
-        # Перевірка поточного статусу
-        if booking.status in [BookingStatus.CANCELLED, BookingStatus.COMPLETED]:
-            return Response(
-                {'error': f'Cannot cancel booking with "{booking.status}" status'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Перевірка дати (не можна скасувати якщо вже почалось)
-        today = timezone.now().date()
-        if booking.check_in <= today:
-            return Response(
-                {'error': 'Cannot cancel booking that has already started'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Отримуємо причину з request (опціонально)
-        reason = request.data.get('reason', '')
-        if reason:
-            booking.notes = f"{booking.notes}\n\nCancellation reason: {reason}".strip()
-
-        # Зміна статусу
-        booking.status = BookingStatus.CANCELLED
-        booking.save()
-
-        serializer = BookingSerializer(booking)
-        return Response(serializer.data)
+        return self._transition(self.get_object(), BookingStatus.CANCELLED, reason=request.data.get('reason', ''))
 
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
@@ -395,27 +343,22 @@ class BookingViewSet(viewsets.ModelViewSet):
         POST /api/bookings/{id}/complete/
         Тільки для власника оголошення або адміна
         """
-        booking = self.get_object()
+        return self._transition(self.get_object(), BookingStatus.COMPLETED)
 
-        # Перевірка поточного статусу
-        if booking.status != BookingStatus.CONFIRMED:
-            return Response(
-                {'error': 'Can only complete bookings with "agreed" status'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+    def _transition(self, booking, new_status, reason='', **options):
+        """
+        ✅ Зміна статусу одним умовним UPDATE (без save()/full_clean())
 
-        # Перевірка дати (має закінчитись)
-        today = timezone.now().date()
-        if booking.check_out > today:
+        400 - перехід не дозволений, 409 - статус вже змінив інший запит
+        """
+        try:
+            booking.transition(new_status, reason=reason, **options)
+        except BookingTransitionError as exc:
             return Response(
-                {'error': 'Cannot complete booking before check-out date'},
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': exc.message},
+                status=status.HTTP_409_CONFLICT if exc.conflict else status.HTTP_400_BAD_REQUEST
             )
 
-        # Зміна статусу
-        booking.status = BookingStatus.COMPLETED
-        booking.save()
-
         serializer = BookingSerializer(booking)
         return Response(serializer.data)
 
@@ -428,7 +371,11 @@ class BookingViewSet(viewsets.ModelViewSet):
         """
         Змінити статус бронювання власником оголошення
         PATCH /api/bookings/{id}/change_status/
-        Тіло: {"status": "confirmed" | "rejected" | "cancelled" | "completed"}
+        Тіло: {"status": "confirmed" | "rejected" | "cancelled" | "completed",
+               "cancellation_reason": "..."}
+
+        Правила переходів - BookingStatusUpdateSerializer; статус і решта полів
+        записуються одним умовним UPDATE (409, якщо статус змінив інший запит).
         """
         booking = self.get_object()
 
@@ -439,9 +386,88 @@ class BookingViewSet(viewsets.ModelViewSet):
             context={'request': request}
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
 
-        return Response(BookingSerializer(booking).data)
+        new_status = serializer.validated_data.get('status')
+        if new_status is None or new_status == booking.status:
+            serializer.save()
+            return Response(BookingSerializer(booking).data)
+
+        fields = {
+            field: value for field, value in serializer.validated_data.items()
+            if field != 'status'
+        }
+        return self._transition(booking, new_status, fields=fields, validated=True)
+
+    @action(detail=False, methods=['post'])
+    def bulk_transition(self, request):
+        """
+        ✅ Змінити статус багатьох бронювань одним запитом
+        POST /api/bookings/bulk_transition/
+        Тіло: {"ids": [1, 2, 3], "status": "confirmed", "reason": "..."}
+
+        Права перевіряються одним запитом для всієї пачки; статуси змінюються
+        set-based UPDATE-ами, сповіщення - одним bulk_create.
+        Відповідь - результат для кожного id:
+            {"id": 1, "success": true} / {"id": 2, "success": false, "error": "..."}
+        """
+        serializer = BookingBulkTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        new_status = serializer.validated_data['status']
+
+        user = request.user
+        bookings = {
+            booking.pk: booking
+            for booking in Booking.objects.select_related('listing').filter(pk__in=ids)
+        }
+
+        errors = {}
+        allowed = []
+        for booking_id in ids:
+            booking = bookings.get(booking_id)
+            if booking is None or not self._can_view(user, booking):
+                errors[booking_id] = 'Not found'
+            elif not self._can_transition(user, booking, new_status):
+                errors[booking_id] = 'You do not have permission to change this booking'
+            else:
+                allowed.append(booking)
+
+        changed, failed = Booking.bulk_transition(
+            allowed,
+            new_status,
+            reason=serializer.validated_data['reason'],
+        )
+        errors.update({booking_id: exc.message for booking_id, exc in failed.items()})
+
+        results = []
+        for booking_id in ids:
+            if booking_id in errors:
+                results.append({'id': booking_id, 'success': False, 'error': errors[booking_id]})
+            else:
+                results.append({'id': booking_id, 'success': True})
+
+        return Response({
+            'status': new_status,
+            'updated': len(changed),
+            'failed': len(errors),
+            'results': results,
+        })
+
+    @staticmethod
+    def _can_view(user, booking):
+        """Бронювання входить у get_queryset() користувача"""
+        if user.is_admin():
+            return True
+        return booking.customer_id == user.pk or (
+            user.is_owner() and booking.listing.owner_id == user.pk
+        )
+
+    @staticmethod
+    def _can_transition(user, booking, new_status):
+        """Ті ж правила, що й у approve/reject/complete (власник) та cancel"""
+        if user.is_admin() or booking.listing.owner_id == user.pk:
+            return True
+        return new_status == BookingStatus.CANCELLED and booking.customer_id == user.pk
 
     # ============================================
     # CUSTOM ACTIONS - СТАТИСТИКА
@@ -454,45 +480,22 @@ class BookingViewSet(viewsets.ModelViewSet):
         GET /api/bookings/statistics/
         """
         queryset = self.get_queryset()
+        user = request.user
 
-        # Якщо owner - статистика для його оголошень
-        if request.user.is_owner() and not request.user.is_admin():
-            queryset = queryset.filter(listing__owner=request.user)
-        # Якщо customer - статистика його бронювань
-        elif not request.user.is_admin():
-            queryset = queryset.filter(customer=request.user)
+        if user.is_admin():
+            # ✅ Одним запитом (умовна агрегація)
+            return Response(Booking.statistics(queryset))
 
-        today = timezone.now().date()
+        # Owner - статистика його оголошень, customer - його бронювань
+        scope = BookingStatsScope.OWNER if user.is_owner() else BookingStatsScope.CUSTOMER
+        queryset = queryset.filter(BookingStats.scope_filter(user.pk, scope))
 
-        stats = {
-            'total': queryset.count(),
-            'by_status': {
-                'waiting': queryset.filter(status=BookingStatus.PENDING).count(),
-                'agreed': queryset.filter(status=BookingStatus.CONFIRMED).count(),
-                'rejected': queryset.filter(status=BookingStatus.REJECTED).count(),
-                'canceled': queryset.filter(status=BookingStatus.CANCELLED).count(),
-                'completed': queryset.filter(status=BookingStatus.COMPLETED).count(),
-            },
-            'by_time': {
-                'upcoming': queryset.filter(
-                    check_in__gte=today,
-                    status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED]
-                ).count(),
-                'current': queryset.filter(
-                    check_in__lte=today,
-                    check_out__gte=today,
-                    status=BookingStatus.CONFIRMED
-                ).count(),
-                'past': queryset.filter(check_out__lt=today).count(),
-            },
-            'total_revenue': sum(
-                booking.total_price for booking in queryset.filter(
-                    status__in=[BookingStatus.CONFIRMED, BookingStatus.COMPLETED]
-                )
-            ),
-        }
+        if not settings.BOOKING_STATS_SNAPSHOTS:
+            return Response(Booking.statistics(queryset))
 
-        return Response(stats)
+        # ✅ Статуси і виручка - з матеріалізованого рядка, часові кошики - одним запитом
+        stats = BookingStats.for_user(user.pk, scope)
+        return Response(stats.as_statistics(Booking.time_statistics(queryset)))
 
     @action(detail=True, methods=['get'])
     def can_review(self, request, pk=None):
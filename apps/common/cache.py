@@ -0,0 +1,323 @@
+"""
+✅ Кеш відповідей публічних read-ендпоінтів з інвалідацією за тегами
+
+1. Відповідь (response.data) зберігається разом з версіями своїх тегів:
+   listing:<id>, owner:<id>, city:<назва>, або колекційними (top-listings, ...)
+2. Версія тегу - окремий ключ у кеші; invalidate_tags() просто видаляє його
+   (ще раз - після коміту транзакції запису)
+3. Версії тегів читаються (створюються) ДО обчислення відповіді - якщо тег
+   інвалідовано під час обчислення, запис збережеться вже зі старою версією
+4. При читанні версії тегів запису звіряються з поточними (один get_many) -
+   якщо хоч один тег інвалідовано, це промах і відповідь обчислюється заново
+
+cached_value() кешує так само довільні значення (id результатів пошуку тощо).
+
+Працює з будь-яким бекендом Django, але інвалідація бачить тільки свій кеш:
+з кількома процесами (gunicorn workers, run_workers) потрібен спільний
+бекенд (file, redis...) - locmem у кожного процесу свій.
+Налаштування: settings.RESPONSE_CACHE
+- ENABLED: вмикає кеш (у тестах за замовчуванням вимкнено)
+- ALIAS: який кеш з settings.CACHES використовувати
+- KEY_PREFIX: префікс усіх ключів
+"""
+
+import hashlib
+import logging
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESPONSE_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'KEY_PREFIX': 'respcache',
+}
+
+# Теги колекцій (топи, популярні запити) - змінюються від будь-якого запису
+TAG_TOP_LISTINGS = 'top-listings'
+TAG_TOP_OWNERS = 'top-owners'
+TAG_SEARCH_QUERIES = 'search-queries'
+# Нове місто (нова локація) може підпасти під будь-який фільтр ?city= пошуку
+TAG_SEARCH_CITIES = 'search-cities'
+
+# Версії тегів живуть довше за будь-який запис
+TAG_VERSION_TIMEOUT = None
+
+
+def _options():
+    return {**DEFAULT_RESPONSE_CACHE_SETTINGS, **getattr(settings, 'RESPONSE_CACHE', {})}
+
+
+def response_cache_enabled() -> bool:
+    return _options()['ENABLED']
+
+
+def _cache():
+    return caches[_options()['ALIAS']]
+
+
+def _key(*parts) -> str:
+    return ':'.join([_options()['KEY_PREFIX'], *map(str, parts)])
+
+
+def listing_tag(listing_id) -> str:
+    return f'listing:{listing_id}'
+
+
+def owner_tag(owner_id) -> str:
+    return f'owner:{owner_id}'
+
+
+def city_tag(city) -> str:
+    # Назва міста - частина ключа кешу, тому нормалізується і хешується
+    normalized = (city or '').strip().casefold()
+    return f'city:{hashlib.md5(normalized.encode()).hexdigest()[:16]}'
+
+
+def search_city_tag(city) -> str:
+    """Результати пошуку, які може змінити оголошення в цьому місті"""
+    return f'search-{city_tag(city)}'
+
+
+def search_band_tag(band) -> str:
+    """Результати пошуку, які може змінити оголошення в ціновому діапазоні band"""
+    return f'search-price:{band}'
+
+
+# ============================================
+# ВЕРСІЇ ТЕГІВ
+# ============================================
+
+def _tag_versions(tags, create=False) -> dict:
+    """
+    Поточні версії тегів
+
+    Args:
+        create: Створити версію для тегів, яких ще немає в кеші
+    """
+    cache = _cache()
+    keys = {_key('tag', tag): tag for tag in tags}
+    found = cache.get_many(keys)
+    versions = {keys[key]: value for key, value in found.items()}
+
+    if create:
+        for key, tag in keys.items():
+            if tag not in versions:
+                token = uuid.uuid4().hex[:12]
+                # add() не перезапише версію, створену паралельним запитом
+                if not cache.add(key, token, TAG_VERSION_TIMEOUT):
+                    token = cache.get(key, token)
+                versions[tag] = token
+    return versions
+
+
+def invalidate_tags(*tags):
+    """
+    ✅ Інвалідувати всі записи кешу з будь-яким із цих тегів
+
+    Всередині транзакції теги інвалідуються одразу і ще раз після коміту:
+    запит, що встиг між ними прочитати старі дані з БД, збереже їх під
+    версією, яку видалить друга інвалідація.
+    """
+    tags = {tag for tag in tags if tag}
+    if not tags or not response_cache_enabled():
+        return
+
+    _delete_tag_versions(tags)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _delete_tag_versions(tags))
+
+
+def _delete_tag_versions(tags):
+    try:
+        _cache().delete_many([_key('tag', tag) for tag in tags])
+    except Exception:
+        logger.exception('Failed to invalidate cache tags %s', sorted(tags))
+
+
+# ============================================
+# ЛІЧИЛЬНИКИ HIT / MISS
+# ============================================
+
+def _count(name, outcome):
+    cache = _cache()
+    key = _key('stats', name, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Лічильника ще немає (або його витіснено)
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def cache_stats() -> dict:
+    """
+    Лічильники кешу по ендпоінтах
+
+    Returns:
+        dict: {name: {'hits', 'misses', 'hit_rate'}}
+    """
+    cache = _cache()
+    names = cache.get(_key('stats', 'names')) or []
+    counters = cache.get_many([_key('stats', name, outcome)
+                               for name in names for outcome in ('hits', 'misses')])
+
+    stats = {}
+    for name in names:
+        hits = counters.get(_key('stats', name, 'hits'), 0)
+        misses = counters.get(_key('stats', name, 'misses'), 0)
+        total = hits + misses
+        stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+        }
+    return stats
+
+
+def _register_name(name):
+    cache = _cache()
+    key = _key('stats', 'names')
+    names = cache.get(key) or []
+    if name not in names:
+        cache.set(key, sorted([*names, name]), None)
+
+
+# ============================================
+# КЕШУВАННЯ ЗНАЧЕНЬ (не відповідей)
+# ============================================
+
+def cached_value(name, signature, timeout, tags, compute):
+    """
+    ✅ Значення з кешу з тегами; при промаху - compute()
+
+    Args:
+        name: Назва (префікс ключів і лічильників)
+        signature: Рядок, що однозначно описує значення (хешується в ключ)
+        timeout: TTL запису
+        tags: callable() -> iterable тегів запису (викликається до compute)
+        compute: callable() -> (value, cacheable)
+
+    Returns:
+        Значення (кешоване або щойно обчислене)
+    """
+    if not response_cache_enabled():
+        return compute()[0]
+
+    cache = _cache()
+    key = _key('value', name, hashlib.sha1(signature.encode()).hexdigest())
+
+    try:
+        entry = cache.get(key)
+        if entry is not None and _tag_versions(entry['tags']) == entry['tags']:
+            _count(name, 'hits')
+            return entry['value']
+        _count(name, 'misses')
+        versions = _tag_versions(set(tags()), create=True)
+    except Exception:
+        logger.exception('Value cache read failed for %s', name)
+        return compute()[0]
+
+    value, cacheable = compute()
+    if cacheable:
+        try:
+            cache.set(key, {'value': value, 'tags': versions}, timeout)
+            _register_name(name)
+        except Exception:
+            logger.exception('Value cache write failed for %s', name)
+
+    return value
+
+
+# ============================================
+# КЕШУВАННЯ ВІДПОВІДЕЙ
+# ============================================
+
+def _request_key(name, request) -> str:
+    """Ключ запису: ендпоінт + шлях + відсортовані query-параметри"""
+    params = sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+    )
+    raw = f'{request.path}?{params}'
+    return _key('resp', name, hashlib.sha1(raw.encode()).hexdigest())
+
+
+def cached_response(name, timeout, tags=None, anonymous_only=False):
+    """
+    ✅ Декоратор методу view (get/list/retrieve) для кешування відповіді
+
+    Args:
+        name: Назва ендпоінту (префікс ключів і лічильників)
+        timeout: TTL запису (CACHE_TTL_* з apps.common.constants)
+        tags: callable(request, kwargs) -> iterable тегів запису
+            (викликається до обчислення відповіді)
+        anonymous_only: Кешувати тільки відповіді для гостей
+            (якщо відповідь залежить від користувача)
+
+    Кешуються тільки відповіді 200; відповідь має заголовок X-Cache: HIT/MISS.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if (
+                not response_cache_enabled()
+                or request.method != 'GET'
+                or (anonymous_only and request.user.is_authenticated)
+            ):
+                return method(view, request, *args, **kwargs)
+
+            try:
+                response = _cached_call(name, timeout, tags, method, view, request, args, kwargs)
+            except _CacheUnavailable:
+                response = method(view, request, *args, **kwargs)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class _CacheUnavailable(Exception):
+    pass
+
+
+def _cached_call(name, timeout, tags, method, view, request, args, kwargs):
+    cache = _cache()
+    key = _request_key(name, request)
+
+    try:
+        entry = cache.get(key)
+        if entry is not None and _tag_versions(entry['tags']) == entry['tags']:
+            _count(name, 'hits')
+            response = Response(entry['data'], status=entry['status'])
+            response['X-Cache'] = 'HIT'
+            return response
+        _count(name, 'misses')
+        versions = _tag_versions(set(tags(request, kwargs)) if tags else set(), create=True)
+    except Exception:
+        logger.exception('Response cache read failed for %s', name)
+        raise _CacheUnavailable
+
+    response = method(view, request, *args, **kwargs)
+    response['X-Cache'] = 'MISS'
+
+    if response.status_code == 200 and isinstance(response, Response):
+        try:
+            cache.set(key, {
+                'status': response.status_code,
+                'data': response.data,
+                'tags': versions,
+            }, timeout)
+            _register_name(name)
+        except Exception:
+            logger.exception('Response cache write failed for %s', name)
+
+    return response
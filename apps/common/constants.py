@@ -69,6 +69,8 @@ LISTING_PHOTO_MAX_SIZE_BYTES = LISTING_PHOTO_MAX_SIZE_MB * 1024 * 1024
 AMENITY_NAME_MAX_LENGTH = 100
 AMENITY_ICON_MAX_LENGTH = 50
 MAX_AMENITIES_PER_LISTING = 50
+# Біти маски зручностей Listing.amenity_mask (BigInteger зі знаком - 63 біти)
+AMENITY_MAX_COUNT = 63
 
 # ============================================
 # БРОНЮВАННЯ (BOOKINGS)
@@ -93,6 +95,27 @@ CANCELLATION_SUPER_STRICT_DAYS = 30
 # Спеціальні запити
 SPECIAL_REQUESTS_MAX_LENGTH = 1000
 
+# Масова зміна статусу (бронювань за один запит)
+BULK_TRANSITION_MAX_BOOKINGS = 200
+
+# Бронювання без відповіді власника стає EXPIRED через (годин)
+PENDING_BOOKING_EXPIRY_HOURS = 48
+
+# Пачка бронювань для фонових переходів статусів (advance_bookings)
+BOOKING_ADVANCE_BATCH_SIZE = 500
+
+# OperationalError, що означає зайнятий замок (Booking.reserve -> "спробуйте ще"):
+# фрагменти тексту помилки (SQLite/MySQL/PostgreSQL) і SQLSTATE PostgreSQL
+DB_LOCK_ERROR_MARKERS = (
+    'database is locked',
+    'database table is locked',
+    'lock wait timeout',
+    'lock timeout',
+    'could not obtain lock',
+    'deadlock',
+)
+DB_LOCK_ERROR_CODES = ('55P03', '40P01')
+
 # ============================================
 # ВІДГУКИ (REVIEWS)
 # ============================================
@@ -186,13 +209,31 @@ NOTIFICATIONS_PER_PAGE = 20
 SEARCH_QUERY_MIN_LENGTH = 2
 SEARCH_QUERY_MAX_LENGTH = 200
 
-# Результати пошуку
+# Результати пошуку (максимальний розмір сторінки)
 MAX_SEARCH_RESULTS = 100
+# Потоковий (NDJSON) пошук: оголошень в одній пачці з БД
+SEARCH_STREAM_CHUNK_SIZE = 200
 
 # Радіус пошуку (км)
 DEFAULT_SEARCH_RADIUS_KM = 10
 MAX_SEARCH_RADIUS_KM = 100
 
+# Межі цінових діапазонів фасету price: 0-50, 50-100, ..., 500+
+# (ті самі діапазони - для вибіркової інвалідації кешу результатів)
+SEARCH_FACET_PRICE_EDGES = (50, 100, 200, 500)
+
+# Кеш id результатів пошуку: TTL (сек) і максимум id в одному записі
+SEARCH_RESULT_CACHE_TTL = 60
+SEARCH_RESULT_CACHE_MAX_IDS = 5000
+
+# ============================================
+# АНАЛІТИКА (ANALYTICS)
+# ============================================
+
+# rollup_listing_views перечитує стільки id нижче watermark: паралельні flush-і
+# спула можуть закомітити менший id пізніше за більший
+ANALYTICS_ROLLUP_RESCAN_IDS = 5000
+
 # ============================================
 # ФАЙЛИ (FILES)
 # ============================================
@@ -404,6 +445,28 @@ FRONTEND_CONSTANTS = {
     }
 }
 
+# ============================================
+# ФОНОВІ ЗАДАЧІ (JOBS)
+# ============================================
+
+JOB_NAME_MAX_LENGTH = 100
+JOB_IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# Спроб до статусу FAILED і базова затримка повтору (x2 з кожною спробою)
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BACKOFF_SECONDS = 30
+
+# Задача RUNNING довше цього часу вважається покинутою (воркер впав)
+JOB_LOCK_TIMEOUT_SECONDS = 600
+
+# Виконані задачі зберігаються (днів) - ключі ідемпотентності періодичних задач
+JOB_RETENTION_DAYS = 7
+
+# Outbox подій: тип події, спроб доставки до "мертвої" події, зберігати доставлені (днів)
+OUTBOX_EVENT_TYPE_MAX_LENGTH = 50
+OUTBOX_MAX_ATTEMPTS = 10
+OUTBOX_RETENTION_DAYS = 7
+
 # ============================================
 # ВАЛІДАЦІЙНІ ПОВІДОМЛЕННЯ
 # ============================================
@@ -88,6 +88,42 @@ class BookingStatus(models.TextChoices):
     EXPIRED = 'expired', 'Прострочено'  # Не підтверджено вчасно
 
 
+# Статуси, в яких бронювання займає дати в календарі оголошення
+ACTIVE_BOOKING_STATUSES = (
+    BookingStatus.PENDING,
+    BookingStatus.CONFIRMED,
+    BookingStatus.IN_PROGRESS,
+)
+
+# Статуси, що враховуються у виручці
+REVENUE_BOOKING_STATUSES = (
+    BookingStatus.CONFIRMED,
+    BookingStatus.IN_PROGRESS,
+    BookingStatus.COMPLETED,
+)
+
+
+class BookingStatsScope(models.TextChoices):
+    """Зріз статистики бронювань користувача"""
+    OWNER = 'owner', 'Як власник'  # Бронювання його оголошень
+    CUSTOMER = 'customer', 'Як клієнт'  # Його власні бронювання
+
+
+class JobStatus(models.TextChoices):
+    """Стан фонової задачі (apps.jobs)"""
+    QUEUED = 'queued', 'В черзі'
+    RUNNING = 'running', 'Виконується'
+    DONE = 'done', 'Виконано'
+    FAILED = 'failed', 'Помилка'  # Вичерпано спроби
+
+
+class JobPriority(models.IntegerChoices):
+    """Пріоритет фонової задачі (більше - раніше)"""
+    LOW = 0, 'Низький'
+    NORMAL = 10, 'Звичайний'
+    HIGH = 20, 'Високий'
+
+
 class PaymentStatus(models.TextChoices):
     """Статуси платежу"""
     PENDING = 'pending', 'Pending'
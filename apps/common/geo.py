@@ -0,0 +1,264 @@
+"""
+✅ Гео-пошук по Location: geohash-індекс + точний haversine на кандидатах
+
+1. Location.geohash (B-tree індекс) - кожна точка кодується рядком, у якого
+   сусідні точки мають спільний префікс
+2. Область пошуку (радіус або вікно карти) покривається кількома geohash-комірками,
+   кандидати вибираються діапазонами по індексу (geohash >= cell AND geohash < cell + '~')
+3. Точна перевірка - межі lat/lng та haversine - тільки для кандидатів
+"""
+
+import math
+from functools import reduce
+from operator import or_
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
+
+from apps.common.constants import DEFAULT_SEARCH_RADIUS_KM, MAX_SEARCH_RADIUS_KM
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+GEOHASH_PRECISION = 12
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Максимальна кількість комірок покриття (більше комірок - точніше, але довший запит)
+MAX_COVER_CELLS = 16
+
+# Символ, більший за будь-який символ geohash (для діапазону префікса)
+_PREFIX_UPPER_BOUND = '~'
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION) -> str:
+    """Закодувати координати в geohash"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    latitude = float(latitude)
+    longitude = float(longitude)
+
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # парні біти - довгота
+
+    while len(chars) < precision:
+        value_range, value = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (value_range[0] + value_range[1]) / 2
+        if value >= middle:
+            bits = (bits << 1) | 1
+            value_range[0] = middle
+        else:
+            bits <<= 1
+            value_range[1] = middle
+
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(chars)
+
+
+def _cell_size(precision):
+    """Розмір комірки (градуси широти, градуси довготи)"""
+    total_bits = precision * 5
+    lat_bits = total_bits // 2
+    lng_bits = total_bits - lat_bits
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def _cell_centers(start, end, step, offset):
+    """Центри комірок сітки з кроком step, що перетинають [start, end]"""
+    first = math.floor((start + offset) / step)
+    last = math.floor((end + offset) / step)
+    return [index * step - offset + step / 2 for index in range(first, last + 1)]
+
+
+def geohash_cover(min_lat, min_lng, max_lat, max_lng) -> list:
+    """
+    Набір geohash-префіксів, що повністю покривають прямокутник
+
+    Обирається найточніша довжина, при якій комірок не більше MAX_COVER_CELLS.
+    """
+    min_lat, min_lng, max_lat, max_lng = map(float, (min_lat, min_lng, max_lat, max_lng))
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    min_lng, max_lng = max(min_lng, -180.0), min(max_lng, 180.0)
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lng = _cell_size(precision)
+        lat_centers = _cell_centers(min_lat, max_lat, cell_lat, 90.0)
+        lng_centers = _cell_centers(min_lng, max_lng, cell_lng, 180.0)
+
+        if len(lat_centers) * len(lng_centers) <= MAX_COVER_CELLS:
+            return sorted({
+                geohash_encode(
+                    min(max(lat, -90.0), 90.0),
+                    min(max(lng, -180.0), 180.0),
+                    precision
+                )
+                for lat in lat_centers
+                for lng in lng_centers
+            })
+
+    return ['']
+
+
+def radius_bbox(latitude, longitude, radius_km):
+    """Прямокутник, описаний навколо кола радіуса radius_km"""
+    latitude = float(latitude)
+    longitude = float(longitude)
+    delta_lat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    delta_lng = min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180.0)
+    return (
+        latitude - delta_lat,
+        longitude - delta_lng,
+        latitude + delta_lat,
+        longitude + delta_lng,
+    )
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> float:
+    """Відстань між двома точками по поверхні Землі (км)"""
+    lat1, lng1, lat2, lng2 = map(math.radians, map(float, (lat1, lng1, lat2, lng2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _distance_expression(latitude, longitude, prefix):
+    """Haversine-відстань (км) від точки до Location, обчислена в БД"""
+    lat_field = Radians(Cast(F(f'{prefix}latitude'), FloatField()))
+    lng_field = Radians(Cast(F(f'{prefix}longitude'), FloatField()))
+    lat = math.radians(float(latitude))
+    lng = math.radians(float(longitude))
+
+    a = (
+        Power(Sin((lat_field - lat) / 2), 2)
+        + math.cos(lat) * Cos(lat_field) * Power(Sin((lng_field - lng) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(Least(a, Value(1.0), output_field=FloatField())))
+
+
+def filter_bbox(queryset, min_lat, min_lng, max_lat, max_lng, prefix='location__'):
+    """
+    ✅ Оголошення (або локації) у прямокутнику карти
+
+    Args:
+        queryset: QuerySet з доступом до Location через prefix
+        prefix: Шлях до полів Location ('location__' для Listing, '' для Location)
+    """
+    cells = geohash_cover(min_lat, min_lng, max_lat, max_lng)
+    cell_filter = reduce(or_, [
+        Q(**{
+            f'{prefix}geohash__gte': cell,
+            f'{prefix}geohash__lt': cell + _PREFIX_UPPER_BOUND,
+        })
+        for cell in cells
+    ])
+
+    return queryset.filter(cell_filter).filter(**{
+        f'{prefix}latitude__gte': min_lat,
+        f'{prefix}latitude__lte': max_lat,
+        f'{prefix}longitude__gte': min_lng,
+        f'{prefix}longitude__lte': max_lng,
+    })
+
+
+def filter_radius(queryset, latitude, longitude, radius_km, prefix='location__'):
+    """
+    ✅ Оголошення в радіусі radius_km з анотацією distance_km
+
+    Кандидати - через geohash-покриття описаного прямокутника,
+    точна відстань - тільки для них.
+    """
+    radius_km = float(radius_km)
+    min_lat, min_lng, max_lat, max_lng = radius_bbox(latitude, longitude, radius_km)
+    candidates = filter_bbox(queryset, min_lat, min_lng, max_lat, max_lng, prefix=prefix)
+
+    return candidates.annotate(
+        distance_km=_distance_expression(latitude, longitude, prefix)
+    ).filter(distance_km__lte=radius_km)
+
+
+# ============================================
+# ПАРАМЕТРИ ЗАПИТУ (lat/lng/radius_km, min_lat/min_lng/max_lat/max_lng)
+# ============================================
+
+RADIUS_PARAMS = ('lat', 'lng')
+BBOX_PARAMS = ('min_lat', 'min_lng', 'max_lat', 'max_lng')
+
+
+def geo_param_errors(params) -> dict:
+    """
+    Перевірити гео-параметри пошуку
+
+    Args:
+        params: dict з уже приведеними до чисел значеннями (None = не задано)
+
+    Returns:
+        dict: {поле: повідомлення} (порожній, якщо все коректно)
+    """
+    errors = {}
+
+    for name, limit in (('lat', 90), ('lng', 180), ('min_lat', 90), ('min_lng', 180),
+                        ('max_lat', 90), ('max_lng', 180)):
+        value = params.get(name)
+        if value is not None and not -limit <= value <= limit:
+            errors[name] = f'{name} must be between -{limit} and {limit}.'
+    if errors:
+        return errors
+
+    given = [name for name in RADIUS_PARAMS if params.get(name) is not None]
+    if given and len(given) != len(RADIUS_PARAMS):
+        missing = next(name for name in RADIUS_PARAMS if params.get(name) is None)
+        errors[missing] = 'Both lat and lng are required for radius search.'
+
+    radius = params.get('radius_km')
+    if radius is not None:
+        if not given:
+            errors['radius_km'] = 'radius_km requires lat and lng.'
+        elif not 0 < radius <= MAX_SEARCH_RADIUS_KM:
+            errors['radius_km'] = f'radius_km must be between 0 and {MAX_SEARCH_RADIUS_KM} km.'
+
+    given = [name for name in BBOX_PARAMS if params.get(name) is not None]
+    if given and len(given) != len(BBOX_PARAMS):
+        missing = next(name for name in BBOX_PARAMS if params.get(name) is None)
+        errors[missing] = 'min_lat, min_lng, max_lat and max_lng are required together.'
+    elif given:
+        if params['min_lat'] > params['max_lat']:
+            errors['max_lat'] = 'max_lat must be greater than min_lat.'
+        if params['min_lng'] > params['max_lng']:
+            errors['max_lng'] = 'max_lng must be greater than min_lng.'
+
+    return errors
+
+
+def apply_geo_filters(queryset, params, prefix='location__'):
+    """
+    ✅ Застосувати радіус і/або вікно карти з перевірених параметрів
+
+    Returns:
+        QuerySet (з distance_km, якщо задано радіус)
+    """
+    if all(params.get(name) is not None for name in BBOX_PARAMS):
+        queryset = filter_bbox(
+            queryset,
+            params['min_lat'], params['min_lng'], params['max_lat'], params['max_lng'],
+            prefix=prefix,
+        )
+
+    if all(params.get(name) is not None for name in RADIUS_PARAMS):
+        queryset = filter_radius(
+            queryset,
+            params['lat'], params['lng'],
+            params.get('radius_km') or DEFAULT_SEARCH_RADIUS_KM,
+            prefix=prefix,
+        )
+
+    return queryset
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:04
+
+from django.db import migrations, models
+
+
+def fill_geohash(apps, schema_editor):
+    from apps.common.geo import geohash_encode
+
+    Location = apps.get_model('common', 'Location')
+    locations = Location.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    for location in locations.iterator(chunk_size=1000):
+        location.geohash = geohash_encode(location.latitude, location.longitude)
+        location.save(update_fields=['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, help_text='Geohash координат (індекс для гео-пошуку)', max_length=12, verbose_name='Geohash'),
+        ),
+        migrations.RunPython(fill_geohash, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
-from django.db import models
+import copy
+
+from django.db import DatabaseError, models, router, transaction
 from django.utils import timezone
 from django.db.models import UniqueConstraint
 
+from apps.common.geo import geohash_encode
+
 from apps.common.constants import (
     ADDRESS_MAX_LENGTH,
     CITY_MAX_LENGTH,
@@ -13,6 +17,15 @@ from apps.common.constants import (
 )
 
 class TimeModel(models.Model):
+    """
+    Базова модель з датами і відстеженням змін полів
+
+    ✅ Відстеження змін:
+    - from_db() зберігає знімок завантажених значень
+    - changed_fields / previous_values() - що змінилося і яким було (без запиту до БД)
+    - save(only_changed=True) для завантаженого об'єкта пише тільки змінені поля
+      (+ auto_now поля), тобто UPDATE тільки по потрібних колонках
+    """
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -27,6 +40,131 @@ class TimeModel(models.Model):
     class Meta:
         abstract = True
 
+    # ============================================
+    # ВІДСТЕЖЕННЯ ЗМІН
+    # ============================================
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._set_snapshot(dict(zip(field_names, values)))
+        return instance
+
+    @staticmethod
+    def _snapshot_value(value):
+        # JSON-поля можна змінити "на місці" - знімок має бути копією
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
+
+    def _set_snapshot(self, values, replace=True):
+        snapshot = {} if replace else dict(getattr(self, '_tracked_values', None) or {})
+        for attname, value in values.items():
+            snapshot[attname] = self._snapshot_value(value)
+        self._tracked_values = snapshot
+
+    def _current_values(self, fields=None):
+        """Поточні значення завантажених (не відкладених) полів"""
+        return {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__ and (fields is None or field.name in fields
+                                                   or field.attname in fields)
+        }
+
+    @property
+    def is_tracked(self) -> bool:
+        """Чи є знімок значень з БД"""
+        return bool(getattr(self, '_tracked_values', None)) and not self._state.adding
+
+    @property
+    def changed_fields(self) -> set:
+        """Назви полів, змінених після завантаження з БД (порожньо для нових об'єктів)"""
+        if not self.is_tracked:
+            return set()
+
+        snapshot = self._tracked_values
+        changed = set()
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            value = getattr(self, field.attname)
+            if field.attname not in snapshot:
+                # Відкладене поле, якому присвоїли значення
+                changed.add(field.name)
+            elif value != snapshot[field.attname] or not getattr(value, '_committed', True):
+                changed.add(field.name)
+        return changed
+
+    def has_changed(self, field_name) -> bool:
+        return self._meta.get_field(field_name).name in self.changed_fields
+
+    def previous_values(self, *field_names):
+        """
+        Значення полів на момент завантаження з БД
+
+        Args:
+            field_names: Назви полів (name або attname, напр. 'listing_id')
+
+        Returns:
+            dict {назва: значення} або None, якщо знімка немає
+        """
+        if not self.is_tracked:
+            return None
+
+        previous = {}
+        for name in field_names:
+            attname = self._meta.get_field(name).attname
+            if attname not in self._tracked_values:
+                return None
+            previous[name] = self._tracked_values[attname]
+        return previous
+
+    def save(self, *args, only_changed=False, **kwargs):
+        """
+        Збереження з оновленням знімка
+
+        Args:
+            only_changed: UPDATE тільки по змінених колонках (+ auto_now поля).
+                Вмикається явно: поля, змінені в pre_save-обробниках, не потраплять
+                в такий UPDATE. Якщо рядка вже немає - виконується звичайний save()
+        """
+        update_fields = kwargs.get('update_fields')
+
+        if (
+            only_changed
+            and update_fields is None
+            and not args
+            and not kwargs.get('force_insert')
+            and self.is_tracked
+        ):
+            # ✅ Тільки змінені колонки (auto_now оновлюється завжди, щоб save() лишався save())
+            narrowed = self.changed_fields | {
+                field.name for field in self._meta.concrete_fields
+                if getattr(field, 'auto_now', False)
+            }
+            using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+            try:
+                # Окремий savepoint: помилка save() позначає зовнішню транзакцію для відкату
+                with transaction.atomic(using=using):
+                    super().save(*args, update_fields=narrowed, **kwargs)
+            except DatabaseError as exc:
+                # Django: "Save with update_fields did not affect any rows." -> повний save()
+                if type(exc) is not DatabaseError:
+                    raise
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+
+        if update_fields is None:
+            self._set_snapshot(self._current_values())
+        else:
+            self._set_snapshot(self._current_values(set(update_fields)), replace=False)
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._set_snapshot(self._current_values(), replace=False)
+
 
 class Location(TimeModel):
     """
@@ -65,6 +203,15 @@ class Location(TimeModel):
         blank=True,
         verbose_name='Longitude'
     )
+    geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        default='',
+        editable=False,
+        db_index=True,
+        verbose_name='Geohash',
+        help_text='Geohash координат (індекс для гео-пошуку)'
+    )
 
     class Meta:
         ordering = ['city', 'country']
@@ -89,8 +236,21 @@ class Location(TimeModel):
         self.city = self.city.strip()
         self.address = self.address.strip()
         self.normalized_address = self.normalize_address(self.address)
+        self.geohash = self.compute_geohash(self.latitude, self.longitude)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def compute_geohash(latitude, longitude) -> str:
+        """Geohash для координат (порожній рядок, якщо координат немає)"""
+        if latitude is None or longitude is None:
+            return ''
+        return geohash_encode(latitude, longitude)
+
     @staticmethod
     def normalize_address(address: str) -> str:
         """
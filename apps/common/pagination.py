@@ -0,0 +1,180 @@
+"""
+✅ Keyset (cursor) пагінація з підтримкою старого limit/offset
+
+За замовчуванням - LimitOffsetPagination (як і раніше).
+Клієнт вмикає keyset-режим запитом ?pagination=keyset (перша сторінка)
+і далі переходить за посиланням next (?cursor=...):
+
+- сторінка вибирається умовою WHERE (created_at, id) < (останній рядок),
+  а не OFFSET - глибокі сторінки такі ж швидкі, як перша
+- COUNT(*) не виконується; next = null на останній сторінці
+- сортування - поточне ordering запиту з keyset_ordering_fields view
+  (індексовані поля), id додається як тай-брейкер
+"""
+
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from apps.common.constants import MAX_PAGE_SIZE
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    LimitOffsetPagination + опціональний keyset-режим
+
+    View задає дозволені для keyset поля сортування:
+        keyset_ordering_fields = ['created_at', 'check_in']
+    """
+
+    mode_query_param = 'pagination'
+    keyset_mode = 'keyset'
+    cursor_query_param = 'cursor'
+    keyset_max_limit = MAX_PAGE_SIZE
+    default_keyset_fields = ('created_at',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self._is_keyset_request(request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = min(self.get_limit(request), self.keyset_max_limit)
+        self.ordering = self._keyset_ordering(queryset, view)
+        queryset = queryset.order_by(*(
+            f'-{name}' if descending else name for name, descending in self.ordering
+        ))
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self._after(queryset.model, self._decode(cursor)))
+
+        # +1 рядок - щоб дізнатися, чи є наступна сторінка (без COUNT)
+        rows = list(queryset[:self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        page = rows[:self.limit]
+        self.last_row = page[-1] if page else None
+        return page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+
+        url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+        url = replace_query_param(url, self.mode_query_param, self.keyset_mode)
+        return replace_query_param(url, self.cursor_query_param, self._encode(self.last_row))
+
+    def get_html_context(self):
+        if not self.keyset:
+            return super().get_html_context()
+        return {'previous_url': None, 'next_url': self.get_next_link()}
+
+    # ============================================
+    # РЕЖИМ І СОРТУВАННЯ
+    # ============================================
+
+    def _is_keyset_request(self, request):
+        params = request.query_params
+        return (
+            params.get(self.mode_query_param) == self.keyset_mode
+            or self.cursor_query_param in params
+        )
+
+    def _keyset_ordering(self, queryset, view):
+        """
+        Ключ сортування [(поле, desc), ...] з тай-брейкером по pk
+
+        Raises:
+            ValidationError: якщо сортування не підтримується keyset-режимом
+        """
+        model = queryset.model
+        allowed = set(getattr(view, 'keyset_ordering_fields', self.default_keyset_fields))
+        ordering = list(queryset.query.order_by or model._meta.ordering)
+
+        keys = []
+        for item in ordering:
+            name = str(item)
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            if name == 'pk':
+                name = model._meta.pk.name
+
+            if name != model._meta.pk.name and (
+                name not in allowed or model._meta.get_field(name).null
+            ):
+                raise ValidationError({
+                    'ordering': (
+                        f'Keyset pagination supports ordering by: '
+                        f'{", ".join(sorted(allowed))}.'
+                    )
+                })
+            keys.append((name, descending))
+
+        if not keys:
+            keys.append(('created_at', True))
+        if keys[-1][0] != model._meta.pk.name:
+            keys.append((model._meta.pk.name, keys[-1][1]))
+        return keys
+
+    # ============================================
+    # КУРСОР
+    # ============================================
+
+    def _encode(self, row):
+        fields = [row._meta.get_field(name) for name, _ in self.ordering]
+        payload = {
+            'o': [f'-{name}' if descending else name for name, descending in self.ordering],
+            'v': [field.value_to_string(row) for field in fields],
+        }
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def _decode(self, cursor):
+        """Значення ключа останнього рядка попередньої сторінки"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            expected = [f'-{name}' if descending else name for name, descending in self.ordering]
+            if payload['o'] != expected or len(payload['v']) != len(expected):
+                raise ValueError
+            return payload['v']
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _after(self, model, raw_values):
+        """
+        Умова "після рядка" для складеного ключа:
+        (a < va) OR (a = va AND b < vb) OR ...
+        """
+        try:
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, raw_values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+        conditions = []
+        for index, (name, descending) in enumerate(self.ordering):
+            equal = {key: value for (key, _), value in zip(self.ordering[:index], values)}
+            lookup = 'lt' if descending else 'gt'
+            conditions.append(Q(**equal, **{f'{name}__{lookup}': values[index]}))
+        return reduce(or_, conditions)
@@ -4,10 +4,21 @@ from types import SimpleNamespace
 from unittest.mock import patch
 
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.db.models.signals import pre_save
+from django.test.utils import CaptureQueriesContext
 from django.test import SimpleTestCase, TestCase
 from django.utils import timezone
 
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from apps.common.enums import CancellationPolicy, PropertyType
+from apps.common.geo import geohash_cover, geohash_encode, haversine_km, radius_bbox
 from apps.common.models import Location
 from django.test import SimpleTestCase
 from django.utils import timezone
@@ -130,6 +141,73 @@ class TimeModelTests(TestCase):
         self.assertGreater(self.location.updated_at, initial_updated)
 
 
+class TimeModelChangeTrackingTests(TestCase):
+    def setUp(self):
+        Location.objects.create(country='Ukraine', city='Lviv', address='Shevchenka street 1')
+        self.location = Location.objects.get()
+
+    def test_changed_fields_and_previous_values(self):
+        self.assertTrue(self.location.is_tracked)
+        self.assertEqual(self.location.changed_fields, set())
+
+        self.location.city = 'Kyiv'
+
+        self.assertEqual(self.location.changed_fields, {'city'})
+        self.assertTrue(self.location.has_changed('city'))
+        self.assertEqual(self.location.previous_values('city'), {'city': 'Lviv'})
+
+    def test_save_writes_only_changed_columns(self):
+        self.location.city = 'Kyiv'
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.location.save(only_changed=True)
+
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"city"', updates[0])
+        self.assertIn('"updated_at"', updates[0])
+        self.assertNotIn('"address"', updates[0])
+
+        # Знімок оновлено після збереження
+        self.assertEqual(self.location.changed_fields, set())
+        self.assertEqual(self.location.previous_values('city'), {'city': 'Kyiv'})
+        self.assertEqual(Location.objects.get().city, 'Kyiv')
+
+    def test_default_save_keeps_fields_set_in_pre_save(self):
+        def touch_address(sender, instance, **kwargs):
+            instance.address = 'Shevchenka street 2'
+
+        self.location.city = 'Kyiv'
+        pre_save.connect(touch_address, sender=Location)
+        try:
+            self.location.save()
+        finally:
+            pre_save.disconnect(touch_address, sender=Location)
+
+        stored = Location.objects.get()
+        self.assertEqual(stored.city, 'Kyiv')
+        self.assertEqual(stored.address, 'Shevchenka street 2')
+
+    def test_only_changed_falls_back_to_full_save_for_deleted_row(self):
+        Location.objects.all().delete()
+        self.location.city = 'Kyiv'
+
+        self.location.save(only_changed=True)
+
+        stored = Location.objects.get()
+        self.assertEqual(stored.city, 'Kyiv')
+        self.assertEqual(stored.address, 'Shevchenka street 1')
+
+    def test_new_instances_are_tracked_after_insert(self):
+        location = Location(country='Ukraine', city='Odesa', address='Deribasivska 1')
+        self.assertFalse(location.is_tracked)
+        self.assertIsNone(location.previous_values('city'))
+
+        location.save()
+        location.address = 'Deribasivska 2'
+        self.assertEqual(location.changed_fields, {'address'})
+
+
 class LocationModelTests(TestCase):
     def test_normalize_address_removes_extra_spaces(self):
         normalized = Location.normalize_address('  Main   street   1  ')
@@ -195,3 +273,177 @@ class LocationModelTests(TestCase):
     def test_normalize_address_handles_multiple_replacements(self):
         normalized = Location.normalize_address(' проспект Перемоги буд 10 квартира 5 ')
         self.assertEqual(normalized, 'просп перемоги буд10 кв5')
+
+
+class GeohashTests(SimpleTestCase):
+    def test_encode_known_point(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_cover_contains_every_point_of_the_box(self):
+        box = radius_bbox(52.52, 13.405, 5)
+        cells = geohash_cover(*box)
+
+        self.assertLessEqual(len(cells), 16)
+        for lat in (box[0], 52.52, box[2]):
+            for lng in (box[1], 13.405, box[3]):
+                point_hash = geohash_encode(lat, lng)
+                self.assertTrue(any(point_hash.startswith(cell) for cell in cells))
+
+    def test_haversine_distance(self):
+        # Берлін - Потсдам ~ 27 км
+        self.assertAlmostEqual(haversine_km(52.5200, 13.4050, 52.3906, 13.0645), 27.0, delta=1.0)
+
+
+class LocationGeohashTests(TestCase):
+    def test_geohash_follows_coordinates(self):
+        location = Location.objects.create(
+            country='Germany', city='Berlin', address='Unter den Linden 1',
+            latitude='52.517037', longitude='13.388860',
+        )
+        self.assertEqual(location.geohash, geohash_encode(52.517037, 13.388860))
+
+        location.latitude = '48.137154'
+        location.longitude = '11.576124'
+        location.save(update_fields=['latitude', 'longitude'])
+        location.refresh_from_db()
+        self.assertEqual(location.geohash, geohash_encode(48.137154, 11.576124))
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': True, 'ALIAS': 'default', 'KEY_PREFIX': 'test-respcache'})
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        from apps.listings.models import Listing
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        User = get_user_model()
+        self.owner = User.objects.create_user(
+            email='cache-owner@example.com',
+            username='cache-owner',
+            password='password123',
+        )
+        self.location = Location.objects.create(
+            country='Україна',
+            city='Ужгород',
+            address='вул. Кешова 1',
+        )
+        self.listing = Listing.objects.create(
+            owner=self.owner,
+            title='Квартира для кешу',
+            description='Дуже довгий опис квартири, що перевищує мінімальну довжину.',
+            location=self.location,
+            property_type=PropertyType.APARTMENT,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('100.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+        self.client = APIClient()
+
+    def _get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_listing_rating_is_cached_until_listing_changes(self):
+        url = f'/api/listings/{self.listing.pk}/rating/'
+
+        self.assertEqual(self._get(url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            self.assertEqual(self._get(url)['X-Cache'], 'HIT')
+
+        self.listing.title = 'Нова назва'
+        self.listing.save()
+
+        response = self._get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['listing_title'], 'Нова назва')
+
+    def test_invalidation_is_limited_to_affected_tags(self):
+        from apps.reviews.models import OwnerRating
+
+        listing_url = f'/api/listings/{self.listing.pk}/rating/'
+        top_owners_url = '/api/owners/top-rated/'
+        self._get(listing_url)
+        self._get(top_owners_url)
+
+        OwnerRating.update_rating(self.owner.pk)
+
+        self.assertEqual(self._get(listing_url)['X-Cache'], 'HIT')
+        self.assertEqual(self._get(top_owners_url)['X-Cache'], 'MISS')
+
+    def test_public_detail_is_cached_for_guests_only(self):
+        from apps.analytics.models import ListingView
+
+        url = f'/api/listings/{self.listing.pk}/'
+        self.assertEqual(self._get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self._get(url)['X-Cache'], 'HIT')
+
+        # Перегляд рахується і при відповіді з кешу
+        self.client.get(url, REMOTE_ADDR='10.0.0.9')
+        self.assertEqual(ListingView.objects.filter(listing=self.listing).count(), 2)
+
+        # Зміна адреси інвалідує сторінку через локацію
+        self.location.city = 'Мукачево'
+        self.location.save()
+        response = self._get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['location']['city'], 'Мукачево')
+
+        self.client.force_authenticate(self.owner)
+        self.assertNotIn('X-Cache', self._get(url))
+
+    def test_invalidation_during_compute_is_not_lost(self):
+        from apps.common.cache import cached_value, invalidate_tags, listing_tag
+
+        tag = listing_tag(self.listing.pk)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            if len(calls) == 1:
+                # Запис змінив оголошення, поки значення обчислювалося
+                invalidate_tags(tag)
+            return len(calls), True
+
+        def read():
+            return cached_value('race', 'signature', 60, lambda: [tag], compute)
+
+        self.assertEqual(read(), 1)
+        self.assertEqual(read(), 2)
+        self.assertEqual(read(), 2)
+
+    def test_invalidation_is_repeated_after_commit(self):
+        from apps.common.cache import invalidate_tags, listing_tag
+
+        url = f'/api/listings/{self.listing.pk}/rating/'
+        with self.captureOnCommitCallbacks() as callbacks:
+            invalidate_tags(listing_tag(self.listing.pk))
+            # Запит між інвалідацією і комітом кешує ще старі дані
+            self.assertEqual(self._get(url)['X-Cache'], 'MISS')
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self._get(url)['X-Cache'], 'MISS')
+
+    def test_stats_endpoint_reports_hits_and_misses(self):
+        url = f'/api/owners/{self.owner.pk}/rating/'
+        for _ in range(3):
+            self._get(url)
+
+        admin = get_user_model().objects.create_superuser(
+            email='cache-admin@example.com',
+            username='cache-admin',
+            password='password123',
+        )
+        self.client.force_authenticate(admin)
+        stats = self._get('/api/cache-stats/').data
+
+        self.assertTrue(stats['enabled'])
+        self.assertEqual(stats['endpoints']['owner-rating'], {
+            'hits': 2,
+            'misses': 1,
+            'hit_rate': 0.6667,
+        })
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import ResponseCacheStatsView
+
+app_name = 'common'
+
+urlpatterns = [
+    path('cache-stats/', ResponseCacheStatsView.as_view(), name='cache-stats'),
+]
@@ -1,7 +1,6 @@
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from datetime import time
 
 phone_validator = RegexValidator(
     regex=r'^[0-9\-\+\(\)\s]+$',
@@ -27,27 +26,25 @@ def validate_max_guests_per_room(num_guests, max_guests):
 def validate_booking_overlap(booking_instance):
 
     from apps.bookings.models import Booking
+    from apps.common.enums import ACTIVE_BOOKING_STATUSES
+    from apps.listings.models import ListingAvailability
+
     new_in = booking_instance.check_in
     new_out = booking_instance.check_out
-    new_in_time = booking_instance.check_in_time or time(15, 0)
-    new_out_time = booking_instance.check_out_time or time(12, 0)
+
+    # Швидкий шлях: бітова карта зайнятості оголошення
+    if ListingAvailability.is_range_available(booking_instance.listing_id, new_in, new_out):
+        return
 
     qs = Booking.objects.filter(
-        listing=booking_instance.listing,
-        status__in=['waiting', 'agreed']
+        listing_id=booking_instance.listing_id,
+        status__in=ACTIVE_BOOKING_STATUSES,
+        check_in__lt=new_out,
+        check_out__gt=new_in,
     )
     if booking_instance.pk:
         qs = qs.exclude(pk=booking_instance.pk)
 
-    for b in qs:
-        exist_in = b.check_in
-        exist_out = b.check_out
-        exist_in_time = b.check_in_time or time(15, 0)
-        exist_out_time = b.check_out_time or time(12, 0)
-
-        overlaps = (
-            (new_in < exist_out or (new_in == exist_out and new_in_time < exist_out_time)) and
-            (new_out > exist_in or (new_out == exist_in and new_out_time > exist_in_time))
-        )
-        if overlaps:
-            raise ValidationError(f'This listing is already booked from {exist_in} {exist_in_time} to {exist_out} {exist_out_time}.')
\ No newline at end of file
+    conflicting = qs.only('check_in', 'check_out').first()
+    if conflicting:
+        raise ValidationError(f'This listing is already booked from {conflicting.check_in} to {conflicting.check_out}.')
@@ -1,3 +1,21 @@
-from django.shortcuts import render
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .cache import cache_stats, response_cache_enabled
+
+
+class ResponseCacheStatsView(APIView):
+    """
+    Лічильники кешу відповідей (hit/miss по ендпоінтах)
+
+    GET /api/cache-stats/
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'enabled': response_cache_enabled(),
+            'endpoints': cache_stats(),
+        })
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import Job, OutboxEvent
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'priority', 'attempts', 'run_at', 'finished_at']
+    list_filter = ['status', 'priority', 'name']
+    search_fields = ['name', 'idempotency_key']
+    readonly_fields = ['locked_by', 'locked_at', 'finished_at', 'last_error', 'created_at', 'updated_at']
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'event_type', 'created_at', 'dispatched_at', 'attempts']
+    list_filter = ['event_type']
+    readonly_fields = ['locked_by', 'locked_at', 'dispatched_at', 'last_error', 'created_at']
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.jobs'
+
+    def ready(self):
+        # ✅ Реєстрація задач (tasks.py) і споживачів подій outbox (consumers.py)
+        autodiscover_modules('tasks')
+        autodiscover_modules('consumers')
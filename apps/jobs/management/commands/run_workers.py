@@ -0,0 +1,73 @@
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.jobs.worker import run_worker, worker_process
+
+
+class Command(BaseCommand):
+    help = 'Запускає пул процесів-воркерів для фонових задач з БД (apps.jobs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=settings.JOBS['PROCESSES'],
+            help='Кількість процесів-воркерів'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.JOBS['BATCH_SIZE'],
+            help='Задач за один захід воркера'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.JOBS['POLL_INTERVAL'],
+            help='Пауза, коли черга порожня (секунди)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Виконати всі готові задачі і вийти'
+        )
+
+    def handle(self, *args, **options):
+        processes = max(options['processes'], 1)
+        args = (options['batch_size'], options['poll_interval'], options['once'])
+
+        if processes == 1:
+            processed = run_worker(*args)
+            self.stdout.write(self.style.SUCCESS(f'✅ Виконано задач: {processed}'))
+            return
+
+        # Дочірні процеси відкривають власні з'єднання з БД
+        connections.close_all()
+        context = multiprocessing.get_context()
+        stop = context.Event()
+        workers = [
+            context.Process(target=worker_process, args=(*args, stop), daemon=True)
+            for _ in range(processes)
+        ]
+
+        def shutdown(signum, frame):
+            stop.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        for worker in workers:
+            worker.start()
+        self.stdout.write(self.style.SUCCESS(f'✅ Запущено воркерів: {processes}'))
+
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+        self.stdout.write(self.style.SUCCESS('✅ Воркери зупинено'))
@@ -0,0 +1,420 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.common.models import TimeModel
+from apps.common.enums import JobPriority, JobStatus
+from apps.common.constants import (
+    JOB_NAME_MAX_LENGTH,
+    JOB_IDEMPOTENCY_KEY_MAX_LENGTH,
+    JOB_MAX_ATTEMPTS,
+    JOB_RETRY_BACKOFF_SECONDS,
+    JOB_LOCK_TIMEOUT_SECONDS,
+    JOB_RETENTION_DAYS,
+    OUTBOX_EVENT_TYPE_MAX_LENGTH,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_RETENTION_DAYS,
+)
+from apps.jobs.outbox import deliver
+from apps.jobs.registry import get_task
+
+logger = logging.getLogger(__name__)
+
+
+class Job(TimeModel):
+    """
+    ✅ Фонова задача в черзі (без зовнішнього брокера)
+
+    Воркер (run_workers) забирає задачі QUEUED з run_at <= now за пріоритетом,
+    виконує їх у транзакції і при помилці повторює з експоненційною затримкою
+    до max_attempts спроб.
+    """
+
+    name = models.CharField(
+        max_length=JOB_NAME_MAX_LENGTH,
+        verbose_name='Task'
+    )
+
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Payload'
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=JobStatus.choices,
+        default=JobStatus.QUEUED,
+        verbose_name='Status'
+    )
+
+    priority = models.SmallIntegerField(
+        choices=JobPriority.choices,
+        default=JobPriority.NORMAL,
+        verbose_name='Priority'
+    )
+
+    idempotency_key = models.CharField(
+        max_length=JOB_IDEMPOTENCY_KEY_MAX_LENGTH,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name='Idempotency Key',
+        help_text='Повторна постановка з тим самим ключем не створює задачу'
+    )
+
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')
+
+    max_attempts = models.PositiveSmallIntegerField(
+        default=JOB_MAX_ATTEMPTS,
+        verbose_name='Max Attempts'
+    )
+
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Run At',
+        help_text='Не виконувати раніше цього часу (затримка/повтор)'
+    )
+
+    locked_by = models.CharField(max_length=100, blank=True, default='', verbose_name='Worker')
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name='Locked At')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Finished At')
+    last_error = models.TextField(blank=True, default='', verbose_name='Last Error')
+
+    class Meta:
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        indexes = [
+            # ✅ Вибір наступних задач воркером
+            models.Index(fields=['status', '-priority', 'run_at']),
+            models.Index(fields=['status', 'locked_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+    # ============================================
+    # ПОСТАНОВКА В ЧЕРГУ
+    # ============================================
+
+    @classmethod
+    def enqueue(cls, name, payload=None, priority=JobPriority.NORMAL,
+                max_attempts=JOB_MAX_ATTEMPTS, idempotency_key=None, countdown=None):
+        """
+        Створити задачу (або повернути існуючу з тим самим idempotency_key)
+        """
+        fields = {
+            'name': name,
+            'payload': payload or {},
+            'priority': priority,
+            'max_attempts': max_attempts,
+            'run_at': timezone.now() + timedelta(seconds=countdown or 0),
+        }
+        if not idempotency_key:
+            return cls.objects.create(**fields)
+
+        existing = cls.objects.filter(idempotency_key=idempotency_key).first()
+        if existing is not None:
+            return existing
+        try:
+            with transaction.atomic():
+                return cls.objects.create(idempotency_key=idempotency_key, **fields)
+        except IntegrityError:
+            # Паралельний запит вже поставив цю задачу
+            return cls.objects.get(idempotency_key=idempotency_key)
+
+    @classmethod
+    def schedule_periodic(cls, periodic, scheduled=None, now=None) -> int:
+        """
+        ✅ Поставити періодичні задачі поточного інтервалу
+
+        Ключ ідемпотентності - ім'я задачі + номер інтервалу, тому кілька
+        воркерів ставлять задачу один раз на інтервал.
+
+        Args:
+            periodic: {ім'я задачі: інтервал у секундах} (JOBS['PERIODIC'])
+            scheduled: dict воркера {ім'я: номер інтервалу} - без запитів до БД,
+                поки інтервал не змінився
+            now: Поточний час (для тестів)
+
+        Returns:
+            int: Скільки задач перевірено/поставлено
+        """
+        now = now or timezone.now()
+        scheduled = {} if scheduled is None else scheduled
+        count = 0
+
+        for name, interval in periodic.items():
+            slot = int(now.timestamp() // interval)
+            if scheduled.get(name) == slot:
+                continue
+
+            registered = get_task(name)
+            cls.enqueue(
+                name,
+                priority=registered.priority,
+                max_attempts=registered.max_attempts,
+                idempotency_key=f'periodic:{name}:{slot}',
+            )
+            scheduled[name] = slot
+            count += 1
+        return count
+
+    # ============================================
+    # ВОРКЕР
+    # ============================================
+
+    @classmethod
+    def claim(cls, worker_id, limit=1) -> list:
+        """
+        ✅ Забрати до limit готових задач для воркера
+
+        PostgreSQL/MySQL 8: SELECT ... FOR UPDATE SKIP LOCKED - воркери беруть
+        різні задачі без очікування. SQLite: один UPDATE з підзапитом
+        (запис блокує БД цілком, тому дві задачі не дістануться двом воркерам).
+        """
+        now = timezone.now()
+        candidates = cls.objects.filter(
+            status=JobStatus.QUEUED,
+            run_at__lte=now,
+        ).order_by('-priority', 'run_at', 'pk')
+        claim = {
+            'status': JobStatus.RUNNING,
+            'locked_by': worker_id,
+            'locked_at': now,
+            'attempts': F('attempts') + 1,
+            'updated_at': now,
+        }
+
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                ids = list(
+                    candidates.select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit]
+                )
+                if not ids:
+                    return []
+                cls.objects.filter(pk__in=ids).update(**claim)
+        else:
+            updated = cls.objects.filter(
+                pk__in=candidates.values('pk')[:limit],
+                status=JobStatus.QUEUED,
+            ).update(**claim)
+            if not updated:
+                return []
+
+        return list(cls.objects.filter(
+            status=JobStatus.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+        ).order_by('-priority', 'run_at', 'pk'))
+
+    def execute(self) -> bool:
+        """
+        Виконати задачу (у транзакції - при помилці її зміни відкочуються)
+
+        Returns:
+            bool: True - успішно, False - помилка (задачу повторено або FAILED)
+        """
+        try:
+            task = get_task(self.name)
+            with transaction.atomic():
+                task(**self.payload)
+        except Exception:
+            logger.exception('Job %s #%s failed (attempt %s)', self.name, self.pk, self.attempts)
+            self._fail(traceback.format_exc())
+            return False
+
+        Job.objects.filter(pk=self.pk, locked_by=self.locked_by).update(
+            status=JobStatus.DONE,
+            finished_at=timezone.now(),
+            last_error='',
+            updated_at=timezone.now(),
+        )
+        return True
+
+    def retry_delay(self) -> timedelta:
+        """Затримка перед наступною спробою: 30с, 60с, 120с, ..."""
+        return timedelta(seconds=JOB_RETRY_BACKOFF_SECONDS * 2 ** max(self.attempts - 1, 0))
+
+    def _fail(self, error):
+        now = timezone.now()
+        values = {'last_error': error, 'updated_at': now}
+
+        if self.attempts >= self.max_attempts:
+            values.update(status=JobStatus.FAILED, finished_at=now)
+        else:
+            values.update(status=JobStatus.QUEUED, run_at=now + self.retry_delay(), locked_by='')
+
+        Job.objects.filter(pk=self.pk, locked_by=self.locked_by).update(**values)
+
+    @classmethod
+    def requeue_stale(cls, timeout=JOB_LOCK_TIMEOUT_SECONDS) -> int:
+        """
+        Повернути в чергу задачі воркерів, що впали (RUNNING довше timeout)
+
+        Спроба вже врахована при claim(); якщо спроби вичерпано - FAILED.
+        """
+        now = timezone.now()
+        stale = cls.objects.filter(
+            status=JobStatus.RUNNING,
+            locked_at__lt=now - timedelta(seconds=timeout),
+        )
+        failed = stale.filter(attempts__gte=F('max_attempts')).update(
+            status=JobStatus.FAILED,
+            finished_at=now,
+            last_error='Worker lock timed out',
+            updated_at=now,
+        )
+        requeued = stale.update(
+            status=JobStatus.QUEUED,
+            locked_by='',
+            run_at=now,
+            updated_at=now,
+        )
+        return failed + requeued
+
+    @classmethod
+    def work(cls, worker_id, batch_size=10) -> int:
+        """
+        Забрати пачку задач і виконати їх
+
+        Returns:
+            int: Кількість оброблених задач (0 - черга порожня)
+        """
+        jobs = cls.claim(worker_id, limit=batch_size)
+        for job in jobs:
+            job.execute()
+        return len(jobs)
+
+    @classmethod
+    def purge(cls, days=JOB_RETENTION_DAYS) -> int:
+        """Видалити виконані задачі, старші за days днів"""
+        deleted, _ = cls.objects.filter(
+            status=JobStatus.DONE,
+            finished_at__lt=timezone.now() - timedelta(days=days),
+        ).delete()
+        return deleted
+
+
+class OutboxEvent(models.Model):
+    """
+    ✅ Доменна подія в outbox (booking.created, booking.status_changed, ...)
+
+    Записується в транзакції зміни моделі, доставляється споживачам
+    диспетчером пачками (OutboxEvent.dispatch).
+    """
+
+    event_type = models.CharField(max_length=OUTBOX_EVENT_TYPE_MAX_LENGTH, verbose_name='Event')
+    payload = models.JSONField(default=dict, blank=True, verbose_name='Payload')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='Created At')
+
+    dispatched_at = models.DateTimeField(null=True, blank=True, verbose_name='Dispatched At')
+    locked_by = models.CharField(max_length=100, blank=True, default='', verbose_name='Dispatcher')
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name='Locked At')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')
+    last_error = models.TextField(blank=True, default='', verbose_name='Last Error')
+
+    class Meta:
+        verbose_name = 'Outbox event'
+        verbose_name_plural = 'Outbox events'
+        indexes = [
+            # ✅ Недоставлені події в порядку появи
+            models.Index(fields=['dispatched_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f'{self.event_type} #{self.pk}'
+
+    @classmethod
+    def claim(cls, dispatcher_id, limit) -> list:
+        """
+        Забрати пачку недоставлених подій (найстаріші першими)
+
+        Подію, заблоковану диспетчером, що впав, можна забрати після
+        JOB_LOCK_TIMEOUT_SECONDS. Події з вичерпаними спробами не забираються.
+        """
+        now = timezone.now()
+        candidates = cls.objects.filter(
+            Q(locked_at__isnull=True) | Q(locked_at__lt=now - timedelta(seconds=JOB_LOCK_TIMEOUT_SECONDS)),
+            dispatched_at__isnull=True,
+            attempts__lt=OUTBOX_MAX_ATTEMPTS,
+        ).order_by('pk')
+        claim = {'locked_by': dispatcher_id, 'locked_at': now}
+
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                ids = list(
+                    candidates.select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit]
+                )
+                if not ids:
+                    return []
+                cls.objects.filter(pk__in=ids).update(**claim)
+        else:
+            if not cls.objects.filter(pk__in=candidates.values('pk')[:limit]).update(**claim):
+                return []
+
+        return list(cls.objects.filter(
+            locked_by=dispatcher_id,
+            locked_at=now,
+            dispatched_at__isnull=True,
+        ).order_by('pk'))
+
+    @classmethod
+    def dispatch(cls, dispatcher_id, batch_size=100) -> int:
+        """
+        ✅ Доставити пачку подій споживачам
+
+        Пачка доставляється в одній транзакції. Якщо споживач впав - події
+        доставляються поштучно, щоб одна "погана" подія не блокувала решту.
+
+        Returns:
+            int: Кількість забраних подій (0 - outbox порожній)
+        """
+        events = cls.claim(dispatcher_id, batch_size)
+        if not events:
+            return 0
+
+        try:
+            with transaction.atomic():
+                deliver([(event.event_type, event.payload) for event in events])
+                cls._mark_dispatched(events)
+        except Exception:
+            logger.exception('Outbox batch of %s events failed, retrying one by one', len(events))
+            for event in events:
+                event._dispatch_single()
+
+        return len(events)
+
+    def _dispatch_single(self):
+        try:
+            with transaction.atomic():
+                deliver([(self.event_type, self.payload)])
+                OutboxEvent._mark_dispatched([self])
+        except Exception:
+            logger.exception('Outbox event %s #%s failed', self.event_type, self.pk)
+            OutboxEvent.objects.filter(pk=self.pk, locked_by=self.locked_by).update(
+                attempts=F('attempts') + 1,
+                last_error=traceback.format_exc(),
+                locked_by='',
+                locked_at=None,
+            )
+
+    @classmethod
+    def _mark_dispatched(cls, events):
+        cls.objects.filter(pk__in=[event.pk for event in events]).update(
+            dispatched_at=timezone.now(),
+            locked_by='',
+            locked_at=None,
+        )
+
+    @classmethod
+    def purge(cls, days=OUTBOX_RETENTION_DAYS) -> int:
+        """Видалити доставлені події, старші за days днів"""
+        deleted, _ = cls.objects.filter(
+            dispatched_at__lt=timezone.now() - timedelta(days=days)
+        ).delete()
+        return deleted
@@ -0,0 +1,77 @@
+"""
+✅ Transactional outbox: доменні події моделей і їх споживачі
+
+Обробник сигналу не робить розсилку сам, а додає одну компактну подію
+(OutboxEvent) у тій самій транзакції, що й запис моделі:
+
+    emit('booking.created', booking_id=1, customer_id=2, owner_id=3)
+
+Диспетчер (воркер run_workers) забирає події пачками і передає
+кожному споживачу всі payload-и свого типу одним викликом:
+
+    @consumer('booking.created')
+    def notify_booking_created(payloads):
+        Notification.objects.bulk_create([...])
+
+Доставка "хоча б один раз": при помилці пачка повторюється.
+Споживачі реєструються при імпорті модуля consumers.py застосунку (JobsConfig.ready).
+"""
+
+from django.conf import settings
+
+CONSUMERS = {}
+
+
+def consumer(*event_types):
+    """✅ Зареєструвати споживача подій (функція приймає список payload-ів)"""
+    def decorator(func):
+        for event_type in event_types:
+            CONSUMERS.setdefault(event_type, []).append(func)
+        return func
+
+    return decorator
+
+
+def deliver(events):
+    """
+    Передати події споживачам (по одному виклику на тип і споживача)
+
+    Args:
+        events: [(event_type, payload), ...] у порядку появи
+    """
+    by_type = {}
+    for event_type, payload in events:
+        by_type.setdefault(event_type, []).append(payload)
+
+    for event_type, payloads in by_type.items():
+        for handler in CONSUMERS.get(event_type, ()):
+            handler(payloads)
+
+
+def emit(event_type, **payload):
+    """Додати одну подію в outbox"""
+    emit_many([(event_type, payload)])
+
+
+def emit_many(events):
+    """
+    ✅ Додати кілька подій одним INSERT
+
+    У режимі EAGER (тести) події доставляються одразу, без запису в outbox.
+
+    Args:
+        events: [(event_type, payload), ...]
+    """
+    if not events:
+        return
+
+    if settings.OUTBOX['EAGER']:
+        deliver(events)
+        return
+
+    from apps.jobs.models import OutboxEvent
+
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(event_type=event_type, payload=payload)
+        for event_type, payload in events
+    ])
@@ -0,0 +1,100 @@
+"""
+✅ Реєстр фонових задач
+
+Задача - звичайна функція з keyword-аргументами (JSON-серіалізовними):
+
+    @task(priority=JobPriority.HIGH)
+    def send_welcome_email(user_id):
+        ...
+
+    send_welcome_email(user_id=1)          # виконати одразу
+    send_welcome_email.delay(user_id=1)    # поставити в чергу (Job)
+    send_welcome_email.enqueue({'user_id': 1}, idempotency_key='welcome:1')
+
+Задачі реєструються при імпорті модуля tasks.py застосунку (JobsConfig.ready).
+"""
+
+import json
+
+from django.conf import settings
+
+from apps.common.constants import JOB_MAX_ATTEMPTS
+from apps.common.enums import JobPriority
+
+TASKS = {}
+
+
+class Task:
+    def __init__(self, func, name, priority, max_attempts):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def delay(self, **kwargs):
+        """Поставити задачу в чергу з аргументами kwargs"""
+        return self.enqueue(kwargs)
+
+    def enqueue(self, payload=None, idempotency_key=None, priority=None, countdown=None):
+        """
+        Поставити задачу в чергу
+
+        Запис Job створюється в поточній транзакції: воркер побачить задачу
+        тільки після коміту, а при відкаті вона зникне разом з даними.
+
+        Args:
+            payload: dict аргументів задачі
+            idempotency_key: Повторний enqueue з тим самим ключем не створює задачу
+            priority: JobPriority (за замовчуванням - пріоритет задачі)
+            countdown: Виконати не раніше ніж через countdown секунд
+
+        Returns:
+            Job або None (режим EAGER - задача вже виконана)
+        """
+        payload = json.loads(json.dumps(payload or {}))
+
+        if settings.JOBS['EAGER']:
+            self(**payload)
+            return None
+
+        from apps.jobs.models import Job
+
+        return Job.enqueue(
+            self.name,
+            payload,
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+            idempotency_key=idempotency_key,
+            countdown=countdown,
+        )
+
+
+def task(name=None, priority=JobPriority.NORMAL, max_attempts=JOB_MAX_ATTEMPTS):
+    """
+    ✅ Зареєструвати функцію як фонову задачу
+
+    Args:
+        name: Ім'я задачі в черзі (за замовчуванням - module.function)
+        priority: JobPriority за замовчуванням
+        max_attempts: Спроб до статусу FAILED
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        if task_name in TASKS:
+            raise ValueError(f'Task "{task_name}" is already registered')
+        TASKS[task_name] = Task(func, task_name, priority, max_attempts)
+        return TASKS[task_name]
+
+    return decorator
+
+
+def get_task(name):
+    """Задача за ім'ям (LookupError - якщо не зареєстрована)"""
+    try:
+        return TASKS[name]
+    except KeyError:
+        raise LookupError(f'Task "{name}" is not registered')
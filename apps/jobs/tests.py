@@ -0,0 +1,217 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.bookings.models import Booking
+from apps.bookings.tests import BookingBatchFixtureMixin
+from apps.common.enums import BookingStatus, JobPriority, JobStatus
+from apps.jobs.models import Job, OutboxEvent
+from apps.jobs.outbox import consumer
+from apps.jobs.registry import task
+from apps.notifications.models import Notification
+
+CALLS = []
+
+
+@task(name='tests.record_call')
+def record_call(value):
+    CALLS.append(value)
+
+
+@task(name='tests.always_fails', max_attempts=2)
+def always_fails():
+    raise RuntimeError('boom')
+
+
+@consumer('tests.fragile')
+def fragile_consumer(payloads):
+    if any(payload.get('fail') for payload in payloads):
+        raise RuntimeError('bad event')
+    CALLS.extend(payload['value'] for payload in payloads)
+
+
+QUEUED_JOBS = {**settings.JOBS, 'EAGER': False}
+QUEUED_OUTBOX = {**settings.OUTBOX, 'EAGER': False}
+
+
+@override_settings(JOBS=QUEUED_JOBS)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_delay_enqueues_instead_of_running(self):
+        job = record_call.delay(value='a')
+
+        self.assertEqual(CALLS, [])
+        self.assertEqual(job.status, JobStatus.QUEUED)
+        self.assertEqual(job.payload, {'value': 'a'})
+
+        self.assertEqual(Job.work('worker-1'), 1)
+        self.assertEqual(CALLS, ['a'])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.DONE, 1))
+
+    def test_idempotency_key_deduplicates(self):
+        first = record_call.enqueue({'value': 'x'}, idempotency_key='record:x')
+        second = record_call.enqueue({'value': 'x'}, idempotency_key='record:x')
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_higher_priority_runs_first(self):
+        record_call.enqueue({'value': 'low'}, priority=JobPriority.LOW)
+        record_call.enqueue({'value': 'normal'})
+        record_call.enqueue({'value': 'high'}, priority=JobPriority.HIGH)
+        record_call.enqueue({'value': 'later'}, priority=JobPriority.HIGH, countdown=60)
+
+        Job.work('worker-1', batch_size=10)
+
+        self.assertEqual(CALLS, ['high', 'normal', 'low'])
+        self.assertEqual(Job.objects.filter(status=JobStatus.QUEUED).count(), 1)
+
+    def test_failed_job_is_retried_with_backoff_then_failed(self):
+        job = always_fails.delay()
+
+        with self.assertLogs('apps.jobs.models', 'ERROR'):
+            Job.work('worker-1')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.QUEUED, 1))
+        self.assertIn('RuntimeError: boom', job.last_error)
+        self.assertGreater(job.run_at, timezone.now())
+
+        # Затримка повтору ще не минула
+        self.assertEqual(Job.work('worker-1'), 0)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('apps.jobs.models', 'ERROR'):
+            Job.work('worker-1')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.FAILED, 2))
+
+    def test_stale_running_job_is_requeued(self):
+        job = record_call.delay(value='stale')
+        Job.claim('crashed-worker')
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(Job.requeue_stale(), 1)
+        Job.work('worker-2')
+
+        self.assertEqual(CALLS, ['stale'])
+
+    def test_claimed_job_is_not_given_to_another_worker(self):
+        record_call.delay(value='once')
+
+        self.assertEqual(len(Job.claim('worker-1')), 1)
+        self.assertEqual(Job.claim('worker-2'), [])
+
+    def test_run_workers_once_drains_queue(self):
+        for value in range(3):
+            record_call.delay(value=value)
+
+        call_command('run_workers', processes=1, once=True, stdout=StringIO())
+
+        self.assertEqual(sorted(CALLS), [0, 1, 2])
+        self.assertFalse(Job.objects.exclude(status=JobStatus.DONE).exists())
+
+
+@override_settings(JOBS=QUEUED_JOBS)
+class PeriodicJobTests(BookingBatchFixtureMixin, TestCase):
+    PERIODIC = {'apps.bookings.tasks.advance_bookings': 600}
+
+    def test_periodic_job_is_enqueued_once_per_interval(self):
+        now = timezone.now()
+
+        # Два воркери в одному інтервалі - одна задача
+        Job.schedule_periodic(self.PERIODIC, now=now)
+        Job.schedule_periodic(self.PERIODIC, now=now)
+        self.assertEqual(Job.objects.filter(name='apps.bookings.tasks.advance_bookings').count(), 1)
+
+        Job.schedule_periodic(self.PERIODIC, now=now + timedelta(seconds=600))
+        self.assertEqual(Job.objects.filter(name='apps.bookings.tasks.advance_bookings').count(), 2)
+
+    def test_worker_expires_bookings_and_notifies(self):
+        stale = self.bookings[0]
+        Booking.objects.filter(pk=stale.pk).update(check_in=self.today, check_out=self.today + timedelta(days=2))
+
+        Job.schedule_periodic(self.PERIODIC)
+        self.assertEqual(Job.work('worker-1'), 1)
+
+        self.assertEqual(Booking.objects.get(pk=stale.pk).status, BookingStatus.EXPIRED)
+        self.assertTrue(Notification.objects.filter(user=self.customer).exists())
+
+    def test_purge_removes_old_finished_jobs(self):
+        old = record_call.enqueue({'value': 'old'})
+        Job.objects.filter(pk=old.pk).update(
+            status=JobStatus.DONE, finished_at=timezone.now() - timedelta(days=30)
+        )
+        fresh = record_call.enqueue({'value': 'fresh'})
+
+        self.assertEqual(Job.purge(), 1)
+        self.assertEqual(list(Job.objects.values_list('pk', flat=True)), [fresh.pk])
+
+
+@override_settings(OUTBOX=QUEUED_OUTBOX)
+class OutboxTests(BookingBatchFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        OutboxEvent.objects.all().delete()
+        CALLS.clear()
+
+    def test_booking_write_appends_one_event_instead_of_notifications(self):
+        booking = self._booking(self.listing, 20)
+
+        self.assertFalse(Notification.objects.exists())
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.event_type, 'booking.created')
+        self.assertEqual(event.payload, {
+            'booking_id': booking.pk,
+            'customer_id': self.customer.pk,
+            'owner_id': self.owner.pk,
+        })
+
+    def test_dispatch_delivers_events_in_batch(self):
+        booking = self._booking(self.listing, 20)
+        Booking.bulk_transition(self.bookings, BookingStatus.CONFIRMED)
+        self.assertEqual(OutboxEvent.objects.count(), 1 + len(self.bookings))
+
+        self.assertEqual(OutboxEvent.dispatch('dispatcher-1'), 1 + len(self.bookings))
+
+        self.assertEqual(
+            Notification.objects.filter(related_object_id=booking.pk).count(), 2
+        )
+        self.assertEqual(
+            Notification.objects.filter(
+                user=self.customer, title='Статус бронювання оновлено'
+            ).count(),
+            len(self.bookings),
+        )
+        self.assertFalse(OutboxEvent.objects.filter(dispatched_at__isnull=True).exists())
+        self.assertEqual(OutboxEvent.dispatch('dispatcher-1'), 0)
+
+    def test_failing_event_does_not_block_batch(self):
+        OutboxEvent.objects.bulk_create([
+            OutboxEvent(event_type='tests.fragile', payload={'value': 1}),
+            OutboxEvent(event_type='tests.fragile', payload={'fail': True}),
+            OutboxEvent(event_type='tests.fragile', payload={'value': 2}),
+        ])
+
+        with self.assertLogs('apps.jobs.models', 'ERROR'):
+            OutboxEvent.dispatch('dispatcher-1')
+
+        self.assertEqual(CALLS, [1, 2])
+        failed = OutboxEvent.objects.get(dispatched_at__isnull=True)
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn('RuntimeError: bad event', failed.last_error)
+        self.assertEqual(failed.locked_by, '')
+
+    def test_run_workers_once_drains_outbox(self):
+        self._booking(self.listing, 20)
+
+        call_command('run_workers', processes=1, once=True, stdout=StringIO())
+
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertFalse(OutboxEvent.objects.filter(dispatched_at__isnull=True).exists())
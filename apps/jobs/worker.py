@@ -0,0 +1,75 @@
+"""
+✅ Цикл воркера фонових задач (один процес)
+
+run_workers запускає кілька таких процесів; кожен має свій worker_id,
+доставляє події outbox (OutboxEvent.dispatch) і забирає задачі (Job.claim).
+"""
+
+import logging
+import os
+import socket
+import time
+import uuid
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+def make_worker_id() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+
+
+def run_worker(batch_size, poll_interval, once=False, stop=None) -> int:
+    """
+    Виконувати задачі, поки не встановлено stop (або черга порожня при once=True)
+
+    Args:
+        batch_size: Задач за один claim
+        poll_interval: Пауза (секунди), коли задач немає
+        once: Вийти, щойно черга спорожніла
+        stop: threading/multiprocessing Event для зупинки
+
+    Returns:
+        int: Кількість оброблених задач і подій
+    """
+    from apps.jobs.models import Job, OutboxEvent
+
+    worker_id = make_worker_id()
+    processed = 0
+    logger.info('Worker %s started', worker_id)
+    OutboxEvent.purge()
+    Job.purge()
+    scheduled = {}
+
+    while not (stop and stop.is_set()):
+        Job.requeue_stale()
+        Job.schedule_periodic(settings.JOBS['PERIODIC'], scheduled)
+        count = OutboxEvent.dispatch(worker_id, batch_size=settings.OUTBOX['BATCH_SIZE'])
+        count += Job.work(worker_id, batch_size=batch_size)
+        processed += count
+
+        if not count:
+            if once:
+                break
+            time.sleep(poll_interval)
+            # За час простою з'єднання могло застаріти (CONN_MAX_AGE, рестарт БД)
+            close_old_connections()
+
+    logger.info('Worker %s stopped, processed %s jobs/events', worker_id, processed)
+    return processed
+
+
+def worker_process(batch_size, poll_interval, once, stop):
+    """Точка входу дочірнього процесу (для spawn - з налаштуванням Django)"""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    try:
+        run_worker(batch_size, poll_interval, once=once, stop=stop)
+    except KeyboardInterrupt:
+        pass
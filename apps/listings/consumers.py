@@ -0,0 +1,23 @@
+import logging
+
+from apps.jobs.outbox import consumer
+from apps.notifications.models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+@consumer('listing.created')
+def notify_listing_created(payloads):
+    """Сповіщення власникам про створені оголошення (один bulk_create)"""
+    notifications = Notification.objects.bulk_create([
+        Notification(
+            user_id=payload['owner_id'],
+            title='Нове оголошення створене',
+            message=f'Оголошення {payload["title"]} створене',
+            notification_type='LISTING',
+            related_object_id=payload['listing_id'],
+            related_object_type='listing',
+        )
+        for payload in payloads
+    ])
+    logger.info("Listing notifications created. count=%s", len(notifications))
@@ -1,5 +1,70 @@
 import django_filters
-from .models import Listing
+from django import forms
+from django.db.models import Exists, F, OuterRef
+from rest_framework import filters
+
+from .models import Amenity, Listing
+from apps.common.enums import ACTIVE_BOOKING_STATUSES
+from apps.common.geo import apply_geo_filters, geo_param_errors
+from apps.search.indexing import search_listings
+
+
+def filter_available(queryset, check_in, check_out):
+    """
+    ✅ Залишає тільки оголошення, вільні на всі ночі [check_in, check_out)
+
+    Один anti-join (NOT EXISTS) по індексу Booking(listing, check_in, check_out)
+    замість окремої перевірки календаря для кожного оголошення.
+    """
+    from apps.bookings.models import Booking
+
+    overlapping = Booking.objects.filter(
+        listing=OuterRef('pk'),
+        status__in=ACTIVE_BOOKING_STATUSES,
+        check_in__lt=check_out,
+        check_out__gt=check_in,
+    )
+    return queryset.filter(~Exists(overlapping))
+
+
+def filter_amenities(queryset, amenities):
+    """
+    ✅ Залишає оголошення з усіма зручностями з набору
+
+    Побітова перевірка amenity_mask & required = required замість JOIN
+    (або GROUP BY/HAVING) по таблиці M2M на кожну зручність.
+    Зручності без біта (понад AMENITY_MAX_COUNT) - через JOIN по M2M.
+    """
+    for amenity in amenities:
+        if amenity.bit is None:
+            queryset = queryset.filter(amenities=amenity)
+
+    required = Amenity.mask_of(amenities)
+    if not required:
+        return queryset
+    return queryset.alias(
+        _amenity_match=F('amenity_mask').bitand(required)
+    ).filter(_amenity_match=required)
+
+
+class ListingFilterForm(forms.Form):
+    """Перевіряє, що діапазон дат доступності заданий коректно"""
+
+    def clean(self):
+        cleaned_data = super().clean()
+        check_in = cleaned_data.get('check_in')
+        check_out = cleaned_data.get('check_out')
+
+        if bool(check_in) != bool(check_out):
+            missing = 'check_out' if check_in else 'check_in'
+            self.add_error(missing, 'Both check_in and check_out are required.')
+        elif check_in and check_out <= check_in:
+            self.add_error('check_out', 'Check-out must be after check-in.')
+
+        for field, message in geo_param_errors(cleaned_data).items():
+            self.add_error(field, message)
+
+        return cleaned_data
 
 
 class ListingFilter(django_filters.FilterSet):
@@ -21,11 +86,71 @@ class ListingFilter(django_filters.FilterSet):
 
     owner = django_filters.NumberFilter(field_name='owner_id')
 
+    # 🔹 Усі зручності разом: ?amenities=1&amenities=4
+    amenities = django_filters.ModelMultipleChoiceFilter(
+        queryset=Amenity.objects.all(),
+        method='filter_amenities'
+    )
+
+    # 🔹 Доступність на дати: ?check_in=2025-12-01&check_out=2025-12-05
+    check_in = django_filters.DateFilter(method='filter_dates')
+    check_out = django_filters.DateFilter(method='filter_dates')
+
+    # 🔹 Гео-пошук: ?lat=52.52&lng=13.40&radius_km=5
+    #    або вікно карти: ?min_lat=..&min_lng=..&max_lat=..&max_lng=..
+    lat = django_filters.NumberFilter(method='filter_geo')
+    lng = django_filters.NumberFilter(method='filter_geo')
+    radius_km = django_filters.NumberFilter(method='filter_geo')
+    min_lat = django_filters.NumberFilter(method='filter_geo')
+    min_lng = django_filters.NumberFilter(method='filter_geo')
+    max_lat = django_filters.NumberFilter(method='filter_geo')
+    max_lng = django_filters.NumberFilter(method='filter_geo')
+
     class Meta:
         model = Listing
+        form = ListingFilterForm
         fields = [
             'city',          # ← тепер ?city= працює
             'price',
             'is_active',
             'owner',
-        ]
\ No newline at end of file
+            'check_in',
+            'check_out',
+        ]
+
+    def filter_dates(self, queryset, name, value):
+        # Обидві дати застосовуються разом у filter_queryset
+        return queryset
+
+    def filter_amenities(self, queryset, name, value):
+        return filter_amenities(queryset, value)
+
+    def filter_geo(self, queryset, name, value):
+        # Гео-параметри застосовуються разом у filter_queryset
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        queryset = apply_geo_filters(queryset, self.form.cleaned_data)
+
+        check_in = self.form.cleaned_data.get('check_in')
+        check_out = self.form.cleaned_data.get('check_out')
+        if check_in and check_out:
+            queryset = filter_available(queryset, check_in, check_out)
+
+        return queryset
+
+
+class ListingSearchFilter(filters.SearchFilter):
+    """
+    ✅ ?search= через пошуковий індекс замість icontains по кількох полях
+
+    Порядок результатів задає OrderingFilter (за замовчуванням -created_at).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+        return search_listings(queryset, ' '.join(search_terms))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0004_listingphoto_is_main'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingAvailability',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('listing', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='availability', serialize=False, to='listings.listing', verbose_name='Listing')),
+                ('base_date', models.DateField(blank=True, help_text='Дата, якій відповідає нульовий біт', null=True, verbose_name='Base Date')),
+                ('booked_nights', models.BinaryField(default=b'', help_text='Бітова карта зайнятих ночей (little-endian)', verbose_name='Booked Nights')),
+            ],
+            options={
+                'verbose_name': 'Listing Availability',
+                'verbose_name_plural': 'Listing Availability',
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_location_geohash'),
+        ('listings', '0005_listingavailability'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['-created_at', '-id'], name='listings_li_created_6419a8_idx'),
+        ),
+    ]
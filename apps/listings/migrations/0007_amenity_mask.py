@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:04
+
+from django.db import migrations, models
+
+
+def fill_amenity_masks(apps, schema_editor):
+    from apps.common.constants import AMENITY_MAX_COUNT
+
+    Amenity = apps.get_model('listings', 'Amenity')
+    Listing = apps.get_model('listings', 'Listing')
+
+    bits = {}
+    for bit, amenity in enumerate(Amenity.objects.order_by('pk')[:AMENITY_MAX_COUNT]):
+        Amenity.objects.filter(pk=amenity.pk).update(bit=bit)
+        bits[amenity.pk] = bit
+
+    masks = {}
+    rows = Listing.amenities.through.objects.values_list('listing_id', 'amenity_id')
+    for listing_id, amenity_id in rows.iterator(chunk_size=2000):
+        if amenity_id in bits:
+            masks[listing_id] = masks.get(listing_id, 0) | (1 << bits[amenity_id])
+    for listing_id, mask in masks.items():
+        Listing.objects.filter(pk=listing_id).update(amenity_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0006_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='amenity',
+            name='bit',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, unique=True, verbose_name='Bit'),
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='amenity_mask',
+            field=models.BigIntegerField(default=0, editable=False, help_text='Побітове OR зручностей оголошення (для фільтра без JOIN)', verbose_name='Amenity Mask'),
+        ),
+        migrations.RunPython(fill_amenity_masks, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,13 @@
+from datetime import timedelta
 from decimal import Decimal
+from functools import reduce
+from operator import or_
 
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Q
+from django.utils import timezone
 from django.conf import settings
-from django.core.exceptions import ValidationError
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 from apps.common.models import Location, TimeModel
@@ -210,6 +215,14 @@ class Listing(TimeModel):
         verbose_name='Amenities'
     )
 
+    # ✅ Денормалізована маска зручностей (біт Amenity.bit), синхронізується m2m_changed
+    amenity_mask = models.BigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Amenity Mask',
+        help_text='Побітове OR зручностей оголошення (для фільтра без JOIN)'
+    )
+
     # ============================================
     # СТАТУС
     # ============================================
@@ -233,6 +246,7 @@ class Listing(TimeModel):
         indexes = [
             models.Index(fields=['location']),
             models.Index(fields=['owner', '-created_at']),
+            models.Index(fields=['-created_at', '-id']),  # ✅ keyset-пагінація
             models.Index(fields=['is_active', 'is_verified']),
             models.Index(fields=['price']),
             models.Index(fields=['property_type']),
@@ -392,16 +406,80 @@ class Listing(TimeModel):
 
     @property
     def average_rating(self):
-        """Середній рейтинг оголошення"""
-        reviews = self.reviews.filter(rating__isnull=False)
-        if not reviews.exists():
+        """
+        Середній рейтинг оголошення
+        ✅ Читається з агрегату ListingRating (select_related('rating_stats'))
+        """
+        try:
+            return float(self.rating_stats.average_rating)
+        except ObjectDoesNotExist:
             return 0
-        return reviews.aggregate(models.Avg('rating'))['rating__avg']
 
     @property
     def review_count(self):
-        """Кількість відгуків"""
-        return self.reviews.count()
+        """Кількість відгуків (з агрегату ListingRating)"""
+        try:
+            return self.rating_stats.total_reviews
+        except ObjectDoesNotExist:
+            return 0
+
+    # Головне фото: позначене is_main, інакше перше за order
+    MAIN_PHOTO_ORDERING = ('-is_main', 'order', 'created_at')
+
+    @classmethod
+    def main_photo_prefetch(cls, lookup='photos'):
+        """
+        ✅ Prefetch тільки головного фото (один рядок на оголошення)
+
+        Args:
+            lookup: Шлях до фото (наприклад 'listing__photos' для бронювань)
+        """
+        return models.Prefetch(
+            lookup,
+            queryset=ListingPhoto.objects.order_by(*cls.MAIN_PHOTO_ORDERING)[:1],
+            to_attr='main_photos'
+        )
+
+    @property
+    def main_photo(self):
+        """
+        Головне фото оголошення
+        ✅ Без запитів, якщо фото підтягнуті main_photo_prefetch() або prefetch_related('photos')
+        """
+        if hasattr(self, 'main_photos'):
+            return self.main_photos[0] if self.main_photos else None
+
+        if 'photos' in getattr(self, '_prefetched_objects_cache', {}):
+            photos = self.photos.all()
+            main = next((photo for photo in photos if photo.is_main), None)
+            return main or next(iter(photos), None)
+
+        return self.photos.order_by(*self.MAIN_PHOTO_ORDERING).first()
+
+    @classmethod
+    def refresh_amenity_masks(cls, listing_ids) -> dict:
+        """
+        ✅ Перерахувати amenity_mask оголошень за M2M
+
+        Оновлює і updated_at - зміну бачить знімок пошуку (apps/search/catalog.py).
+
+        Returns:
+            dict: {listing_id: нова маска}
+        """
+        masks = dict.fromkeys(listing_ids, 0)
+        if not masks:
+            return masks
+
+        rows = cls.amenities.through.objects.filter(
+            listing_id__in=masks, amenity__bit__isnull=False
+        ).values_list('listing_id', 'amenity__bit')
+        for listing_id, bit in rows:
+            masks[listing_id] |= 1 << bit
+
+        now = timezone.now()
+        for listing_id, mask in masks.items():
+            cls.objects.filter(pk=listing_id).update(amenity_mask=mask, updated_at=now)
+        return masks
 
     def get_price_for_nights(self, num_nights: int) -> dict:
         """
@@ -494,6 +572,15 @@ class Amenity(TimeModel):
         verbose_name='Description'
     )
 
+    # ✅ Номер біта в Listing.amenity_mask (призначається при першому збереженні)
+    bit = models.PositiveSmallIntegerField(
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Bit'
+    )
+
     class Meta:
         ordering = ['name']
         verbose_name = 'Amenity'
@@ -502,6 +589,51 @@ class Amenity(TimeModel):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if self.bit is not None or not self._state.adding:
+            super().save(*args, **kwargs)
+            return
+
+        # ✅ Біт вибирається без замка: паралельне створення могло зайняти той
+        # самий біт - IntegrityError по unique bit, беремо наступний вільний
+        while True:
+            self.bit = self.free_bit()
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                taken = self.bit is not None and Amenity.objects.filter(bit=self.bit).exists()
+                if not taken:
+                    self.bit = None
+                    raise
+
+    @classmethod
+    def free_bit(cls):
+        """
+        Найменший вільний біт маски
+
+        Returns:
+            int | None: None, якщо всі AMENITY_MAX_COUNT бітів зайняті - така
+            зручність фільтрується через M2M (filter_amenities)
+        """
+        from apps.common.constants import AMENITY_MAX_COUNT
+
+        used = set(cls.objects.filter(bit__isnull=False).values_list('bit', flat=True))
+        for bit in range(AMENITY_MAX_COUNT):
+            if bit not in used:
+                return bit
+        return None
+
+    @staticmethod
+    def mask_of(amenities) -> int:
+        """Маска набору зручностей (побітове OR); зручності без біта не входять"""
+        mask = 0
+        for amenity in amenities:
+            if amenity.bit is not None:
+                mask |= 1 << amenity.bit
+        return mask
+
 
 class ListingPhoto(TimeModel):
     """
@@ -541,3 +673,244 @@ class ListingPhoto(TimeModel):
 
     def __str__(self):
         return f'Photo for {self.listing.title}'
+
+
+class ListingAvailability(TimeModel):
+    """
+    ✅ Індекс зайнятості оголошення (бітова карта ночей)
+
+    Біт i встановлений => ніч (base_date + i) зайнята активним бронюванням.
+    Оновлюється сигналами бронювань, тому перевірка перетину дат
+    читає один рядок по PK замість сканування таблиці Booking.
+    """
+
+    listing = models.OneToOneField(
+        Listing,
+        on_delete=models.CASCADE,
+        related_name='availability',
+        verbose_name='Listing',
+        primary_key=True
+    )
+
+    base_date = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name='Base Date',
+        help_text='Дата, якій відповідає нульовий біт'
+    )
+
+    booked_nights = models.BinaryField(
+        default=b'',
+        verbose_name='Booked Nights',
+        help_text='Бітова карта зайнятих ночей (little-endian)'
+    )
+
+    class Meta:
+        verbose_name = 'Listing Availability'
+        verbose_name_plural = 'Listing Availability'
+
+    def __str__(self):
+        return f'Availability for listing #{self.listing_id}'
+
+    # ============================================
+    # БІТОВА КАРТА
+    # ============================================
+
+    @property
+    def bits(self) -> int:
+        return int.from_bytes(bytes(self.booked_nights or b''), 'little')
+
+    def _store(self, bits: int, base_date):
+        """Зберегти карту, відкинувши порожні ночі на початку"""
+        if bits <= 0:
+            self.base_date = None
+            self.booked_nights = b''
+            return
+
+        # Зсуваємо base_date на першу зайняту ніч
+        leading_free = (bits & -bits).bit_length() - 1
+        bits >>= leading_free
+        self.base_date = base_date + timedelta(days=leading_free)
+        self.booked_nights = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+    def _range_mask(self, check_in, check_out) -> int:
+        start = (check_in - self.base_date).days
+        end = (check_out - self.base_date).days
+        start = max(start, 0)
+        if end <= start:
+            return 0
+        return ((1 << (end - start)) - 1) << start
+
+    def is_free(self, check_in, check_out) -> bool:
+        """Чи вільні всі ночі з check_in до check_out (не включно)"""
+        bits = self.bits
+        if not bits or check_out <= check_in:
+            return True
+        return not (bits & self._range_mask(check_in, check_out))
+
+    def mark(self, check_in, check_out, booked=True):
+        """Позначити ночі як зайняті (booked=True) або вільні"""
+        if not check_in or not check_out or check_out <= check_in:
+            return
+
+        bits = self.bits
+        base_date = self.base_date or check_in
+
+        if check_in < base_date:
+            bits <<= (base_date - check_in).days
+            base_date = check_in
+
+        self.base_date = base_date
+        mask = self._range_mask(check_in, check_out)
+        bits = bits | mask if booked else bits & ~mask
+        self._store(bits, base_date)
+
+    # ============================================
+    # ДОСТУП ДО ІНДЕКСУ
+    # ============================================
+
+    @classmethod
+    def rebuild(cls, listing_id):
+        """
+        Перебудувати індекс з активних бронювань (джерело істини - Booking)
+
+        ✅ Бронювання читаються під замком рядка індексу: паралельний
+        apply_changes() чекає на перебудову і не губиться (без "застарілої" карти)
+
+        Args:
+            listing_id: ID оголошення
+
+        Returns:
+            ListingAvailability: індекс, заблокований до кінця зовнішньої транзакції
+        """
+        from apps.bookings.models import Booking
+        from apps.common.enums import ACTIVE_BOOKING_STATUSES
+
+        with transaction.atomic():
+            availability = cls._lock_row(listing_id)
+            if availability is None:
+                # Порожній рядок як замок (ignore_conflicts переживе паралельну вставку)
+                cls.objects.bulk_create([cls(listing_id=listing_id)], ignore_conflicts=True)
+                availability = cls._lock_row(listing_id)
+
+            availability._store(0, None)
+            ranges = Booking.objects.filter(
+                listing_id=listing_id,
+                status__in=ACTIVE_BOOKING_STATUSES,
+            ).values_list('check_in', 'check_out')
+
+            for check_in, check_out in ranges:
+                availability.mark(check_in, check_out)
+
+            availability.save(update_fields=['base_date', 'booked_nights', 'updated_at'])
+        return availability
+
+    @classmethod
+    def for_listing(cls, listing_id):
+        """Отримати індекс оголошення (будується ліниво при першому зверненні)"""
+        try:
+            return cls.objects.get(listing_id=listing_id)
+        except cls.DoesNotExist:
+            return cls.rebuild(listing_id)
+
+    @classmethod
+    def is_range_available(cls, listing_id, check_in, check_out) -> bool:
+        """Чи вільні дати для оголошення (один запит по PK)"""
+        return cls.for_listing(listing_id).is_free(check_in, check_out)
+
+    @classmethod
+    def apply_change(cls, listing_id, released=None, claimed=None):
+        """
+        Застосувати зміну бронювання до індексу
+
+        Args:
+            listing_id: ID оголошення
+            released: (check_in, check_out) ночі, які звільняються
+            claimed: (check_in, check_out) ночі, які займаються
+        """
+        cls.apply_changes(
+            listing_id,
+            released=[released] if released else (),
+            claimed=[claimed] if claimed else (),
+        )
+
+    @classmethod
+    def apply_changes(cls, listing_id, released=(), claimed=()):
+        """
+        Застосувати зміни кількох бронювань одного оголошення (один UPDATE)
+
+        Args:
+            released: [(check_in, check_out), ...] ночі, які звільняються
+            claimed: [(check_in, check_out), ...] ночі, які займаються
+        """
+        if not released and not claimed:
+            return
+
+        with transaction.atomic():
+            availability = cls._lock_row(listing_id)
+
+            if availability is None:
+                # Індексу ще немає - будуємо під тим самим замком; бронювання
+                # вже записані в цій транзакції, тож зміни в ньому враховані
+                cls.rebuild(listing_id)
+                return
+
+            for check_in, check_out in released:
+                availability.mark(check_in, check_out, booked=False)
+            for check_in, check_out in claimed:
+                availability.mark(check_in, check_out, booked=True)
+
+            # Карта не рахує бронювання на ніч: ночі, які ще тримають інші
+            # активні бронювання (перетини після правок адміна), займаються знову
+            for check_in, check_out in cls._active_ranges(listing_id, released):
+                availability.mark(check_in, check_out, booked=True)
+
+            availability.save(update_fields=['base_date', 'booked_nights', 'updated_at'])
+
+    @classmethod
+    def _active_ranges(cls, listing_id, ranges):
+        """Дати активних бронювань оголошення, що перетинають ranges"""
+        from apps.bookings.models import Booking
+        from apps.common.enums import ACTIVE_BOOKING_STATUSES
+
+        overlaps = [
+            Q(check_in__lt=check_out, check_out__gt=check_in)
+            for check_in, check_out in ranges
+            if check_in and check_out and check_in < check_out
+        ]
+        if not overlaps:
+            return []
+
+        return Booking.objects.filter(
+            reduce(or_, overlaps),
+            listing_id=listing_id,
+            status__in=ACTIVE_BOOKING_STATUSES,
+        ).values_list('check_in', 'check_out')
+
+    @classmethod
+    def lock(cls, listing_id):
+        """
+        ✅ Заблокувати рядок оголошення до кінця транзакції
+
+        Рядок індексу - замок бронювань оголошення: паралельні бронювання
+        одного оголошення виконуються по черзі, інших оголошень - не чекають.
+        Викликати всередині transaction.atomic().
+
+        Returns:
+            ListingAvailability: індекс, прочитаний під замком
+        """
+        availability = cls._lock_row(listing_id)
+        if availability is None:
+            # Індексу ще немає - будуємо (рядок створюється і блокується в rebuild)
+            availability = cls.rebuild(listing_id)
+        return availability
+
+    @classmethod
+    def _lock_row(cls, listing_id):
+        """Прочитати рядок індексу під замком (None - рядка ще немає)"""
+        if not connection.features.has_select_for_update:
+            # SQLite ігнорує FOR UPDATE - UPDATE першим запитом транзакції
+            # одразу бере блокування БД на запис (а не після читання)
+            cls.objects.filter(listing_id=listing_id).update(updated_at=timezone.now())
+
+        return cls.objects.select_for_update().filter(listing_id=listing_id).first()
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db import models
 
 from .models import Listing, Amenity, ListingPhoto
-from apps.reviews.models import OwnerRating
+from apps.reviews.loaders import OwnerRatingLoader
 from apps.common.models import Location
 from apps.common.constants import (
     # Listing info
@@ -175,6 +176,27 @@ class LocationSerializerMixin(serializers.Serializer):
         return data
 
 
+class ListingBatchListSerializer(serializers.ListSerializer):
+    """
+    ✅ Список оголошень з пакетним завантаженням рейтингів власників
+
+    Перед серіалізацією сторінки підвантажує OwnerRating усіх власників
+    одним запитом замість окремого запиту на кожне оголошення.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        listings = list(iterable)
+
+        child_fields = self.child.fields
+        if 'owner_rating' in child_fields or 'owner_info' in child_fields:
+            OwnerRatingLoader.for_context(self.context).prime(
+                listing.owner for listing in listings
+            )
+
+        return super().to_representation(listings)
+
+
 class ListingSerializer(LocationSerializerMixin, serializers.ModelSerializer):
     """
     Повний серіалізатор для оголошень
@@ -212,6 +234,7 @@ class ListingSerializer(LocationSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Listing
+        list_serializer_class = ListingBatchListSerializer
         fields = [
             'id',
             'owner',
@@ -284,19 +307,8 @@ class ListingSerializer(LocationSerializerMixin, serializers.ModelSerializer):
         return obj.owner.get_full_name() or obj.owner.email
 
     def get_owner_rating(self, obj):
-        """Отримати агрегований рейтинг власника"""
-        try:
-            stats = OwnerRating.objects.get(owner=obj.owner)
-        except OwnerRating.DoesNotExist:
-            return {
-                'average_rating': 0.0,
-                'total_reviews': 0,
-            }
-
-        return {
-            'average_rating': float(stats.average_rating),
-            'total_reviews': stats.total_reviews,
-        }
+        """Отримати агрегований рейтинг власника (пакетно, в межах запиту)"""
+        return OwnerRatingLoader.for_context(self.context).load(obj.owner)
 
     def get_hotel_rooms_count(self, obj):
         """
@@ -632,10 +644,10 @@ class ListingListSerializer(serializers.ModelSerializer):
 
     def get_main_photo(self, obj):
         """
-        У ListingPhoto немає is_main, є order.
-        Тому головне фото = перше за order.
+        Головне фото = позначене is_main, інакше перше за order.
+        ✅ Читається з prefetch (Listing.main_photo), без запиту на кожен рядок.
         """
-        photo = obj.photos.order_by("order", "created_at").first()
+        photo = obj.main_photo
         if not photo:
             return None
 
@@ -1,13 +1,17 @@
 import logging
 from django.apps import apps
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from django.apps import apps
+
+from apps.common.cache import city_tag, invalidate_tags, listing_tag, owner_tag
+from apps.jobs.outbox import emit
 
 logger = logging.getLogger(__name__)
 
 Listing = apps.get_model('listings', 'Listing')
-Notification = apps.get_model('notifications', 'Notification')
+ListingPhoto = apps.get_model('listings', 'ListingPhoto')
+Amenity = apps.get_model('listings', 'Amenity')
+Location = apps.get_model('common', 'Location')
 
 
 @receiver(post_save, sender=Listing)
@@ -15,19 +19,69 @@ def create_listing_notification(sender, instance, created, **kwargs):
     if not created:
         return
 
-    title = 'Нове оголошення створене'
-
-    notif=Notification.objects.create(
-        user=instance.owner,
-        title=title,
-        message=f'Оголошення {instance.title} створене',
-        notification_type='LISTING',
-        related_object_id=instance.id,
-        related_object_type='listing',
-    )
-    logger.info(
-        "Notification created. notification_id=%s user_id=%s title=%s",
-        notif.id,
-        instance.id,
-        title,
-    )
+    # ✅ Подія в outbox (сповіщення створить споживач, не запит)
+    emit('listing.created', listing_id=instance.id, owner_id=instance.owner_id, title=instance.title)
+
+
+# ============================================
+# МАСКА ЗРУЧНОСТЕЙ (Listing.amenity_mask)
+# ============================================
+
+@receiver(m2m_changed, sender=Listing.amenities.through)
+def sync_amenity_mask(sender, instance, action, reverse, pk_set, **kwargs):
+    """✅ Перерахувати маску оголошень, у яких змінився набір зручностей"""
+    if action == 'pre_clear' and reverse:
+        # Після clear() зі сторони зручності вже не видно, які оголошення її мали
+        instance._cleared_listing_ids = list(instance.listings.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        masks = Listing.refresh_amenity_masks([instance.pk])
+        instance.amenity_mask = masks[instance.pk]
+        invalidate_tags(listing_tag(instance.pk))
+        return
+
+    listing_ids = pk_set if action != 'post_clear' else instance.__dict__.pop('_cleared_listing_ids', [])
+    Listing.refresh_amenity_masks(listing_ids)
+    invalidate_tags(*map(listing_tag, listing_ids))
+
+
+@receiver(pre_delete, sender=Amenity)
+def remember_amenity_listings(sender, instance, **kwargs):
+    instance._deleted_listing_ids = list(instance.listings.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Amenity)
+def release_amenity_bit(sender, instance, **kwargs):
+    """✅ Біт видаленої зручності знімається з масок (його може отримати нова зручність)"""
+    listing_ids = getattr(instance, '_deleted_listing_ids', [])
+    Listing.refresh_amenity_masks(listing_ids)
+    invalidate_tags(*map(listing_tag, listing_ids))
+
+
+# ============================================
+# ІНВАЛІДАЦІЯ КЕШУ ВІДПОВІДЕЙ
+# ============================================
+
+@receiver(post_save, sender=Listing)
+@receiver(post_delete, sender=Listing)
+def invalidate_listing_cache(sender, instance, **kwargs):
+    """✅ Сторінка оголошення, топи з ним і рейтинг власника"""
+    invalidate_tags(listing_tag(instance.pk), owner_tag(instance.owner_id))
+
+
+@receiver(post_save, sender=ListingPhoto)
+@receiver(post_delete, sender=ListingPhoto)
+def invalidate_listing_photo_cache(sender, instance, **kwargs):
+    invalidate_tags(listing_tag(instance.listing_id))
+
+
+@receiver(post_save, sender=Location)
+def invalidate_location_cache(sender, instance, created, **kwargs):
+    """✅ Зміна адреси - місто і всі оголошення з цією локацією"""
+    if created:
+        return
+    listing_ids = Listing.objects.filter(location=instance).values_list('pk', flat=True)
+    invalidate_tags(city_tag(instance.city), *map(listing_tag, listing_ids))
@@ -1,14 +1,22 @@
+from datetime import date, timedelta
 from decimal import Decimal
+from unittest.mock import patch
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 
-from apps.common.enums import PropertyType, CancellationPolicy, UserRole
+from apps.bookings.models import Booking
+from apps.common.enums import BookingStatus, PropertyType, CancellationPolicy, UserRole
 from apps.common.models import Location
-from apps.listings.models import Listing
+from apps.listings.models import Amenity, Listing, ListingPhoto, ListingPrice
+from apps.listings.serializers import ListingSerializer
+from apps.reviews.models import ListingRating, OwnerRating
+from apps.search.catalog import ListingCatalog
 from apps.search.models import SearchHistory
 from apps.notifications.models import Notification
-from apps.users.models import User
+from apps.users.models import User, UserProfile
 
 
 class ListingVisibilityTests(TestCase):
@@ -259,3 +267,420 @@ class ListingNotificationTests(TestCase):
         self.assertEqual(latest_notification.message, f'Оголошення {listing.title} створене')
         self.assertEqual(latest_notification.related_object_id, listing.id)
         self.assertEqual(latest_notification.related_object_type, 'listing')
+
+
+class ListingAvailabilityFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            username='owner-availability',
+            email='owner-availability@example.com',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+        self.customer = User.objects.create_user(
+            username='customer-availability',
+            email='customer-availability@example.com',
+            password='password123',
+            role=UserRole.CUSTOMER,
+        )
+        self.booked = self._create_listing('Booked flat in the centre', 'Availability street 1')
+        self.free = self._create_listing('Free flat near the park', 'Availability street 2')
+
+        self.check_in = date.today() + timedelta(days=10)
+        price = ListingPrice.objects.create(listing=self.booked, amount=Decimal('80.00'))
+        Booking.objects.create(
+            customer=self.customer,
+            listing=self.booked,
+            location=self.booked.location,
+            check_in=self.check_in,
+            check_out=self.check_in + timedelta(days=3),
+            num_guests=1,
+            price_per_night=price,
+            num_nights=3,
+            base_price=Decimal('240.00'),
+            platform_fee=Decimal('24.00'),
+            total_price=Decimal('264.00'),
+            status=BookingStatus.CONFIRMED,
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+
+    def _create_listing(self, title, address):
+        location = Location.objects.create(country='Ukraine', city='Kyiv', address=address)
+        return Listing.objects.create(
+            owner=self.owner,
+            title=title,
+            description='Test listing',
+            property_type=PropertyType.APARTMENT,
+            location=location,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('80.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+
+    def _ids(self, response):
+        results = response.data['results'] if 'results' in response.data else response.data
+        return {listing['id'] for listing in results}
+
+    def test_overlapping_dates_exclude_booked_listing(self):
+        response = self.client.get('/api/listings/', {
+            'check_in': (self.check_in + timedelta(days=1)).isoformat(),
+            'check_out': (self.check_in + timedelta(days=5)).isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertSetEqual(self._ids(response), {self.free.id})
+
+    def test_adjacent_dates_keep_booked_listing(self):
+        response = self.client.get('/api/listings/', {
+            'check_in': (self.check_in + timedelta(days=3)).isoformat(),
+            'check_out': (self.check_in + timedelta(days=5)).isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertSetEqual(self._ids(response), {self.booked.id, self.free.id})
+
+    def test_invalid_date_range_returns_400(self):
+        response = self.client.get('/api/listings/', {
+            'check_in': self.check_in.isoformat(),
+            'check_out': self.check_in.isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('check_out', response.data)
+
+
+class ListingRatingQueryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            username='owner-rating',
+            email='owner-rating@example.com',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+        self.listings = []
+        for index, average in enumerate(['3.50', '4.75', None]):
+            location = Location.objects.create(
+                country='Ukraine',
+                city='Dnipro',
+                address=f'Rating street {index}',
+            )
+            listing = Listing.objects.create(
+                owner=self.owner,
+                title=f'Rated listing {index}',
+                description='Test listing',
+                property_type=PropertyType.APARTMENT,
+                location=location,
+                num_rooms=1,
+                num_bathrooms=1,
+                max_guests=2,
+                price=Decimal('60.00'),
+                cancellation_policy=CancellationPolicy.FLEXIBLE,
+            )
+            if average is not None:
+                ListingRating.objects.create(
+                    listing=listing,
+                    average_rating=Decimal(average),
+                    total_reviews=2,
+                )
+            self.listings.append(listing)
+
+    def _get_results(self, response):
+        return response.data['results'] if isinstance(response.data, dict) and 'results' in response.data else response.data
+
+    def _assert_no_review_aggregates(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+
+        self.assertEqual(response.status_code, 200)
+        review_queries = [q['sql'] for q in ctx.captured_queries if '"reviews_review"' in q['sql']]
+        self.assertEqual(review_queries, [])
+        return response
+
+    def test_list_reads_rating_without_per_row_queries(self):
+        response = self._assert_no_review_aggregates('/api/listings/')
+
+        ratings = {item['id']: item['average_rating'] for item in self._get_results(response)}
+        self.assertEqual(ratings[self.listings[0].id], 3.5)
+        self.assertEqual(ratings[self.listings[2].id], 0)
+
+    def test_ordering_by_rating(self):
+        response = self._assert_no_review_aggregates('/api/listings/', {'ordering': '-rating'})
+
+        ids = [item['id'] for item in self._get_results(response)]
+        self.assertEqual(ids[:2], [self.listings[1].id, self.listings[0].id])
+
+    def test_public_detail_reads_rating_without_review_queries(self):
+        response = self._assert_no_review_aggregates(f'/api/listings/{self.listings[1].id}/')
+
+        self.assertEqual(response.data['average_rating'], 4.75)
+
+    def test_authenticated_detail_reads_rating_without_review_queries(self):
+        self.client.force_authenticate(self.owner)
+
+        response = self._assert_no_review_aggregates(f'/api/listings/{self.listings[0].id}/')
+
+        self.assertEqual(response.data['average_rating'], 3.5)
+        self.assertEqual(response.data['review_count'], 2)
+
+    def test_search_reads_rating_without_review_queries(self):
+        response = self._assert_no_review_aggregates('/api/search/', {'query': 'Rated'})
+
+        self.assertEqual(response.data['count'], 3)
+
+
+class OwnerRatingBatchLoaderTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owners = []
+        self.listings = []
+        for index in range(3):
+            owner = User.objects.create_user(
+                username=f'batch-owner-{index}',
+                email=f'batch-owner-{index}@example.com',
+                password='password123',
+                role=UserRole.OWNER,
+            )
+            location = Location.objects.create(
+                country='Ukraine',
+                city='Odesa',
+                address=f'Batch street {index}',
+            )
+            self.listings.append(Listing.objects.create(
+                owner=owner,
+                title=f'Batch listing {index}',
+                description='Test listing',
+                property_type=PropertyType.APARTMENT,
+                location=location,
+                num_rooms=1,
+                num_bathrooms=1,
+                max_guests=2,
+                price=Decimal('60.00'),
+                cancellation_policy=CancellationPolicy.FLEXIBLE,
+            ))
+            self.owners.append(owner)
+
+        OwnerRating.objects.create(owner=self.owners[0], average_rating=Decimal('4.50'), total_reviews=4)
+        OwnerRating.objects.create(owner=self.owners[1], average_rating=Decimal('3.00'), total_reviews=1)
+
+    def _owner_rating_queries(self, ctx):
+        return [q['sql'] for q in ctx.captured_queries if '"reviews_ownerrating"' in q['sql']]
+
+    def test_list_serializer_loads_owner_ratings_in_one_query(self):
+        listings = Listing.objects.select_related('owner', 'location').order_by('id')
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = ListingSerializer(listings, many=True, context={}).data
+
+        self.assertEqual(len(self._owner_rating_queries(ctx)), 1)
+        self.assertEqual(
+            [item['owner_rating'] for item in data],
+            [
+                {'average_rating': 4.5, 'total_reviews': 4},
+                {'average_rating': 3.0, 'total_reviews': 1},
+                {'average_rating': 0.0, 'total_reviews': 0},
+            ],
+        )
+
+    def test_detail_reuses_loaded_owner_rating(self):
+        self.client.force_authenticate(self.owners[2])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/listings/{self.listings[0].id}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self._owner_rating_queries(ctx)), 1)
+        self.assertEqual(response.data['owner_info']['rating'], response.data['owner_rating'])
+        self.assertEqual(response.data['owner_rating']['average_rating'], 4.5)
+
+    def test_profile_rating_uses_select_related(self):
+        profile = UserProfile.objects.create(user=self.owners[0])
+        profile = UserProfile.objects.select_related('user__owner_rating_stats').get(pk=profile.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(profile.rating, 4.5)
+
+
+class ListingMainPhotoTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            username='photo-owner',
+            email='photo-owner@example.com',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+
+    def _create_listing(self, index, main_index=None):
+        location = Location.objects.create(
+            country='Ukraine',
+            city='Kharkiv',
+            address=f'Photo street {index}',
+        )
+        listing = Listing.objects.create(
+            owner=self.owner,
+            title=f'Photo listing {index}',
+            description='Test listing',
+            property_type=PropertyType.APARTMENT,
+            location=location,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('60.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+        for order in range(3):
+            ListingPhoto.objects.create(
+                listing=listing,
+                image=f'listings/{index}-{order}.jpg',
+                order=order,
+                is_main=order == main_index,
+            )
+        return listing
+
+    def test_main_photo_prefers_flag_then_order(self):
+        flagged = self._create_listing(0, main_index=2)
+        unflagged = self._create_listing(1)
+
+        self.assertTrue(flagged.main_photo.image.name.endswith('0-2.jpg'))
+        self.assertTrue(unflagged.main_photo.image.name.endswith('1-0.jpg'))
+
+        listings = Listing.objects.prefetch_related(Listing.main_photo_prefetch()).order_by('id')
+        with self.assertNumQueries(2):
+            names = [listing.main_photo.image.name for listing in listings]
+        self.assertEqual(names, ['listings/0-2.jpg', 'listings/1-0.jpg'])
+
+    def test_listing_cards_query_count_does_not_grow_with_rows(self):
+        self._create_listing(0, main_index=1)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/listings/')
+
+        for index in range(1, 5):
+            self._create_listing(index)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/api/listings/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        results = {item['id']: item['main_photo'] for item in response.data['results']}
+        self.assertTrue(all(results.values()))
+
+    def test_search_results_main_photo_without_extra_queries(self):
+        self._create_listing(0, main_index=1)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/search/', {'query': 'Photo'})
+
+        for index in range(1, 4):
+            self._create_listing(index)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/api/search/', {'query': 'Photo'})
+
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        self.assertTrue(response.data['results'][-1]['main_photo'].endswith('0-1.jpg'))
+
+
+class AmenityMaskTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            username='owner-amenities',
+            email='owner-amenities@example.com',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+        self.wifi, self.kitchen, self.pool = (
+            Amenity.objects.create(name=name) for name in ('Wi-Fi', 'Kitchen', 'Pool')
+        )
+        self.full = self._create_listing('Flat with everything', 'Amenity street 1')
+        self.basic = self._create_listing('Basic flat', 'Amenity street 2')
+        self.full.amenities.set([self.wifi, self.kitchen, self.pool])
+        self.basic.amenities.set([self.wifi])
+
+    def _create_listing(self, title, address):
+        location = Location.objects.create(country='Ukraine', city='Lviv', address=address)
+        return Listing.objects.create(
+            owner=self.owner,
+            title=title,
+            description='Test listing',
+            property_type=PropertyType.APARTMENT,
+            location=location,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('80.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+
+    def _mask(self, listing):
+        return Listing.objects.values_list('amenity_mask', flat=True).get(pk=listing.pk)
+
+    def _ids(self, amenities):
+        response = self.client.get('/api/listings/', {'amenities': [a.pk for a in amenities]})
+        self.assertEqual(response.status_code, 200)
+        return {listing['id'] for listing in response.data['results']}
+
+    def test_bits_are_unique_and_mask_follows_m2m(self):
+        self.assertEqual(len({self.wifi.bit, self.kitchen.bit, self.pool.bit}), 3)
+        self.assertEqual(self._mask(self.full), Amenity.mask_of([self.wifi, self.kitchen, self.pool]))
+        self.assertEqual(self.full.amenity_mask, self._mask(self.full))
+
+        self.full.amenities.remove(self.pool)
+        self.assertEqual(self._mask(self.full), Amenity.mask_of([self.wifi, self.kitchen]))
+
+        # Зміни з боку зручності (reverse) і clear()
+        self.kitchen.listings.add(self.basic)
+        self.assertEqual(self._mask(self.basic), Amenity.mask_of([self.wifi, self.kitchen]))
+        self.wifi.listings.clear()
+        self.assertEqual(self._mask(self.basic), Amenity.mask_of([self.kitchen]))
+        self.assertEqual(self._mask(self.full), Amenity.mask_of([self.kitchen]))
+
+    def test_deleted_amenity_releases_bit(self):
+        bit = self.pool.bit
+        self.pool.delete()
+
+        self.assertEqual(self._mask(self.full), Amenity.mask_of([self.wifi, self.kitchen]))
+        self.assertEqual(Amenity.objects.create(name='Sauna').bit, bit)
+
+    def test_filter_requires_all_amenities_without_join(self):
+        self.assertSetEqual(self._ids([self.wifi]), {self.full.id, self.basic.id})
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertSetEqual(self._ids([self.wifi, self.pool]), {self.full.id})
+        listing_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "listings_listing"' in q['sql']]
+        self.assertTrue(listing_queries)
+        self.assertFalse([sql for sql in listing_queries if 'listings_listing_amenities' in sql])
+
+    def test_search_filters_by_amenities(self):
+        response = self.client.get('/api/search/', {'amenities': [self.kitchen.pk, self.wifi.pk]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.full.id])
+
+        response = self.client.get('/api/search/', {'amenities': [999999]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_amenity_without_bit_is_filtered_through_m2m(self):
+        with patch.object(Amenity, 'free_bit', return_value=None):
+            balcony = Amenity.objects.create(name='Balcony')
+        self.assertIsNone(balcony.bit)
+        self.full.amenities.add(balcony)
+
+        self.assertSetEqual(self._ids([balcony]), {self.full.id})
+        self.assertSetEqual(self._ids([balcony, self.wifi]), {self.full.id})
+
+        response = self.client.get('/api/search/', {'amenities': [balcony.pk]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.full.id])
+        # Колонковий знімок маски не має - такий пошук іде через ORM
+        self.assertFalse(ListingCatalog.supports({'amenities': [balcony]}))
+
+    def test_bit_taken_concurrently_is_retried(self):
+        taken = self.wifi.bit
+        with patch.object(Amenity, 'free_bit', side_effect=[taken, 10]):
+            sauna = Amenity.objects.create(name='Sauna')
+
+        self.assertEqual(sauna.bit, 10)
@@ -70,6 +70,9 @@ GET /api/listings/?price__gte=100&price__lte=500
 GET /api/listings/?num_rooms__gte=2
 GET /api/listings/?max_guests__gte=10
 GET /api/listings/?is_active=true
+GET /api/listings/?check_in=2025-12-01&check_out=2025-12-05   - Вільні на ці дати
+GET /api/listings/?lat=50.45&lng=30.52&radius_km=5            - В радіусі 5 км
+GET /api/listings/?min_lat=50.3&min_lng=30.3&max_lat=50.6&max_lng=30.8  - У вікні карти
 
 
 ✅ НОВА ФІЛЬТРАЦІЯ (тварини):
@@ -4,9 +4,12 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from datetime import timedelta
-from django.utils import timezone
-from apps.search.models import SearchHistory
+from django.db import transaction
+from django.db.models import F
+from apps.analytics.events import record_listing_view, record_search
+from apps.common.cache import cached_response, city_tag, listing_tag, owner_tag
+from apps.common.constants import CACHE_TTL_MEDIUM
+from apps.common.pagination import KeysetPagination
 
 from .models import Listing, ListingPhoto
 from .serializers import (
@@ -17,9 +20,17 @@ from .serializers import (
     PublicListingDetailSerializer,
     ListingListSerializer,
 )
-from .filters import ListingFilter
+from .filters import ListingFilter, ListingSearchFilter
 from .permissions import IsOwnerOrReadOnly, IsOwnerToCreate, IsOwnerRoleOrAdmin
-from ..analytics.models import ListingView
+
+
+def _listing_detail_tags(request, kwargs):
+    """Теги сторінки оголошення: саме оголошення, власник і місто (до обчислення відповіді)"""
+    row = Listing.objects.filter(pk=kwargs["pk"]).values_list("owner_id", "location__city").first()
+    if row is None:
+        return [listing_tag(kwargs["pk"])]
+    owner_id, city = row
+    return [listing_tag(kwargs["pk"]), owner_tag(owner_id), city_tag(city)]
 
 
 class ListingViewSet(viewsets.ModelViewSet):
@@ -36,8 +47,9 @@ class ListingViewSet(viewsets.ModelViewSet):
 
     queryset = (
         Listing.objects
-        .select_related("location", "owner")
+        .select_related("location", "owner", "rating_stats")  # ✅ рейтинг через JOIN
         .prefetch_related("photos")  # ✅
+        .annotate(rating=F("rating_stats__average_rating"))  # ✅ ?ordering=rating
         .all()
     )
 
@@ -47,11 +59,13 @@ class ListingViewSet(viewsets.ModelViewSet):
         IsOwnerOrReadOnly,
     ]
     renderer_classes = [JSONRenderer, BrowsableAPIRenderer, TemplateHTMLRenderer]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ListingSearchFilter, filters.OrderingFilter]
     filterset_class = ListingFilter
     search_fields = ['title', 'description', 'location__city', 'location__address']
     ordering_fields = ['price', 'created_at', 'rating']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
+    keyset_ordering_fields = ['created_at', 'price']
 
     def list(self, request, *args, **kwargs):
         if request.accepted_renderer.format == 'html':
@@ -66,56 +80,52 @@ class ListingViewSet(viewsets.ModelViewSet):
         filters_data = {
             key: value
             for key, value in request.query_params.items()
-            if key not in {'search', 'page', 'page_size', 'ordering'}
+            if key not in {'search', 'page', 'page_size', 'ordering', 'limit', 'offset',
+                           'pagination', 'cursor'}
             and value not in {'', None}
         }
 
-        if search_query or filters_data:
-            SearchHistory.objects.create(
-                user=request.user if request.user.is_authenticated else None,
-                query=search_query,
-                filters=filters_data,
-                results_count=queryset.count(),
-            )
-
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
+            if not self.paginator.keyset:
+                # ✅ Кількість вже порахована пагінатором - без окремого count()
+                self._record_search(search_query, filters_data, lambda: self.paginator.count)
+            elif 'cursor' not in request.query_params:
+                # Keyset без COUNT: рахуємо тільки для історії пошуку і тільки на першій сторінці
+                self._record_search(search_query, filters_data, queryset.count)
             return self.get_paginated_response(serializer.data)
 
         serializer = self.get_serializer(queryset, many=True)
+        self._record_search(search_query, filters_data, lambda: len(serializer.data))
         return Response(serializer.data)
 
-
+    def _record_search(self, search_query, filters_data, count_results):
+        """Поставити пошук в чергу аналітики (запис у БД - пакетно, поза запитом)"""
+        if search_query or filters_data:
+            record_search(
+                user=self.request.user if self.request.user.is_authenticated else None,
+                query=search_query,
+                filters=filters_data,
+                results_count=count_results(),
+            )
 
     def retrieve(self, request, *args, **kwargs):
+        response = self._retrieve_detail(request, *args, **kwargs)
+
+        # 1 view per 24h: user OR ip (for guests) - дедуплікація при flush буфера
+        record_listing_view(
+            listing_id=response.data["id"],
+            user=request.user if request.user.is_authenticated else None,
+            ip=request.META.get("REMOTE_ADDR"),
+            user_agent=(request.META.get("HTTP_USER_AGENT") or "")[:255],
+        )
+        return response
+
+    # ✅ Публічна сторінка оголошення для гостей - з кешу (перегляд все одно рахується)
+    @cached_response("listing-detail", CACHE_TTL_MEDIUM, tags=_listing_detail_tags, anonymous_only=True)
+    def _retrieve_detail(self, request, *args, **kwargs):
         listing = self.get_object()
-
-        now = timezone.now()
-        since = now - timedelta(hours=24)
-
-        ip = request.META.get("REMOTE_ADDR")
-        ua = (request.META.get("HTTP_USER_AGENT") or "")[:255]
-        user = request.user if request.user.is_authenticated else None
-
-        qs = ListingView.objects.filter(listing=listing, created_at__gte=since)
-
-        # 1 view per 24h: user OR ip (for guests)
-        should_create = True
-        if user is not None:
-            should_create = not qs.filter(user=user).exists()
-        else:
-            if ip:
-                should_create = not qs.filter(user__isnull=True, ip=ip).exists()
-
-        if should_create:
-            ListingView.objects.create(
-                listing=listing,
-                user=user,
-                ip=ip,
-                user_agent=ua,
-            )
-
         serializer = self.get_serializer(listing)
         return Response(serializer.data)
 
@@ -205,15 +215,16 @@ class ListingPhotoViewSet(viewsets.ModelViewSet):
         """Встановити фото як головне"""
         photo = self.get_object()
 
-        # Зняти головне фото з інших фото цього оголошення
-        ListingPhoto.objects.filter(
-            listing=photo.listing,
-            is_main=True
-        ).update(is_main=False)
+        with transaction.atomic():
+            # Зняти головне фото з інших фото цього оголошення
+            ListingPhoto.objects.filter(
+                listing_id=photo.listing_id,
+                is_main=True
+            ).exclude(pk=photo.pk).update(is_main=False)
 
-        # Встановити це фото як головне
-        photo.is_main = True
-        photo.save()
+            # Встановити це фото як головне
+            photo.is_main = True
+            photo.save(update_fields=['is_main', 'updated_at'])
 
         return Response({'status': 'main photo set'})
 
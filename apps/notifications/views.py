@@ -3,6 +3,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from apps.common.pagination import KeysetPagination
+
 from .models import Notification
 from .serializers import NotificationSerializer, NotificationUpdateSerializer
 
@@ -15,6 +17,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'message']
     ordering_fields = ['created_at']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
+    keyset_ordering_fields = ['created_at']
     
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
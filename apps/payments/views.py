@@ -49,7 +49,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
         # Simulate payment processing
         payment.status = 'completed'
         payment.transaction_id = f"txn_{payment.id}_{request.user.id}"
-        payment.save()
+        payment.save(only_changed=True)
 
         return Response({'status': 'Payment processed successfully'})
 
@@ -106,7 +106,7 @@ class RefundViewSet(viewsets.ModelViewSet):
 
         refund.status = 'approved'
         refund.processed_by = request.user
-        refund.save()
+        refund.save(only_changed=True)
 
         return Response({'status': 'Refund approved'})
 
@@ -128,6 +128,6 @@ class RefundViewSet(viewsets.ModelViewSet):
 
         refund.status = 'rejected'
         refund.processed_by = request.user
-        refund.save()
+        refund.save(only_changed=True)
 
         return Response({'status': 'Refund rejected'})
\ No newline at end of file
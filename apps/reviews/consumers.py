@@ -0,0 +1,39 @@
+from apps.common.cache import (
+    TAG_TOP_LISTINGS,
+    TAG_TOP_OWNERS,
+    invalidate_tags,
+    listing_tag,
+    owner_tag,
+)
+from apps.jobs.outbox import consumer
+from apps.listings.models import Listing
+
+from .models import apply_review_rating_change
+
+
+@consumer('review.rating_changed')
+def refresh_ratings(payloads):
+    """
+    ✅ Застосувати зміни оцінок до ListingRating і OwnerRating
+
+    Кеш інвалідується після оновлення рейтингів - інакше між записом відгуку
+    і доставкою події в кеш міг потрапити старий рейтинг.
+    """
+    for payload in payloads:
+        apply_review_rating_change(
+            payload['listing_id'],
+            payload['old_rating'],
+            payload['new_rating'],
+            # Події, записані до появи версій, ключа ідемпотентності не мають
+            payload.get('review_id'),
+            payload.get('version'),
+        )
+
+    listing_ids = {payload['listing_id'] for payload in payloads}
+    owner_ids = Listing.objects.filter(pk__in=listing_ids).values_list('owner_id', flat=True)
+    invalidate_tags(
+        *(listing_tag(listing_id) for listing_id in listing_ids),
+        *(owner_tag(owner_id) for owner_id in set(owner_ids)),
+        TAG_TOP_LISTINGS,
+        TAG_TOP_OWNERS,
+    )
@@ -0,0 +1,90 @@
+from .models import OwnerRating
+
+
+class OwnerRatingLoader:
+    """
+    ✅ Пакетне завантаження рейтингів власників в межах одного запиту
+
+    Всі серіалізатори одного запиту ділять один loader:
+    - prime() підвантажує рейтинги всіх власників сторінки одним запитом
+    - load() повертає рейтинг з кешу (або довантажує відсутнього власника)
+    - якщо зв'язок owner_rating_stats вже підтягнутий select_related - запиту немає
+    """
+
+    CONTEXT_KEY = '_owner_rating_loader'
+
+    def __init__(self):
+        self._cache = {}
+
+    @classmethod
+    def for_context(cls, context):
+        """Отримати loader, прив'язаний до request (або до контексту серіалізатора)"""
+        request = context.get('request')
+        holder = request if request is not None else context
+
+        if isinstance(holder, dict):
+            return holder.setdefault(cls.CONTEXT_KEY, cls())
+
+        loader = getattr(holder, cls.CONTEXT_KEY, None)
+        if loader is None:
+            loader = cls()
+            setattr(holder, cls.CONTEXT_KEY, loader)
+        return loader
+
+    @staticmethod
+    def summary(stats) -> dict:
+        """Короткий рейтинг власника для відповіді API"""
+        if stats is None:
+            return {
+                'average_rating': 0.0,
+                'total_reviews': 0,
+            }
+
+        return {
+            'average_rating': float(stats['average_rating']),
+            'total_reviews': stats['total_reviews'],
+        }
+
+    def prime(self, owners):
+        """
+        Підвантажити рейтинги для набору власників одним запитом
+
+        Args:
+            owners: Ітерований набір об'єктів User
+        """
+        relation = OwnerRating._meta.get_field('owner').remote_field
+        missing = set()
+
+        for owner in owners:
+            if owner is None or owner.pk in self._cache:
+                continue
+
+            if relation.is_cached(owner):
+                stats = relation.get_cached_value(owner)
+                self._cache[owner.pk] = self.summary(
+                    None if stats is None else {
+                        'average_rating': stats.average_rating,
+                        'total_reviews': stats.total_reviews,
+                    }
+                )
+            else:
+                missing.add(owner.pk)
+
+        if not missing:
+            return
+
+        rows = OwnerRating.objects.filter(owner_id__in=missing).values(
+            'owner_id', 'average_rating', 'total_reviews'
+        )
+        for row in rows:
+            self._cache[row['owner_id']] = self.summary(row)
+            missing.discard(row['owner_id'])
+
+        for owner_id in missing:
+            self._cache[owner_id] = self.summary(None)
+
+    def load(self, owner) -> dict:
+        """Рейтинг одного власника (з кешу запиту)"""
+        if owner.pk not in self._cache:
+            self.prime([owner])
+        return self._cache[owner.pk]
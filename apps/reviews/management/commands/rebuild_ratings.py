@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from apps.listings.models import Listing
+from apps.reviews.models import ListingRating, OwnerRating
+
+
+class Command(BaseCommand):
+    help = (
+        'Повністю перераховує ListingRating і OwnerRating з відгуків (звірка). '
+        'Оголошення і власники з недоставленими змінами оцінок пропускаються'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--listing',
+            type=int,
+            action='append',
+            dest='listing_ids',
+            help='ID оголошення (можна вказати кілька разів)'
+        )
+        parser.add_argument(
+            '--owner',
+            type=int,
+            action='append',
+            dest='owner_ids',
+            help='ID власника (можна вказати кілька разів)'
+        )
+
+    def handle(self, *args, **options):
+        listing_ids = options['listing_ids']
+        owner_ids = options['owner_ids']
+
+        if not listing_ids and not owner_ids:
+            # Звірка всіх оголошень і власників
+            listing_ids = list(Listing.objects.values_list('id', flat=True))
+            owner_ids = list(
+                get_user_model().objects.filter(listings__isnull=False)
+                .distinct()
+                .values_list('id', flat=True)
+            )
+
+        listings = [ListingRating.reconcile(listing_id) for listing_id in listing_ids or []]
+        owners = [OwnerRating.reconcile(owner_id) for owner_id in owner_ids or []]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Перераховано: {listings.count(True)} оголошень, '
+            f'{owners.count(True)} власників'
+        ))
+        skipped = listings.count(False) + owners.count(False)
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f'Пропущено (події в outbox ще не доставлені): '
+                f'{listings.count(False)} оголошень, {owners.count(False)} власників'
+            ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0005_listingavailability'),
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listingrating',
+            index=models.Index(fields=['-average_rating', '-total_reviews'], name='reviews_lis_average_abe5cc_idx'),
+        ),
+    ]
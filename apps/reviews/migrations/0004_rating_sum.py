@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:45
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_rating_sum(apps, schema_editor):
+    rating_sum = (
+        F('stars_1') + 2 * F('stars_2') + 3 * F('stars_3')
+        + 4 * F('stars_4') + 5 * F('stars_5')
+    )
+    for model_name in ('ListingRating', 'OwnerRating'):
+        apps.get_model('reviews', model_name).objects.update(rating_sum=rating_sum)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_listingrating_average_rating_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listingrating',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, help_text='Сума всіх оцінок (для інкрементального середнього)', verbose_name='Rating Sum'),
+        ),
+        migrations.AddField(
+            model_name='ownerrating',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, help_text='Сума всіх оцінок (для інкрементального середнього)', verbose_name='Rating Sum'),
+        ),
+        migrations.RunPython(fill_rating_sum, migrations.RunPython.noop),
+    ]
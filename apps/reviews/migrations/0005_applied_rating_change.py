@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='rating_version',
+            field=models.PositiveIntegerField(default=0, help_text='Номер зміни оцінки (ключ ідемпотентності подій review.rating_changed)', verbose_name='Rating Version'),
+        ),
+        migrations.CreateModel(
+            name='AppliedRatingChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_id', models.PositiveBigIntegerField(verbose_name='Review ID')),
+                ('version', models.PositiveIntegerField(verbose_name='Version')),
+                ('listing_id', models.PositiveBigIntegerField(verbose_name='Listing ID')),
+                ('applied_at', models.DateTimeField(auto_now_add=True, verbose_name='Applied At')),
+            ],
+            options={
+                'verbose_name': 'Applied Rating Change',
+                'verbose_name_plural': 'Applied Rating Changes',
+                'indexes': [models.Index(fields=['applied_at'], name='reviews_app_applied_be684a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('review_id', 'version', 'listing_id'), name='unique_applied_rating_change')],
+            },
+        ),
+    ]
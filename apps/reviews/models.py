@@ -1,9 +1,15 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Round
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 from apps.common.models import TimeModel
+from apps.jobs.outbox import emit_many
 from apps.common.enums import BookingStatus
 from apps.common.constants import (
     # Rating
@@ -18,6 +24,10 @@ from apps.common.constants import (
     # Statistics
     MIN_REVIEWS_FOR_RATING,
     DEFAULT_RATING,
+
+    # Outbox
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_RETENTION_DAYS,
 )
 
 
@@ -120,6 +130,12 @@ class Review(TimeModel):
         help_text='Підтверджений відгук (від реального гостя)'
     )
 
+    rating_version = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Rating Version',
+        help_text='Номер зміни оцінки (ключ ідемпотентності подій review.rating_changed)'
+    )
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Review'
@@ -219,28 +235,237 @@ class Review(TimeModel):
         """Чи є відповідь власника"""
         return bool(self.owner_response and self.owner_response.strip())
 
+    @property
+    def rating_contribution(self):
+        """Оцінка, яка враховується в агрегатах (тільки видимі відгуки з рейтингом)"""
+        return self.rating if self.is_visible else None
+
     def save(self, *args, **kwargs):
         """Перевизначення save для автоматичних обчислень"""
         if not self.pk:
             self.full_clean()
 
-        super().save(*args, **kwargs)
+        # Стан до збереження - для обчислення дельти рейтингу (зі знімка TimeModel)
+        previous = None
+        if self.pk:
+            previous = self.previous_values('listing_id', 'rating', 'is_visible')
+            if previous is None:
+                previous = Review.objects.filter(pk=self.pk).values(
+                    'listing_id', 'rating', 'is_visible'
+                ).first()
+
+        changes = self._rating_changes(previous)
+        if changes:
+            # ✅ Кожна зміна оцінки отримує свою версію - повторна доставка ігнорується
+            self.rating_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'rating_version'}
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            # ✅ Зміна рейтингів оголошення і власника - подією в outbox
+            emit_many([
+                rating_change_event(listing_id, old_rating, new_rating, self.pk, self.rating_version)
+                for listing_id, old_rating, new_rating in changes
+            ])
+
+    def _rating_changes(self, previous) -> list:
+        """Зміни (listing_id, old_rating, new_rating) для ListingRating і OwnerRating"""
+        new_rating = self.rating_contribution
+
+        if previous is None:
+            changes = [(self.listing_id, None, new_rating)]
+        else:
+            old_rating = previous['rating'] if previous['is_visible'] else None
+
+            if previous['listing_id'] != self.listing_id:
+                changes = [
+                    (previous['listing_id'], old_rating, None),
+                    (self.listing_id, None, new_rating),
+                ]
+            else:
+                changes = [(self.listing_id, old_rating, new_rating)]
+
+        return [change for change in changes if change[1] != change[2]]
+
+
+# ============================================
+# ІНКРЕМЕНТАЛЬНІ ОНОВЛЕННЯ РЕЙТИНГІВ
+# ============================================
+
+def rating_delta_updates(old_rating, new_rating) -> dict:
+    """
+    F()-вирази для зміни лічильників при заміні оцінки old_rating -> new_rating
 
-        # ✅ Оновити рейтинг оголошення після збереження відгуку
-        self._update_listing_rating()
+    None означає, що відгук не враховується (немає рейтингу або прихований).
+    """
+    if old_rating == new_rating:
+        return {}
+
+    updates = {}
+
+    count_delta = (new_rating is not None) - (old_rating is not None)
+    if count_delta:
+        updates['total_reviews'] = F('total_reviews') + count_delta
+
+    sum_delta = (new_rating or 0) - (old_rating or 0)
+    if sum_delta:
+        updates['rating_sum'] = F('rating_sum') + sum_delta
+
+    if old_rating is not None:
+        updates[f'stars_{old_rating}'] = F(f'stars_{old_rating}') - 1
+    if new_rating is not None:
+        updates[f'stars_{new_rating}'] = F(f'stars_{new_rating}') + 1
+
+    return updates
+
+
+def average_rating_expression():
+    """Середній рейтинг з лічильників, обчислений на стороні БД"""
+    return Case(
+        When(total_reviews=0, then=Value(0)),
+        default=Round(
+            Cast(F('rating_sum'), FloatField()) / F('total_reviews'),
+            2
+        ),
+        output_field=models.DecimalField(max_digits=3, decimal_places=2),
+    )
 
-        # ✅ Оновити рейтинг власника після збереження відгуку
-        self._update_owner_rating()
 
-    def _update_listing_rating(self):
-        """Оновити агрегований рейтинг оголошення"""
-        if self.listing_id:
-            ListingRating.update_rating(self.listing_id)
+def aggregate_ratings(reviews) -> dict:
+    """
+    Повний перерахунок лічильників одним агрегатним запитом
+
+    Args:
+        reviews: QuerySet відгуків, які враховуються в рейтингу
+
+    Returns:
+        dict: Значення полів агрегату
+    """
+    stats = reviews.aggregate(
+        total_reviews=Count('id'),
+        rating_sum=Sum('rating'),
+        **{
+            f'stars_{star}': Count('id', filter=Q(rating=star))
+            for star in range(MIN_RATING, MAX_RATING + 1)
+        }
+    )
+    stats['rating_sum'] = stats['rating_sum'] or 0
+
+    total_reviews = stats['total_reviews']
+    stats['average_rating'] = (
+        round(stats['rating_sum'] / total_reviews, 2) if total_reviews else 0
+    )
+    return stats
+
+
+def rating_change_event(listing_id, old_rating, new_rating, review_id=None, version=None):
+    """Подія review.rating_changed для outbox: (тип, payload)"""
+    return 'review.rating_changed', {
+        'listing_id': listing_id,
+        'old_rating': old_rating,
+        'new_rating': new_rating,
+        'review_id': review_id,
+        'version': version,
+    }
+
+
+def apply_review_rating_change(listing_id, old_rating, new_rating, review_id=None, version=None):
+    """
+    ✅ Застосувати зміну одного відгуку до рейтингу оголошення та власника
+
+    Доставка outbox - "хоча б один раз", тому зміна з review_id/version
+    застосовується тільки при першому записі в AppliedRatingChange.
+
+    Args:
+        listing_id: ID оголошення
+        old_rating: Попередня врахована оцінка (або None)
+        new_rating: Нова врахована оцінка (або None)
+        review_id: ID відгуку (ключ ідемпотентності разом з version)
+        version: Review.rating_version цієї зміни
+    """
+    if not listing_id or old_rating == new_rating:
+        return
 
-    def _update_owner_rating(self):
-        """Оновити агрегований рейтинг власника"""
-        if self.listing_id and self.listing.owner_id:
-            OwnerRating.update_rating(self.listing.owner_id)
+    from apps.listings.models import Listing
+
+    owner_id = Listing.objects.filter(pk=listing_id).values_list('owner_id', flat=True).first()
+
+    with transaction.atomic():
+        if review_id is not None and not AppliedRatingChange.record(review_id, version, listing_id):
+            return
+
+        listings_delta = ListingRating.apply_change(listing_id, old_rating, new_rating)
+        if owner_id:
+            OwnerRating.apply_change(owner_id, old_rating, new_rating, listings_delta)
+
+
+def has_pending_rating_changes(listing_ids) -> bool:
+    """
+    Чи є для оголошень недоставлені події review.rating_changed
+
+    Події з вичерпаними спробами не враховуються - їх дельти вже не застосуються.
+    """
+    from apps.jobs.models import OutboxEvent
+
+    return OutboxEvent.objects.filter(
+        event_type='review.rating_changed',
+        dispatched_at__isnull=True,
+        attempts__lt=OUTBOX_MAX_ATTEMPTS,
+        payload__listing_id__in=list(listing_ids),
+    ).exists()
+
+
+class AppliedRatingChange(models.Model):
+    """
+    ✅ Журнал застосованих змін оцінок (ідемпотентність дельт рейтингу)
+
+    Без відгуку як FK: подія видалення відгуку приходить, коли рядка вже немає.
+    """
+
+    review_id = models.PositiveBigIntegerField(verbose_name='Review ID')
+    version = models.PositiveIntegerField(verbose_name='Version')
+    listing_id = models.PositiveBigIntegerField(verbose_name='Listing ID')
+    applied_at = models.DateTimeField(auto_now_add=True, verbose_name='Applied At')
+
+    class Meta:
+        verbose_name = 'Applied Rating Change'
+        verbose_name_plural = 'Applied Rating Changes'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['review_id', 'version', 'listing_id'],
+                name='unique_applied_rating_change',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['applied_at']),
+        ]
+
+    def __str__(self):
+        return f'Review #{self.review_id} v{self.version} -> listing #{self.listing_id}'
+
+    @classmethod
+    def record(cls, review_id, version, listing_id) -> bool:
+        """
+        Записати зміну в журнал
+
+        Returns:
+            bool: True якщо зміну ще не застосовували
+        """
+        _, created = cls.objects.get_or_create(
+            review_id=review_id, version=version or 0, listing_id=listing_id
+        )
+        return created
+
+    @classmethod
+    def purge(cls, days=OUTBOX_RETENTION_DAYS) -> int:
+        """Видалити записи, старші за days днів (їх події вже не доставляються повторно)"""
+        deleted, _ = cls.objects.filter(
+            applied_at__lt=timezone.now() - timedelta(days=days)
+        ).delete()
+        return deleted
 
 
 class ListingRating(TimeModel):
@@ -273,6 +498,12 @@ class ListingRating(TimeModel):
         help_text='Загальна кількість відгуків'
     )
 
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Rating Sum',
+        help_text='Сума всіх оцінок (для інкрементального середнього)'
+    )
+
     # Розподіл за зірками
     stars_5 = models.PositiveIntegerField(default=0, verbose_name='5 Stars')
     stars_4 = models.PositiveIntegerField(default=0, verbose_name='4 Stars')
@@ -283,6 +514,9 @@ class ListingRating(TimeModel):
     class Meta:
         verbose_name = 'Listing Rating'
         verbose_name_plural = 'Listing Ratings'
+        indexes = [
+            models.Index(fields=['-average_rating', '-total_reviews']),
+        ]
 
     def __str__(self):
         return f'{self.listing.title} - {self.average_rating}★ ({self.total_reviews} reviews)'
@@ -290,59 +524,95 @@ class ListingRating(TimeModel):
     @classmethod
     def update_rating(cls, listing_id):
         """
-        Оновити рейтинг оголошення
+        Повністю перерахувати рейтинг оголошення (звірка)
 
         Args:
             listing_id: ID оголошення
         """
-        # Отримати всі видимі відгуки з рейтингом
+        # Всі видимі відгуки з рейтингом
         reviews = Review.objects.filter(
             listing_id=listing_id,
             is_visible=True,
             rating__isnull=False
         )
 
-        total_reviews = reviews.count()
-
-        if total_reviews == 0:
-            # Немає відгуків - скидаємо рейтинг
-            cls.objects.update_or_create(
-                listing_id=listing_id,
-                defaults={
-                    'average_rating': 0,
-                    'total_reviews': 0,
-                    'stars_5': 0,
-                    'stars_4': 0,
-                    'stars_3': 0,
-                    'stars_2': 0,
-                    'stars_1': 0,
-                }
-            )
-            return
-
-        # Обчислити середній рейтинг
-        ratings = reviews.values_list('rating', flat=True)
-        average_rating = sum(ratings) / len(ratings)
-
-        # Підрахувати розподіл за зірками
-        stars_count = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        for rating in ratings:
-            stars_count[rating] += 1
-
-        # Оновити або створити запис
         cls.objects.update_or_create(
             listing_id=listing_id,
-            defaults={
-                'average_rating': round(average_rating, 2),
-                'total_reviews': total_reviews,
-                'stars_5': stars_count[5],
-                'stars_4': stars_count[4],
-                'stars_3': stars_count[3],
-                'stars_2': stars_count[2],
-                'stars_1': stars_count[1],
-            }
+            defaults=aggregate_ratings(reviews)
         )
 
+    @classmethod
+    def reconcile(cls, listing_id) -> bool:
+        """
+        ✅ Звірка рейтингу оголошення, якщо в outbox немає його змін оцінок
+
+        Перерахунок з усіх відгуків уже містить зміни недоставлених подій -
+        їх доставка додала б ті самі дельти вдруге. Рядок блокується до
+        перерахунку, тому доставка, що почалась, чекає і вважається недоставленою.
+
+        Returns:
+            bool: False - є недоставлені події, оголошення пропущено
+        """
+        with transaction.atomic():
+            # INSERT першим запитом - на SQLite одразу блокування на запис
+            cls.get_or_create_empty(listing_id)
+            cls.objects.select_for_update().filter(listing_id=listing_id).first()
+            cls.update_rating(listing_id)
+
+            if has_pending_rating_changes([listing_id]):
+                transaction.set_rollback(True)
+                return False
+        return True
+
+    @classmethod
+    def get_or_create_empty(cls, listing_id):
+        """
+        Агрегат оголошення; якщо його ще немає - нульовий рядок (без перерахунку)
+
+        bulk_create не шле post_save: нульовий рядок не змінює відповідей API,
+        тому кеш не інвалідується.
+        """
+        cls.objects.bulk_create([cls(listing_id=listing_id)], ignore_conflicts=True)
+        return cls.objects.get(listing_id=listing_id)
+
+    @classmethod
+    def apply_change(cls, listing_id, old_rating=None, new_rating=None) -> int:
+        """
+        ✅ Інкрементальне оновлення рейтингу атомарними F()-виразами
+
+        Args:
+            listing_id: ID оголошення
+            old_rating: Попередня врахована оцінка (або None)
+            new_rating: Нова врахована оцінка (або None)
+
+        Returns:
+            int: +1 якщо оголошення отримало перший відгук,
+                 -1 якщо втратило останній, інакше 0
+        """
+        updates = rating_delta_updates(old_rating, new_rating)
+        if not updates:
+            return 0
+
+        with transaction.atomic():
+            rows = cls.objects.filter(listing_id=listing_id)
+            previous_total = rows.select_for_update().values_list(
+                'total_reviews', flat=True
+            ).first()
+
+            if previous_total is None:
+                # Агрегату ще немає - нульовий рядок, дельта застосовується до нього
+                # (повний перерахунок вже врахував би ще не доставлені події)
+                cls.get_or_create_empty(listing_id)
+                previous_total = rows.select_for_update().values_list(
+                    'total_reviews', flat=True
+                ).first()
+
+            rows.update(**updates)
+            rows.update(average_rating=average_rating_expression())
+
+        new_total = previous_total + (new_rating is not None) - (old_rating is not None)
+        return int(new_total > 0) - int(previous_total > 0)
+
     @property
     def rating_distribution(self) -> dict:
         """
@@ -393,6 +663,12 @@ class OwnerRating(TimeModel):
         help_text='Загальна кількість відгуків на всі оголошення'
     )
 
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Rating Sum',
+        help_text='Сума всіх оцінок (для інкрементального середнього)'
+    )
+
     total_listings = models.PositiveIntegerField(
         default=0,
         verbose_name='Total Listings',
@@ -416,69 +692,82 @@ class OwnerRating(TimeModel):
     @classmethod
     def update_rating(cls, owner_id):
         """
-        Оновити рейтинг власника
+        Повністю перерахувати рейтинг власника (звірка)
 
         Args:
             owner_id: ID власника (User)
         """
-        from apps.listings.models import Listing
-
-        # Отримати всі оголошення власника
-        owner_listings = Listing.objects.filter(owner_id=owner_id)
-
-        # Отримати всі видимі відгуки на оголошення власника
+        # Всі видимі відгуки з рейтингом на оголошення власника
         reviews = Review.objects.filter(
-            listing__in=owner_listings,
+            listing__owner_id=owner_id,
             is_visible=True,
             rating__isnull=False
         )
 
-        total_reviews = reviews.count()
-
-        if total_reviews == 0:
-            # Немає відгуків - скидаємо рейтинг
-            cls.objects.update_or_create(
-                owner_id=owner_id,
-                defaults={
-                    'average_rating': 0,
-                    'total_reviews': 0,
-                    'total_listings': 0,
-                    'stars_5': 0,
-                    'stars_4': 0,
-                    'stars_3': 0,
-                    'stars_2': 0,
-                    'stars_1': 0,
-                }
-            )
-            return
-
-        # Обчислити середній рейтинг
-        ratings = reviews.values_list('rating', flat=True)
-        average_rating = sum(ratings) / len(ratings)
-
-        # Підрахувати розподіл за зірками
-        stars_count = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        for rating in ratings:
-            stars_count[rating] += 1
+        defaults = aggregate_ratings(reviews)
 
         # Кількість оголошень з відгуками
-        listings_with_reviews = reviews.values('listing').distinct().count()
+        defaults['total_listings'] = reviews.values('listing').distinct().count()
 
-        # Оновити або створити запис
         cls.objects.update_or_create(
             owner_id=owner_id,
-            defaults={
-                'average_rating': round(average_rating, 2),
-                'total_reviews': total_reviews,
-                'total_listings': listings_with_reviews,
-                'stars_5': stars_count[5],
-                'stars_4': stars_count[4],
-                'stars_3': stars_count[3],
-                'stars_2': stars_count[2],
-                'stars_1': stars_count[1],
-            }
+            defaults=defaults
         )
 
+    @classmethod
+    def reconcile(cls, owner_id) -> bool:
+        """
+        ✅ Звірка рейтингу власника (див. ListingRating.reconcile)
+
+        Returns:
+            bool: False - є недоставлені події по оголошеннях власника
+        """
+        from apps.listings.models import Listing
+
+        with transaction.atomic():
+            cls.get_or_create_empty(owner_id)
+            cls.objects.select_for_update().filter(owner_id=owner_id).first()
+            cls.update_rating(owner_id)
+
+            listing_ids = Listing.objects.filter(owner_id=owner_id).values_list('id', flat=True)
+            if has_pending_rating_changes(listing_ids):
+                transaction.set_rollback(True)
+                return False
+        return True
+
+    @classmethod
+    def get_or_create_empty(cls, owner_id):
+        """Агрегат власника; якщо його ще немає - нульовий рядок (без перерахунку)"""
+        cls.objects.bulk_create([cls(owner_id=owner_id)], ignore_conflicts=True)
+        return cls.objects.get(owner_id=owner_id)
+
+    @classmethod
+    def apply_change(cls, owner_id, old_rating=None, new_rating=None, listings_delta=0):
+        """
+        ✅ Інкрементальне оновлення рейтингу власника атомарними F()-виразами
+
+        Args:
+            owner_id: ID власника (User)
+            old_rating: Попередня врахована оцінка (або None)
+            new_rating: Нова врахована оцінка (або None)
+            listings_delta: Зміна кількості оголошень з відгуками
+        """
+        updates = rating_delta_updates(old_rating, new_rating)
+        if listings_delta:
+            updates['total_listings'] = F('total_listings') + listings_delta
+        if not updates:
+            return
+
+        rows = cls.objects.filter(owner_id=owner_id)
+
+        with transaction.atomic():
+            if not rows.update(**updates):
+                # Агрегату ще немає - нульовий рядок, дельта застосовується до нього
+                cls.get_or_create_empty(owner_id)
+                rows.update(**updates)
+
+            rows.update(average_rating=average_rating_expression())
+
     @property
     def rating_distribution(self) -> dict:
         """
@@ -507,7 +796,12 @@ class OwnerRating(TimeModel):
 ✅ Review:
    - Відгук про оголошення
    - Рейтинг 1-5 + коментар
-   - Автоматично оновлює ListingRating і OwnerRating
+   - Автоматично оновлює ListingRating і OwnerRating (дельтами, O(1))
+   - Повна звірка: python manage.py rebuild_ratings
+
+✅ AppliedRatingChange:
+   - Журнал (review_id, version, listing_id) застосованих дельт
+   - Повторна доставка події review.rating_changed нічого не змінює
 
 ✅ ListingRating:
    - Агрегований рейтинг оголошення
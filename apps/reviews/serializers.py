@@ -233,7 +233,7 @@ class ListingRatingSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         ]
-        read_only_fields = '__all__'
+        read_only_fields = fields
 
 
 class ReviewListSerializer(serializers.ModelSerializer):
@@ -259,7 +259,7 @@ class ReviewListSerializer(serializers.ModelSerializer):
             'has_owner_response',
             'created_at',
         ]
-        read_only_fields = '__all__'
+        read_only_fields = fields
 
     def get_reviewer_avatar(self, obj):
         """Отримати URL аватара (якщо є)"""
@@ -340,7 +340,7 @@ class OwnerRatingSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         ]
-        read_only_fields = '__all__'
+        read_only_fields = fields
 
     def get_owner_name(self, obj):
         """Отримати повне ім'я власника"""
@@ -0,0 +1,64 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.common.cache import (
+    TAG_TOP_LISTINGS,
+    TAG_TOP_OWNERS,
+    invalidate_tags,
+    listing_tag,
+    owner_tag,
+    response_cache_enabled,
+)
+from apps.jobs.outbox import emit_many
+from apps.listings.models import Listing
+
+from .models import ListingRating, OwnerRating, Review, rating_change_event
+
+
+@receiver(post_delete, sender=Review)
+def release_review_rating(sender, instance, **kwargs):
+    """
+    ✅ Прибрати оцінку видаленого відгуку з рейтингів (подією в outbox, дельтою)
+    """
+    old_rating = instance.rating_contribution
+    if old_rating is None:
+        return
+
+    emit_many([rating_change_event(
+        instance.listing_id, old_rating, None, instance.pk, instance.rating_version + 1
+    )])
+
+
+# ============================================
+# ІНВАЛІДАЦІЯ КЕШУ ВІДПОВІДЕЙ
+# ============================================
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_cache(sender, instance, **kwargs):
+    """✅ Відгук змінює рейтинг оголошення, власника і обидва топи"""
+    if not response_cache_enabled():
+        return
+
+    # Оголошення вже могло бути видалене каскадом
+    owner_id = Listing.objects.filter(pk=instance.listing_id).values_list(
+        'owner_id', flat=True
+    ).first()
+    invalidate_tags(
+        listing_tag(instance.listing_id),
+        owner_tag(owner_id) if owner_id is not None else None,
+        TAG_TOP_LISTINGS,
+        TAG_TOP_OWNERS,
+    )
+
+
+@receiver(post_save, sender=ListingRating)
+@receiver(post_delete, sender=ListingRating)
+def invalidate_listing_rating_cache(sender, instance, **kwargs):
+    invalidate_tags(listing_tag(instance.listing_id), TAG_TOP_LISTINGS)
+
+
+@receiver(post_save, sender=OwnerRating)
+@receiver(post_delete, sender=OwnerRating)
+def invalidate_owner_rating_cache(sender, instance, **kwargs):
+    invalidate_tags(owner_tag(instance.owner_id), TAG_TOP_OWNERS)
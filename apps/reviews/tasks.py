@@ -0,0 +1,14 @@
+import logging
+
+from apps.common.enums import JobPriority
+from apps.jobs.registry import task
+from apps.reviews.models import AppliedRatingChange
+
+logger = logging.getLogger(__name__)
+
+
+@task(priority=JobPriority.LOW)
+def purge_applied_rating_changes():
+    """Очистити журнал застосованих змін оцінок (періодична задача воркерів)"""
+    deleted = AppliedRatingChange.purge()
+    logger.info("Applied rating changes purged. count=%s", deleted)
@@ -1,3 +1,226 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.bookings.models import Booking
+from apps.common.enums import BookingStatus, CancellationPolicy, PropertyType
+from apps.common.models import Location
+from apps.jobs.models import OutboxEvent
+from apps.listings.models import Listing, ListingPrice
+from apps.reviews.models import AppliedRatingChange, ListingRating, OwnerRating, Review
+
+
+class IncrementalRatingTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(
+            email='rating-owner@example.com',
+            username='rating-owner',
+            password='password123',
+        )
+        self.customer = User.objects.create_user(
+            email='rating-customer@example.com',
+            username='rating-customer',
+            password='password123',
+        )
+        self.listings = [self._create_listing(index) for index in range(2)]
+        self.next_day = 1
+
+    def _create_listing(self, index):
+        location = Location.objects.create(
+            country='Україна',
+            city='Львів',
+            address=f'вул. Рейтингова {index}',
+        )
+        listing = Listing.objects.create(
+            owner=self.owner,
+            title=f'Квартира для рейтингу {index}',
+            description='Дуже довгий опис квартири, що перевищує мінімальну довжину.',
+            location=location,
+            property_type=PropertyType.APARTMENT,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('100.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+        ListingPrice.objects.create(listing=listing, amount=Decimal('100.00'))
+        return listing
+
+    def _create_review(self, listing, rating):
+        check_in = date.today() + timedelta(days=self.next_day)
+        self.next_day += 2
+        booking = Booking.objects.create(
+            customer=self.customer,
+            listing=listing,
+            location=listing.location,
+            check_in=check_in,
+            check_out=check_in + timedelta(days=1),
+            num_guests=1,
+            price_per_night=listing.price_records.first(),
+            num_nights=1,
+            base_price=Decimal('100.00'),
+            platform_fee=Decimal('10.00'),
+            total_price=Decimal('110.00'),
+            status=BookingStatus.COMPLETED,
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+        return Review.objects.create(
+            booking=booking, reviewer=self.customer, listing=listing, rating=rating
+        )
+
+    def _listing_stats(self, listing):
+        return ListingRating.objects.get(listing=listing)
+
+    def _owner_stats(self):
+        return OwnerRating.objects.get(owner=self.owner)
+
+    def test_create_applies_deltas(self):
+        self._create_review(self.listings[0], 5)
+        self._create_review(self.listings[0], 4)
+        self._create_review(self.listings[1], 2)
+
+        stats = self._listing_stats(self.listings[0])
+        self.assertEqual(stats.total_reviews, 2)
+        self.assertEqual(stats.rating_sum, 9)
+        self.assertEqual((stats.stars_4, stats.stars_5), (1, 1))
+        self.assertEqual(stats.average_rating, Decimal('4.50'))
+
+        owner_stats = self._owner_stats()
+        self.assertEqual(owner_stats.total_reviews, 3)
+        self.assertEqual(owner_stats.total_listings, 2)
+        self.assertEqual(owner_stats.average_rating, Decimal('3.67'))
+
+    def test_edit_moves_star_bucket(self):
+        review = self._create_review(self.listings[0], 5)
+        self._create_review(self.listings[0], 3)
+
+        review.rating = 1
+        review.save()
+
+        stats = self._listing_stats(self.listings[0])
+        self.assertEqual(stats.total_reviews, 2)
+        self.assertEqual((stats.stars_1, stats.stars_3, stats.stars_5), (1, 1, 0))
+        self.assertEqual(stats.average_rating, Decimal('2.00'))
+
+    def test_visibility_toggle(self):
+        review = self._create_review(self.listings[0], 5)
+        self._create_review(self.listings[1], 3)
+
+        review.is_visible = False
+        review.save()
+
+        self.assertEqual(self._listing_stats(self.listings[0]).total_reviews, 0)
+        self.assertEqual(self._listing_stats(self.listings[0]).average_rating, Decimal('0'))
+        owner_stats = self._owner_stats()
+        self.assertEqual(owner_stats.total_reviews, 1)
+        self.assertEqual(owner_stats.total_listings, 1)
+
+        review.is_visible = True
+        review.save()
+
+        self.assertEqual(self._listing_stats(self.listings[0]).average_rating, Decimal('5.00'))
+        self.assertEqual(self._owner_stats().total_listings, 2)
+
+    def test_delete_releases_rating(self):
+        review = self._create_review(self.listings[0], 4)
+        self._create_review(self.listings[0], 2)
+
+        review.delete()
+
+        stats = self._listing_stats(self.listings[0])
+        self.assertEqual(stats.total_reviews, 1)
+        self.assertEqual(stats.stars_4, 0)
+        self.assertEqual(stats.average_rating, Decimal('2.00'))
+        self.assertEqual(self._owner_stats().rating_sum, 2)
+
+    def test_rebuild_command_reconciles_drift(self):
+        self._create_review(self.listings[0], 5)
+        self._create_review(self.listings[1], 3)
+        ListingRating.objects.filter(listing=self.listings[0]).update(
+            total_reviews=7, rating_sum=0, average_rating=Decimal('1.00')
+        )
+        OwnerRating.objects.filter(owner=self.owner).update(total_listings=0)
+
+        call_command('rebuild_ratings', stdout=StringIO())
+
+        stats = self._listing_stats(self.listings[0])
+        self.assertEqual((stats.total_reviews, stats.rating_sum), (1, 5))
+        self.assertEqual(stats.average_rating, Decimal('5.00'))
+        owner_stats = self._owner_stats()
+        self.assertEqual(owner_stats.total_listings, 2)
+        self.assertEqual(owner_stats.average_rating, Decimal('4.00'))
+
+
+@override_settings(OUTBOX={**settings.OUTBOX, 'EAGER': False})
+class QueuedRatingTests(IncrementalRatingTests):
+    """Ті самі сценарії з доставкою подій через outbox-диспетчер"""
+
+    def _dispatch(self):
+        while OutboxEvent.dispatch('test-dispatcher', batch_size=100):
+            pass
+
+    def _listing_stats(self, listing):
+        self._dispatch()
+        return super()._listing_stats(listing)
+
+    def _owner_stats(self):
+        self._dispatch()
+        return super()._owner_stats()
+
+    def test_rebuild_command_reconciles_drift(self):
+        # Звірка має сенс після доставки подій, що вже стоять у черзі
+        self._create_review(self.listings[0], 5)
+        self._dispatch()
+        ListingRating.objects.filter(listing=self.listings[0]).update(total_reviews=7)
+
+        call_command('rebuild_ratings', stdout=StringIO())
+
+        stats = self._listing_stats(self.listings[0])
+        self.assertEqual((stats.total_reviews, stats.rating_sum), (1, 5))
+
+    def test_rebuild_skips_listings_with_pending_events(self):
+        self._create_review(self.listings[0], 5)
+        self._create_review(self.listings[1], 3)
+        self._dispatch()
+        self._create_review(self.listings[0], 4)
+
+        out = StringIO()
+        call_command('rebuild_ratings', stdout=out)
+        self.assertIn('Пропущено', out.getvalue())
+
+        stats = self._listing_stats(self.listings[0])
+        self.assertEqual((stats.total_reviews, stats.rating_sum), (2, 9))
+        owner_stats = self._owner_stats()
+        self.assertEqual((owner_stats.total_reviews, owner_stats.rating_sum), (3, 12))
+
+    def test_missing_aggregate_is_not_double_counted(self):
+        self._create_review(self.listings[0], 5)
+        self._create_review(self.listings[0], 3)
+
+        stats = self._listing_stats(self.listings[0])
+        self.assertEqual((stats.total_reviews, stats.rating_sum), (2, 8))
+        owner_stats = self._owner_stats()
+        self.assertEqual((owner_stats.total_reviews, owner_stats.rating_sum), (2, 8))
+        self.assertEqual(owner_stats.total_listings, 1)
+
+    def test_redelivery_is_ignored(self):
+        review = self._create_review(self.listings[0], 5)
+        review.rating = 2
+        review.save()
+        self._dispatch()
+
+        # Повторна доставка (напр. після перехоплення застарілого lock-а)
+        OutboxEvent.objects.update(dispatched_at=None)
+        self._dispatch()
+
+        stats = self._listing_stats(self.listings[0])
+        self.assertEqual((stats.total_reviews, stats.rating_sum), (1, 2))
+        self.assertEqual((stats.stars_2, stats.stars_5), (1, 0))
+        self.assertEqual(self._owner_stats().rating_sum, 2)
+        self.assertEqual(AppliedRatingChange.objects.filter(review_id=review.pk).count(), 2)
@@ -15,9 +15,56 @@ from .serializers import (
     OwnerResponseSerializer
 )
 from .permissions import CanCreateReviewAsCustomer
+from apps.common.cache import (
+    TAG_TOP_LISTINGS,
+    TAG_TOP_OWNERS,
+    cached_response,
+    listing_tag,
+    owner_tag,
+)
+from apps.common.constants import CACHE_TTL_MEDIUM
+from apps.common.pagination import KeysetPagination
 from apps.listings.models import Listing
 
 
+def _top_limit(request) -> int:
+    return int(request.query_params.get('limit', 10))
+
+
+def _top_listing_ratings(limit):
+    """Оголошення з найвищим рейтингом (мінімум 3 відгуки)"""
+    return ListingRating.objects.filter(
+        total_reviews__gte=3
+    ).order_by('-average_rating', '-total_reviews')[:limit]
+
+
+def _top_owner_ratings(limit):
+    """Власники з найвищим рейтингом (мінімум 3 відгуки)"""
+    return OwnerRating.objects.filter(
+        total_reviews__gte=3
+    ).order_by('-average_rating', '-total_reviews')[:limit]
+
+
+# Теги обчислюються до відповіді - топи запитують тільки id своїх рядків
+
+def _listing_rating_tags(request, kwargs):
+    return [listing_tag(kwargs['listing_id'])]
+
+
+def _owner_rating_tags(request, kwargs):
+    return [owner_tag(kwargs['owner_id'])]
+
+
+def _top_listings_tags(request, kwargs):
+    listing_ids = _top_listing_ratings(_top_limit(request)).values_list('listing_id', flat=True)
+    return [TAG_TOP_LISTINGS, *map(listing_tag, listing_ids)]
+
+
+def _top_owners_tags(request, kwargs):
+    owner_ids = _top_owner_ratings(_top_limit(request)).values_list('owner_id', flat=True)
+    return [TAG_TOP_OWNERS, *map(owner_tag, owner_ids)]
+
+
 class ReviewViewSet(viewsets.ModelViewSet):
     """
     ViewSet для відгуків
@@ -37,6 +84,8 @@ class ReviewViewSet(viewsets.ModelViewSet):
     ).all()
     serializer_class = ReviewSerializer
     permission_classes = [CanCreateReviewAsCustomer]
+    pagination_class = KeysetPagination
+    keyset_ordering_fields = ['created_at']
 
     def get_queryset(self):
         """
@@ -211,18 +260,15 @@ class ListingRatingView(APIView):
 
     permission_classes = [permissions.AllowAny]
 
+    @cached_response('listing-rating', CACHE_TTL_MEDIUM, tags=_listing_rating_tags)
     def get(self, request, listing_id):
         """Отримати рейтинг оголошення"""
         # Перевірити що оголошення існує
         listing = get_object_or_404(Listing, id=listing_id)
 
-        # Отримати або створити рейтинг
-        try:
-            rating_stats = ListingRating.objects.get(listing=listing)
-        except ListingRating.DoesNotExist:
-            # Створити рейтинг якщо не існує
-            ListingRating.update_rating(listing_id)
-            rating_stats = ListingRating.objects.get(listing=listing)
+        # Отримати або створити рейтинг (нульовий - оцінки доходять дельтами з outbox,
+        # повний перерахунок тут врахував би ще не доставлені події двічі)
+        rating_stats = ListingRating.get_or_create_empty(listing.pk)
 
         # Серіалізувати
         serializer = ListingRatingSerializer(
@@ -272,17 +318,11 @@ class TopRatedListingsView(APIView):
 
     permission_classes = [permissions.AllowAny]
 
+    @cached_response('top-rated-listings', CACHE_TTL_MEDIUM, tags=_top_listings_tags)
     def get(self, request):
         """Отримати топ оголошень"""
-        limit = int(request.query_params.get('limit', 10))
-
         # Отримати оголошення з найвищим рейтингом
-        top_ratings = ListingRating.objects.filter(
-            total_reviews__gte=3  # Мінімум 3 відгуки
-        ).select_related('listing').order_by(
-            '-average_rating',
-            '-total_reviews'
-        )[:limit]
+        top_ratings = _top_listing_ratings(_top_limit(request)).select_related('listing')
 
         serializer = ListingRatingSerializer(
             top_ratings,
@@ -305,6 +345,7 @@ class OwnerRatingView(APIView):
 
     permission_classes = [permissions.AllowAny]
 
+    @cached_response('owner-rating', CACHE_TTL_MEDIUM, tags=_owner_rating_tags)
     def get(self, request, owner_id):
         """Отримати рейтинг власника"""
         from django.contrib.auth import get_user_model
@@ -313,30 +354,8 @@ class OwnerRatingView(APIView):
         # Перевірити що власник існує
         owner = get_object_or_404(User, id=owner_id)
 
-        # Отримати або створити рейтинг
-        try:
-            rating_stats = OwnerRating.objects.get(owner=owner)
-        except OwnerRating.DoesNotExist:
-            # Створити рейтинг якщо не існує
-            OwnerRating.update_rating(owner_id)
-            try:
-                rating_stats = OwnerRating.objects.get(owner=owner)
-            except OwnerRating.DoesNotExist:
-                # Якщо немає відгуків - повернути порожній рейтинг
-                return Response({
-                    'owner_id': owner_id,
-                    'owner_username': owner.username,
-                    'owner_name': f"{owner.first_name} {owner.last_name}".strip() or owner.username,
-                    'average_rating': '0.00',
-                    'total_reviews': 0,
-                    'total_listings': 0,
-                    'stars_5': 0,
-                    'stars_4': 0,
-                    'stars_3': 0,
-                    'stars_2': 0,
-                    'stars_1': 0,
-                    'rating_distribution': {5: 0, 4: 0, 3: 0, 2: 0, 1: 0}
-                })
+        # Отримати або створити рейтинг (нульовий, як і для оголошення)
+        rating_stats = OwnerRating.get_or_create_empty(owner.pk)
 
         # Серіалізувати
         serializer = OwnerRatingSerializer(
@@ -359,17 +378,11 @@ class TopRatedOwnersView(APIView):
 
     permission_classes = [permissions.AllowAny]
 
+    @cached_response('top-rated-owners', CACHE_TTL_MEDIUM, tags=_top_owners_tags)
     def get(self, request):
         """Отримати топ власників"""
-        limit = int(request.query_params.get('limit', 10))
-
         # Отримати власників з найвищим рейтингом
-        top_ratings = OwnerRating.objects.filter(
-            total_reviews__gte=3  # Мінімум 3 відгуки
-        ).select_related('owner').order_by(
-            '-average_rating',
-            '-total_reviews'
-        )[:limit]
+        top_ratings = _top_owner_ratings(_top_limit(request)).select_related('owner')
 
         serializer = OwnerRatingSerializer(
             top_ratings,
@@ -0,0 +1,571 @@
+"""
+✅ Колонковий знімок активних оголошень для пошуку без SQL (один на процес)
+
+Знімок тримає потрібні фільтрам поля колонками (модуль array, без numpy):
+price, max_guests, num_rooms, код property_type, код міста, lat/lng, рейтинг
+і маску зручностей (Listing.amenity_mask).
+Рядки впорядковані за (created_at, id), тож новіші оголошення - в кінці.
+
+Фільтр - це байтова маска (1 байт на рядок, 0/1), у запиті - ціле число
+з int.from_bytes; маски перетинаються & / | на рівні C, без циклу по рядках:
+- рівності (property_type, num_rooms, місто, max_guests) - готові маски на значення
+- зручності - маска на кожен біт Amenity.bit, "усі зручності" = & масок бітів
+- діапазони (ціна, рейтинг, координати) - _RangeIndex: бакети за квантилями,
+  повністю покриті бакети об'єднуються |, рядки перевіряються лише у двох крайніх
+До ORM повертаються тільки id знайдених оголошень.
+
+Оновлення:
+- інкрементально - рядки з Listing.updated_at новіше за останню синхронізацію
+  (не частіше ніж раз на REFRESH_INTERVAL секунд, під lock-ом знімка)
+- повністю - раз на REBUILD_INTERVAL секунд (рейтинги, жорсткі видалення) або
+  після invalidate_catalog() (зміна локації, видалення оголошення): новий знімок
+  будується у фоновому потоці, пошук тим часом іде по поточному, потім посилання
+  на знімок підміняється (без знімка пошук іде через ORM)
+Версія знімка - SearchCatalogVersion у БД (бачать усі процеси).
+
+Фасети (facets.py) рахуються тим самим проходом по знайдених рядках.
+Текстовий запит і фільтр дат обробляє ORM (search() повертає None).
+Налаштування: settings.SEARCH_CATALOG
+"""
+
+import logging
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from apps.common.constants import DEFAULT_SEARCH_RADIUS_KM
+from apps.common.geo import haversine_km, radius_bbox
+from apps.listings.models import Amenity, Listing
+
+from .facets import FacetCounter, price_bucket
+from .models import SearchCatalogVersion
+
+logger = logging.getLogger(__name__)
+
+# Транзакції фіксуються не в порядку updated_at - вікно перекриття інкременту
+SYNC_OVERLAP = timedelta(seconds=5)
+
+LOAD_CHUNK_SIZE = 2000
+
+# Бакетів на діапазонну колонку (пам'ять: RANGE_BUCKETS байт на рядок)
+RANGE_BUCKETS = 32
+
+_MISSING = float('nan')
+
+CATALOG_FIELDS = (
+    'pk',
+    'created_at',
+    'updated_at',
+    'is_active',
+    'is_deleted',
+    'price',
+    'max_guests',
+    'num_rooms',
+    'property_type',
+    'location__city',
+    'location__latitude',
+    'location__longitude',
+    'rating_stats__average_rating',
+    'amenity_mask',
+)
+
+
+def catalog_enabled() -> bool:
+    return settings.SEARCH_CATALOG['ENABLED']
+
+
+def invalidate_catalog():
+    """✅ Змусити всі процеси перезавантажити знімок (версія в БД, у транзакції зміни)"""
+    if catalog_enabled():
+        SearchCatalogVersion.bump()
+
+
+def _float(value):
+    return _MISSING if value is None else float(value)
+
+
+def _as_int(mask) -> int:
+    return int.from_bytes(mask, 'little')
+
+
+def _mask_and(masks, size) -> bytes:
+    """Перетин масок-цілих (побітовий &)"""
+    result = masks[0]
+    for mask in masks[1:]:
+        result &= mask
+    return result.to_bytes(size, 'little')
+
+
+def _mask_or(masks) -> int:
+    result = 0
+    for mask in masks:
+        result |= _as_int(mask)
+    return result
+
+
+def _bits(value):
+    """Номери встановлених бітів маски зручностей"""
+    while value:
+        low = value & -value
+        yield low.bit_length() - 1
+        value ^= low
+
+
+class _RangeIndex:
+    """
+    Бакети значень числової колонки: байтова маска рядків на кожен бакет
+
+    Межі - квантилі колонки при завантаженні (бакети приблизно рівні);
+    бакет i містить значення з [edges[i - 1], edges[i]). NaN - в жодному.
+    """
+
+    def __init__(self, column, buckets=RANGE_BUCKETS):
+        values = sorted(value for value in column if not math.isnan(value))
+        self.edges = sorted({
+            values[len(values) * step // buckets] for step in range(1, buckets)
+        }) if values else []
+        self.masks = [bytearray(len(column)) for _ in range(len(self.edges) + 1)]
+        for index, value in enumerate(column):
+            self.set(index, value, 1)
+
+    def set(self, index, value, flag):
+        if not math.isnan(value):
+            self.masks[bisect_right(self.edges, value)][index] = flag
+
+    def append(self):
+        for mask in self.masks:
+            mask.append(0)
+
+    def query(self, column, low=None, high=None) -> int:
+        """Маска low <= value <= high як ціле"""
+        first = bisect_right(self.edges, low) if low is not None else 0
+        last = bisect_right(self.edges, high) if high is not None else len(self.masks) - 1
+
+        result = 0
+        for bucket in range(first, last + 1):
+            if (bucket == first and low is not None) or (bucket == last and high is not None):
+                result |= self._checked(bucket, column, low, high)
+            else:
+                result |= _as_int(self.masks[bucket])
+        return result
+
+    def _checked(self, bucket, column, low, high) -> int:
+        """Крайній бакет: значення перевіряються тільки для його рядків"""
+        mask = self.masks[bucket]
+        matched = bytearray(len(mask))
+        index = mask.find(1)
+        while index >= 0:
+            value = column[index]
+            if (low is None or value >= low) and (high is None or value <= high):
+                matched[index] = 1
+            index = mask.find(1, index + 1)
+        return _as_int(matched)
+
+
+class CatalogSnapshot:
+    """Колонки і маски одного завантаження (див. docstring модуля)"""
+
+    RANGE_COLUMNS = ('price', 'rating', 'latitude', 'longitude')
+
+    def __init__(self, version=None):
+        self.version = version
+        self.loaded_at = None
+        self.synced_at = None
+        self.high_water = None
+
+        self.ids = array('q')
+        self.created = []
+        self.alive = bytearray()
+        self.price = array('d')
+        self.max_guests = array('l')
+        self.rating = array('d')
+        self.latitude = array('d')
+        self.longitude = array('d')
+        self.num_rooms = array('l')
+        self.property_type = array('l')
+        self.city = array('l')
+        self.amenity_mask = array('q')
+        self.rows = {}
+
+        # Словники кодів і маски рівностей: {значення: bytearray}
+        self.property_type_codes = {}
+        self.city_codes = {}
+        self.city_names = {}
+        self.property_type_masks = {}
+        self.city_masks = {}
+        self.num_rooms_masks = {}
+        self.max_guests_masks = {}
+        self.amenity_bit_masks = {}
+
+        # {колонка: _RangeIndex} - будуються після повного завантаження
+        self.range_indexes = {}
+
+    def __len__(self):
+        return self.alive.count(1)
+
+    # ============================================
+    # ЗАВАНТАЖЕННЯ І СИНХРОНІЗАЦІЯ
+    # ============================================
+
+    @staticmethod
+    def _queryset():
+        return Listing.objects.order_by('created_at', 'pk').values_list(*CATALOG_FIELDS)
+
+    @classmethod
+    def load(cls, version):
+        """Повне завантаження активних оголошень"""
+        snapshot = cls(version)
+        started = timezone.now()
+        rows = cls._queryset().filter(is_active=True, is_deleted=False)
+        for row in rows.iterator(chunk_size=LOAD_CHUNK_SIZE):
+            snapshot._upsert(row)
+
+        snapshot.range_indexes = {
+            name: _RangeIndex(getattr(snapshot, name)) for name in cls.RANGE_COLUMNS
+        }
+        snapshot.loaded_at = snapshot.synced_at = time.monotonic()
+        snapshot.high_water = started
+        return snapshot
+
+    def sync(self) -> bool:
+        """
+        Застосувати рядки, змінені після останньої синхронізації
+
+        Returns:
+            bool: False, якщо знімок треба перебудувати (порушено порядок рядків)
+        """
+        started = timezone.now()
+        changed = self._queryset().filter(updated_at__gte=self.high_water - SYNC_OVERLAP)
+        for row in changed:
+            if not self._upsert(row):
+                return False
+
+        self.synced_at = time.monotonic()
+        self.high_water = started
+        return True
+
+    def _code(self, codes, value):
+        return codes.setdefault(value, len(codes))
+
+    def _set_flag(self, masks, key, index, flag):
+        mask = masks.get(key)
+        if mask is None:
+            mask = masks[key] = bytearray(len(self.ids))
+        mask[index] = flag
+
+    def _set_row_flags(self, index, flag):
+        """Позначити рядок у масках рівностей, зручностей і діапазонів"""
+        self._set_flag(self.property_type_masks, self.property_type[index], index, flag)
+        self._set_flag(self.city_masks, self.city[index], index, flag)
+        self._set_flag(self.num_rooms_masks, self.num_rooms[index], index, flag)
+        self._set_flag(self.max_guests_masks, self.max_guests[index], index, flag)
+        for bit in _bits(self.amenity_mask[index]):
+            self._set_flag(self.amenity_bit_masks, bit, index, flag)
+        for name, range_index in self.range_indexes.items():
+            range_index.set(index, getattr(self, name)[index], flag)
+
+    def _upsert(self, row) -> bool:
+        """
+        Додати або оновити рядок
+
+        Returns:
+            bool: False, якщо новий рядок не можна дописати в кінець
+        """
+        (pk, created_at, _, is_active, is_deleted, price, max_guests, num_rooms,
+         property_type, city, latitude, longitude, rating, amenity_mask) = row
+        visible = is_active and not is_deleted
+        index = self.rows.get(pk)
+
+        if index is None:
+            if not visible:
+                return True
+            if self.created and (created_at, pk) < self.created[-1]:
+                return False
+            index = self._append(pk, created_at)
+        else:
+            # Старі значення знімаються з масок
+            self._set_row_flags(index, 0)
+
+        self.alive[index] = int(bool(visible))
+        self.price[index] = _float(price)
+        self.max_guests[index] = max_guests
+        self.rating[index] = _float(rating or 0)
+        self.latitude[index] = _float(latitude)
+        self.longitude[index] = _float(longitude)
+        self.num_rooms[index] = num_rooms
+        self.amenity_mask[index] = amenity_mask
+        self.property_type[index] = self._code(self.property_type_codes, property_type)
+        self.city[index] = self._code(self.city_codes, (city or '').casefold())
+        self.city_names.setdefault(self.city[index], city or '')
+
+        self._set_row_flags(index, 1)
+        return True
+
+    def _append(self, pk, created_at) -> int:
+        index = len(self.ids)
+        self.rows[pk] = index
+        self.ids.append(pk)
+        self.created.append((created_at, pk))
+        self.alive.append(0)
+        for column in (self.price, self.rating, self.latitude, self.longitude):
+            column.append(_MISSING)
+        for column in (self.max_guests, self.num_rooms, self.property_type, self.city,
+                       self.amenity_mask):
+            column.append(0)
+        for masks in (self.property_type_masks, self.city_masks, self.num_rooms_masks,
+                      self.max_guests_masks, self.amenity_bit_masks):
+            for mask in masks.values():
+                mask.append(0)
+        for range_index in self.range_indexes.values():
+            range_index.append()
+        return index
+
+    # ============================================
+    # ПОШУК
+    # ============================================
+
+    def _equality_mask(self, masks, key) -> int:
+        mask = masks.get(key)
+        return _as_int(mask) if mask is not None else 0
+
+    def _range_mask(self, name, low=None, high=None) -> int:
+        return self.range_indexes[name].query(getattr(self, name), low, high)
+
+    def filter_masks(self, filters) -> list:
+        """Маски всіх фільтрів запиту як цілі (семантика як у SearchViewSet)"""
+        masks = [_as_int(self.alive)]
+
+        if filters.get('min_price') or filters.get('max_price'):
+            masks.append(self._range_mask(
+                'price',
+                float(filters['min_price']) if filters.get('min_price') else None,
+                float(filters['max_price']) if filters.get('max_price') else None,
+            ))
+        if filters.get('city'):
+            needle = filters['city'].casefold()
+            masks.append(_mask_or(
+                self.city_masks[code]
+                for city, code in self.city_codes.items() if needle in city
+            ))
+        if filters.get('rooms'):
+            masks.append(self._equality_mask(self.num_rooms_masks, filters['rooms']))
+        if filters.get('property_type'):
+            code = self.property_type_codes.get(filters['property_type'])
+            masks.append(self._equality_mask(self.property_type_masks, code))
+        if filters.get('guests'):
+            masks.append(_mask_or(
+                mask for guests, mask in self.max_guests_masks.items()
+                if guests >= filters['guests']
+            ))
+        if filters.get('min_rating'):
+            masks.append(self._range_mask('rating', low=float(filters['min_rating'])))
+        if filters.get('amenities'):
+            required = Amenity.mask_of(filters['amenities'])
+            masks.extend(
+                self._equality_mask(self.amenity_bit_masks, bit) for bit in _bits(required)
+            )
+
+        if filters.get('min_lat') is not None:
+            masks.append(self._range_mask('latitude', filters['min_lat'], filters['max_lat']))
+            masks.append(self._range_mask('longitude', filters['min_lng'], filters['max_lng']))
+        if filters.get('lat') is not None:
+            min_lat, min_lng, max_lat, max_lng = radius_bbox(
+                filters['lat'], filters['lng'], _radius(filters)
+            )
+            masks.append(self._range_mask('latitude', min_lat, max_lat))
+            masks.append(self._range_mask('longitude', min_lng, max_lng))
+
+        return masks
+
+    def _matching_rows(self, mask) -> list:
+        """Індекси рядків з маски, новіші першими"""
+        rows = []
+        index = mask.rfind(1)
+        while index >= 0:
+            rows.append(index)
+            index = mask.rfind(1, 0, index)
+        return rows
+
+    def search(self, filters, facets=False):
+        """(id у порядку видачі, фасети або None)"""
+        rows = self._search_rows(filters) if self.ids else []
+        return (
+            [self.ids[index] for index in rows],
+            self._facets(rows) if facets else None,
+        )
+
+    def _search_rows(self, filters) -> list:
+        mask = _mask_and(self.filter_masks(filters), len(self.ids))
+        rows = self._matching_rows(mask)
+        if filters.get('lat') is None:
+            return rows
+
+        # Точна відстань - тільки для кандидатів з описаного прямокутника
+        radius = _radius(filters)
+        distances = []
+        for index in rows:
+            distance = haversine_km(
+                filters['lat'], filters['lng'], self.latitude[index], self.longitude[index]
+            )
+            if not math.isnan(distance) and distance <= radius:
+                distances.append((distance, index))
+
+        distances.sort(key=lambda item: item[0])
+        return [index for _, index in distances]
+
+    def _facets(self, rows) -> dict:
+        property_types = {code: value for value, code in self.property_type_codes.items()}
+        counter = FacetCounter()
+        for index in rows:
+            counter.add(
+                property_types[self.property_type[index]],
+                self.city_names[self.city[index]],
+                price_bucket(self.price[index]),
+                self.max_guests[index],
+            )
+        return counter.result()
+
+
+def _radius(filters):
+    return float(filters.get('radius_km') or DEFAULT_SEARCH_RADIUS_KM)
+
+
+class ListingCatalog:
+    """
+    Поточний знімок процесу і його оновлення
+
+    Пошук і інкрементальна синхронізація - під self._lock (коротко);
+    повне перезавантаження будує новий CatalogSnapshot без lock-а
+    і підміняє посилання self.snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.snapshot = None
+        self._checked_at = None
+        self._rebuilding = False
+
+    def __len__(self):
+        snapshot = self.snapshot
+        return len(snapshot) if snapshot is not None else 0
+
+    def refresh(self, force=False):
+        """
+        Перевірити версію і вік знімка; застарілий - перебудувати, інакше синхронізувати
+
+        Args:
+            force: Перебудувати одразу в цьому потоці
+        """
+        if force:
+            self._rebuild(SearchCatalogVersion.current())
+            return
+
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        options = settings.SEARCH_CATALOG
+        now = time.monotonic()
+        snapshot = self.snapshot
+
+        if (
+            snapshot is not None
+            and self._checked_at is not None
+            and now - self._checked_at <= options['REFRESH_INTERVAL']
+        ):
+            return
+        self._checked_at = now
+
+        version = SearchCatalogVersion.current()
+        if (
+            snapshot is None
+            or version != snapshot.version
+            or now - snapshot.loaded_at > options['REBUILD_INTERVAL']
+        ):
+            self._schedule_rebuild(version)
+            snapshot = self.snapshot
+            if snapshot is None or snapshot.version == version:
+                return
+
+        if not snapshot.sync():
+            # Новий рядок старший за кінець знімка - порядок порушено
+            self._schedule_rebuild(version)
+
+    def _schedule_rebuild(self, version):
+        """Перебудова у фоні (BACKGROUND_REBUILD) або одразу; викликається під lock-ом"""
+        if self._rebuilding:
+            return
+
+        if not settings.SEARCH_CATALOG['BACKGROUND_REBUILD']:
+            self.snapshot = CatalogSnapshot.load(version)
+            return
+
+        self._rebuilding = True
+        threading.Thread(
+            target=self._rebuild_in_background,
+            args=(version,),
+            name='search-catalog-rebuild',
+            daemon=True,
+        ).start()
+
+    def _rebuild(self, version):
+        snapshot = CatalogSnapshot.load(version)
+        with self._lock:
+            self.snapshot = snapshot
+
+    def _rebuild_in_background(self, version):
+        try:
+            self._rebuild(version)
+        except Exception:
+            logger.exception('Search catalog rebuild failed')
+        finally:
+            self._rebuilding = False
+            connection.close()
+
+    # ============================================
+    # ПОШУК
+    # ============================================
+
+    @staticmethod
+    def supports(filters) -> bool:
+        """Текст, доступність на дати і зручності без біта маски - тільки через ORM"""
+        return (
+            not (filters.get('query') or '').strip()
+            and not filters.get('check_in')
+            and all(amenity.bit is not None for amenity in filters.get('amenities') or ())
+        )
+
+    def search(self, filters, facets=False):
+        """
+        ✅ Id оголошень, що проходять фільтри, у порядку видачі пошуку
+
+        Args:
+            facets: Порахувати фасети по знайдених рядках (той самий прохід)
+
+        Returns:
+            tuple | None: (id - новіші першими або найближчі для радіуса,
+                фасети або None); None, якщо фільтри потребують ORM
+                або знімок ще будується
+        """
+        if not self.supports(filters):
+            return None
+
+        with self._lock:
+            self._refresh()
+            if self.snapshot is None:
+                return None
+            return self.snapshot.search(filters, facets)
+
+
+_catalog = ListingCatalog()
+
+
+def get_catalog() -> ListingCatalog:
+    return _catalog
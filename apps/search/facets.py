@@ -0,0 +1,109 @@
+"""
+✅ Фасети пошуку: кількість результатів за типом житла, містом, ціною і місткістю
+
+Рахуються для поточного набору фільтрів за один прохід:
+- ORM - один GROUP BY по (property_type, місто, ціновий діапазон, max_guests),
+  далі згортка в окремі фасети в Python
+- колонковий знімок (catalog.py) - один прохід по знайдених рядках
+"""
+
+from bisect import bisect_right
+
+from django.db.models import Case, Count, IntegerField, Value, When
+
+from apps.common.constants import SEARCH_FACET_PRICE_EDGES
+from apps.listings.models import Listing
+
+FACET_NAMES = ('property_type', 'city', 'price', 'guests')
+
+
+def price_bucket(price) -> int:
+    """Номер цінового діапазону (межа належить верхньому діапазону)"""
+    return bisect_right(SEARCH_FACET_PRICE_EDGES, price)
+
+
+def price_bucket_expression():
+    """price_bucket(), обчислений у БД"""
+    return Case(
+        *[
+            When(price__lt=edge, then=Value(index))
+            for index, edge in enumerate(SEARCH_FACET_PRICE_EDGES)
+        ],
+        default=Value(len(SEARCH_FACET_PRICE_EDGES)),
+        output_field=IntegerField(),
+    )
+
+
+def _by_count(counts):
+    """Найчастіші значення першими"""
+    return sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+
+
+class FacetCounter:
+    """Лічильники всіх фасетів; add() - одна група (або один рядок)"""
+
+    def __init__(self):
+        self.counts = {name: {} for name in FACET_NAMES}
+
+    def add(self, property_type, city, bucket, guests, count=1):
+        for name, value in (
+            ('property_type', property_type),
+            ('city', city),
+            ('price', bucket),
+            ('guests', guests),
+        ):
+            self.counts[name][value] = self.counts[name].get(value, 0) + count
+
+    def result(self) -> dict:
+        """
+        Returns:
+            dict: {'property_type': [{'value', 'count'}], 'city': [...],
+                   'price': [{'value', 'min', 'max', 'count'}], 'guests': [...]}
+        """
+        edges = (0, *SEARCH_FACET_PRICE_EDGES, None)
+
+        return {
+            'property_type': [
+                {'value': value, 'count': count}
+                for value, count in _by_count(self.counts['property_type'])
+            ],
+            'city': [
+                {'value': value, 'count': count}
+                for value, count in _by_count(self.counts['city'])
+            ],
+            'price': [
+                {
+                    'value': f'{edges[bucket]}-{edges[bucket + 1]}'
+                    if edges[bucket + 1] is not None else f'{edges[bucket]}+',
+                    'min': edges[bucket],
+                    'max': edges[bucket + 1],
+                    'count': count,
+                }
+                for bucket, count in sorted(self.counts['price'].items())
+            ],
+            'guests': [
+                {'value': value, 'count': count}
+                for value, count in sorted(self.counts['guests'].items())
+            ],
+        }
+
+
+def queryset_facets(listings) -> dict:
+    """
+    ✅ Фасети для відфільтрованого queryset одним згрупованим запитом
+
+    Оголошення відбираються підзапитом по id - так працює і для queryset
+    з агрегатами релевантності (search_listings) чи відстанню.
+    """
+    groups = (
+        Listing.objects
+        .filter(pk__in=listings.order_by().values('pk'))
+        .values_list('property_type', 'location__city', 'max_guests')
+        .annotate(bucket=price_bucket_expression(), count=Count('pk'))
+        .order_by()
+    )
+
+    counter = FacetCounter()
+    for property_type, city, guests, bucket, count in groups:
+        counter.add(property_type, city, bucket, guests, count)
+    return counter.result()
@@ -0,0 +1,163 @@
+"""
+✅ Повнотекстовий пошук оголошень через інвертований індекс
+
+Індекс (ListingSearchTerm) - один рядок на пару (оголошення, термін) з вагою.
+Запит шукає терміни за префіксом діапазоном по B-tree індексу (term >= t AND term < t + MAX),
+тому час пошуку залежить від кількості збігів, а не від розміру таблиці оголошень.
+
+Нормалізація однакова для індексу і запиту (копія - у міграції 0004, змінюючи
+правила, перебудуйте індекс: rebuild_search_index):
+- Location.normalize_address (регістр, крапки, скорочення вул/просп/буд/кв)
+- німецькі умлаути та ß (ä -> ae, ß -> ss), українські апострофи і ґ -> г
+"""
+
+import re
+from functools import reduce
+from operator import or_
+
+from django.db.models import Case, F, IntegerField, Max, Q, Sum, Value, When
+
+from apps.common.models import Location
+
+# Вага поля в рейтингу (назва важливіша за опис)
+FIELD_WEIGHTS = {
+    'title': 3,
+    'city': 2,
+    'address': 2,
+    'description': 1,
+}
+
+# Скільки повторів слова в одному полі враховується (захист від спаму ключовими словами)
+MAX_OCCURRENCES_PER_FIELD = 3
+
+# Точний збіг терміна важить більше за префіксний
+EXACT_MATCH_MULTIPLIER = 2
+
+TERM_MIN_LENGTH = 2
+TERM_MAX_LENGTH = 64
+
+# Верхня межа діапазону для префіксного пошуку по індексу
+PREFIX_UPPER_BOUND = '\uffff'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_CHAR_REPLACEMENTS = str.maketrans({
+    'ä': 'ae',
+    'ö': 'oe',
+    'ü': 'ue',
+    'ß': 'ss',
+    'ґ': 'г',
+    "'": '',
+    '’': '',
+    'ʼ': '',
+    '`': '',
+})
+
+
+def normalize_text(text: str) -> str:
+    """Нормалізувати текст для індексу і запиту"""
+    if not text:
+        return ''
+    normalized = Location.normalize_address(text.casefold())
+    return normalized.translate(_CHAR_REPLACEMENTS)
+
+
+def tokenize(text: str) -> list:
+    """Розбити нормалізований текст на терміни"""
+    return [
+        token[:TERM_MAX_LENGTH]
+        for token in _TOKEN_RE.findall(normalize_text(text))
+        if len(token) >= TERM_MIN_LENGTH
+    ]
+
+
+def query_tokens(query: str) -> list:
+    """Унікальні терміни запиту (порядок збережено)"""
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def listing_terms(listing) -> dict:
+    """
+    Терміни оголошення з вагами
+
+    Returns:
+        dict: {term: weight}
+    """
+    location = listing.location
+    fields = {
+        'title': listing.title,
+        'description': listing.description,
+        'city': location.city if location else '',
+        'address': location.address if location else '',
+    }
+
+    terms = {}
+    for field, text in fields.items():
+        counts = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            terms[token] = terms.get(token, 0) + (
+                FIELD_WEIGHTS[field] * min(count, MAX_OCCURRENCES_PER_FIELD)
+            )
+    return terms
+
+
+def _prefix_q(token, prefix='search_terms__term'):
+    return Q(**{
+        f'{prefix}__gte': token,
+        f'{prefix}__lt': token + PREFIX_UPPER_BOUND,
+    })
+
+
+def search_listings(queryset, query):
+    """
+    ✅ Відфільтрувати оголошення за текстом і додати релевантність search_rank
+
+    Кожен термін запиту має збігтися (за префіксом) хоча б з одним терміном
+    оголошення. search_rank = сума ваг збігів, точні збіги x2.
+
+    Запит без жодного терміна (тільки 1-символьні слова, розділові знаки)
+    нічого не знаходить, а не повертає всі оголошення.
+
+    Args:
+        queryset: QuerySet оголошень
+        query: Рядок запиту
+
+    Returns:
+        QuerySet з анотацією search_rank
+    """
+    if not query or not query.strip():
+        return queryset
+
+    tokens = query_tokens(query)
+    if not tokens:
+        return queryset.annotate(search_rank=Value(0, output_field=IntegerField())).none()
+
+    token_filters = [_prefix_q(token) for token in tokens]
+
+    matches = {
+        f'_search_match_{index}': Max(Case(
+            When(token_filter, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+        for index, token_filter in enumerate(token_filters)
+    }
+
+    rank = Sum(Case(
+        *[
+            When(search_terms__term=token, then=F('search_terms__weight') * EXACT_MATCH_MULTIPLIER)
+            for token in tokens
+        ],
+        *[When(token_filter, then=F('search_terms__weight')) for token_filter in token_filters],
+        default=Value(0),
+        output_field=IntegerField(),
+    ))
+
+    return (
+        queryset
+        .filter(reduce(or_, token_filters))
+        .annotate(search_rank=rank, **matches)
+        .filter(**{name: 1 for name in matches})
+    )
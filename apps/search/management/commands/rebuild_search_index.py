@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from apps.listings.models import Listing
+from apps.search.models import ListingSearchTerm
+
+
+class Command(BaseCommand):
+    help = 'Повністю перебудовує пошуковий індекс оголошень (ListingSearchTerm)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Кількість оголошень за одну транзакцію'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        listings = Listing.objects.select_related('location').order_by('pk')
+
+        total = 0
+        chunk = []
+        for listing in listings.iterator(chunk_size=chunk_size):
+            chunk.append(listing)
+            if len(chunk) >= chunk_size:
+                ListingSearchTerm.reindex(chunk)
+                total += len(chunk)
+                chunk = []
+
+        ListingSearchTerm.reindex(chunk)
+        total += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Проіндексовано оголошень: {total}'))
@@ -0,0 +1,116 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:00
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Копія правил apps/search/indexing.py і Location.normalize_address на момент
+# міграції: міграція не залежить від поточного коду застосунку
+
+FIELD_WEIGHTS = {'title': 3, 'city': 2, 'address': 2, 'description': 1}
+MAX_OCCURRENCES_PER_FIELD = 3
+TERM_MIN_LENGTH = 2
+TERM_MAX_LENGTH = 64
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+ADDRESS_REPLACEMENTS = {
+    'вулиця': 'вул',
+    'вул ': 'вул',
+    'проспект': 'просп',
+    'площа': 'пл',
+    'провулок': 'пров',
+    'будинок': 'буд',
+    'буд ': 'буд',
+    'квартира': 'кв',
+    'кв ': 'кв',
+}
+
+CHAR_REPLACEMENTS = str.maketrans({
+    'ä': 'ae',
+    'ö': 'oe',
+    'ü': 'ue',
+    'ß': 'ss',
+    'ґ': 'г',
+    "'": '',
+    '’': '',
+    'ʼ': '',
+    '`': '',
+})
+
+
+def normalize_text(text):
+    if not text:
+        return ''
+    normalized = ' '.join(text.casefold().split()).lower().replace('.', '')
+    for old, new in ADDRESS_REPLACEMENTS.items():
+        normalized = normalized.replace(old, new)
+    return normalized.strip().translate(CHAR_REPLACEMENTS)
+
+
+def tokenize(text):
+    return [
+        token[:TERM_MAX_LENGTH]
+        for token in TOKEN_RE.findall(normalize_text(text))
+        if len(token) >= TERM_MIN_LENGTH
+    ]
+
+
+def listing_terms(listing):
+    location = listing.location
+    fields = {
+        'title': listing.title,
+        'description': listing.description,
+        'city': location.city if location else '',
+        'address': location.address if location else '',
+    }
+
+    terms = {}
+    for field, text in fields.items():
+        counts = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            terms[token] = terms.get(token, 0) + (
+                FIELD_WEIGHTS[field] * min(count, MAX_OCCURRENCES_PER_FIELD)
+            )
+    return terms
+
+
+def build_search_index(apps, schema_editor):
+    Listing = apps.get_model('listings', 'Listing')
+    ListingSearchTerm = apps.get_model('search', 'ListingSearchTerm')
+
+    for listing in Listing.objects.select_related('location').iterator(chunk_size=500):
+        ListingSearchTerm.objects.bulk_create([
+            ListingSearchTerm(listing_id=listing.pk, term=term, weight=weight)
+            for term, weight in listing_terms(listing).items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0005_listingavailability'),
+        ('search', '0003_alter_searchhistory_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Термін')),
+                ('weight', models.PositiveIntegerField(default=1, help_text='Сума ваг полів, де зустрічається термін', verbose_name='Вага')),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='listings.listing', verbose_name='Оголошення')),
+            ],
+            options={
+                'verbose_name': 'Термін пошукового індексу',
+                'verbose_name_plural': 'Пошуковий індекс',
+                'indexes': [models.Index(fields=['term', 'listing'], name='search_list_term_05d3f5_idx')],
+                'constraints': [models.UniqueConstraint(fields=('listing', 'term'), name='unique_listing_search_term')],
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
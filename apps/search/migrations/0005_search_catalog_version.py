@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0004_listing_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchCatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Версія')),
+            ],
+            options={
+                'verbose_name': 'Версія знімка пошуку',
+                'verbose_name_plural': 'Версія знімка пошуку',
+            },
+        ),
+    ]
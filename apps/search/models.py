@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from apps.common.models import TimeModel
 
@@ -58,3 +58,97 @@ class SearchHistory(TimeModel):
 
 # Alias для сумісності з serializers
 SearchQuery = SearchHistory
+
+
+class ListingSearchTerm(models.Model):
+    """
+    ✅ Інвертований індекс повнотекстового пошуку оголошень
+
+    Один рядок на пару (оголошення, нормалізований термін).
+    Оновлюється сигналами при збереженні Listing / Location.
+    Повна перебудова: python manage.py rebuild_search_index
+    """
+
+    listing = models.ForeignKey(
+        'listings.Listing',
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name='Оголошення'
+    )
+
+    term = models.CharField(
+        max_length=64,
+        verbose_name='Термін'
+    )
+
+    weight = models.PositiveIntegerField(
+        default=1,
+        verbose_name='Вага',
+        help_text='Сума ваг полів, де зустрічається термін'
+    )
+
+    class Meta:
+        verbose_name = 'Термін пошукового індексу'
+        verbose_name_plural = 'Пошуковий індекс'
+        constraints = [
+            models.UniqueConstraint(fields=['listing', 'term'], name='unique_listing_search_term'),
+        ]
+        indexes = [
+            models.Index(fields=['term', 'listing']),
+        ]
+
+    def __str__(self):
+        return f'{self.listing_id}: {self.term} ({self.weight})'
+
+    @classmethod
+    def reindex(cls, listings):
+        """
+        Перебудувати терміни для набору оголошень
+
+        Args:
+            listings: Ітерований набір Listing (з location)
+        """
+        from .indexing import listing_terms
+
+        listings = list(listings)
+        if not listings:
+            return
+
+        with transaction.atomic():
+            cls.objects.filter(listing__in=listings).delete()
+            cls.objects.bulk_create(
+                [
+                    cls(listing=listing, term=term, weight=weight)
+                    for listing in listings
+                    for term, weight in listing_terms(listing).items()
+                ],
+                batch_size=1000,
+            )
+
+
+class SearchCatalogVersion(models.Model):
+    """
+    ✅ Версія колонкового знімка пошуку (apps/search/catalog.py)
+
+    Один рядок. Зміна, яку знімок не бачить за updated_at (видалення оголошення,
+    зміна локації), збільшує версію в тій самій транзакції - всі процеси
+    перезавантажують знімок, незалежно від бекенду кешу.
+    """
+
+    version = models.PositiveBigIntegerField(default=0, verbose_name='Версія')
+
+    class Meta:
+        verbose_name = 'Версія знімка пошуку'
+        verbose_name_plural = 'Версія знімка пошуку'
+
+    def __str__(self):
+        return f'v{self.version}'
+
+    @classmethod
+    def current(cls) -> int:
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=models.F('version') + 1):
+            cls.objects.bulk_create([cls(pk=1, version=1)], ignore_conflicts=True)
@@ -0,0 +1,109 @@
+"""
+✅ Кеш id результатів пошуку за нормалізованим підписом фільтрів
+
+Ключ - хеш канонічного JSON з SearchSerializer.validated_data (текст запиту
+зведено до термінів індексу, зручності відсортовано). Запис - впорядковані id,
+кількість і фасети; повторний пошук не робить ні текстового пошуку, ні COUNT.
+Понад SEARCH_RESULT_CACHE_MAX_IDS результатів id не читаються і не кешуються:
+запис - позначка ids=None, пошук іде живим запитом з пагінацією.
+
+Вибіркова інвалідація (теги apps.common.cache):
+- запит з ?city= - теги міст, що підходять під фільтр (+ TAG_SEARCH_CITIES
+  для нових міст)
+- інакше - теги цінових діапазонів, які перетинає [min_price, max_price]
+- ?min_rating= - ще TAG_TOP_LISTINGS (інвалідується при зміні рейтингів)
+Зміна оголошення інвалідує тег свого міста і цінового діапазону (старих і нових).
+Пошук з датами не кешується - доступність змінює кожне бронювання.
+"""
+
+import json
+
+from apps.common.cache import (
+    TAG_SEARCH_CITIES,
+    TAG_TOP_LISTINGS,
+    cached_value,
+    search_band_tag,
+    search_city_tag,
+)
+from apps.common.constants import (
+    SEARCH_FACET_PRICE_EDGES,
+    SEARCH_RESULT_CACHE_TTL,
+)
+from apps.common.models import Location
+
+from .facets import price_bucket
+from .indexing import query_tokens
+
+CACHE_NAME = 'search-results'
+
+
+def is_cacheable(filters) -> bool:
+    return not filters.get('check_in')
+
+
+def search_signature(filters) -> str:
+    """Канонічний рядок фільтрів (однакові пошуки - однаковий підпис)"""
+    from .serializers import SearchSerializer
+
+    data = {
+        key: value for key, value in SearchSerializer(filters).data.items()
+        if key != 'stream' and value not in (None, '', [], False)
+    }
+    data['query'] = query_tokens(filters.get('query', ''))
+    if 'city' in data:
+        data['city'] = data['city'].strip().casefold()
+    if 'amenities' in data:
+        data['amenities'] = sorted(data['amenities'])
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def price_bands(min_price=None, max_price=None) -> range:
+    """Цінові діапазони, які перетинає [min_price, max_price]"""
+    first = price_bucket(min_price) if min_price else 0
+    last = price_bucket(max_price) if max_price else len(SEARCH_FACET_PRICE_EDGES)
+    return range(first, last + 1)
+
+
+def search_tags(filters) -> set:
+    """Теги запису: що має змінитися в оголошенні, щоб змінився результат"""
+    if filters.get('city'):
+        cities = Location.objects.filter(
+            city__icontains=filters['city']
+        ).values_list('city', flat=True).distinct()
+        tags = {TAG_SEARCH_CITIES, *map(search_city_tag, cities)}
+    else:
+        tags = set(map(search_band_tag, price_bands(
+            filters.get('min_price'), filters.get('max_price')
+        )))
+
+    if filters.get('min_rating'):
+        tags.add(TAG_TOP_LISTINGS)
+    return tags
+
+
+def listing_search_tags(cities, prices) -> set:
+    """Теги записів, які могла змінити зміна оголошення (міста і ціни до/після)"""
+    return {
+        *(search_city_tag(city) for city in cities if city),
+        *(search_band_tag(price_bucket(price)) for price in prices if price is not None),
+    }
+
+
+def cached_search(filters, compute):
+    """
+    ✅ Результат пошуку з кешу або compute()
+
+    Args:
+        compute: callable() -> {'ids': [...] | None, 'facets': ... | None},
+            ids=None - результатів більше за SEARCH_RESULT_CACHE_MAX_IDS
+    """
+    if not is_cacheable(filters):
+        return compute()
+
+    return cached_value(
+        CACHE_NAME,
+        search_signature(filters),
+        SEARCH_RESULT_CACHE_TTL,
+        lambda: search_tags(filters),
+        lambda: (compute(), True),
+    )
@@ -1,4 +1,7 @@
 from rest_framework import serializers
+
+from apps.common.geo import geo_param_errors
+from apps.listings.models import Amenity
 from .models import SearchHistory
 
 # Якщо там використовується SearchQuery - додайте:
@@ -21,4 +24,47 @@ class SearchSerializer(serializers.Serializer):
     max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
     city = serializers.CharField(required=False, allow_blank=True)
     rooms = serializers.IntegerField(required=False)
-    property_type = serializers.CharField(required=False, allow_blank=True)
\ No newline at end of file
+    property_type = serializers.CharField(required=False, allow_blank=True)
+    guests = serializers.IntegerField(required=False, min_value=1)
+    min_rating = serializers.DecimalField(
+        max_digits=3, decimal_places=2, required=False, min_value=0, max_value=5
+    )
+    # Усі зручності разом: ?amenities=1&amenities=4
+    amenities = serializers.PrimaryKeyRelatedField(
+        queryset=Amenity.objects.all(), many=True, required=False
+    )
+    check_in = serializers.DateField(required=False)
+    check_out = serializers.DateField(required=False)
+
+    # Фасети (кількість за типом, містом, ціною, місткістю): ?facets=true
+    facets = serializers.BooleanField(required=False, default=False)
+    # Усі результати потоком NDJSON замість сторінки: ?stream=true
+    stream = serializers.BooleanField(required=False, default=False)
+
+    # Гео-пошук: радіус навколо точки або вікно карти
+    lat = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    lng = serializers.FloatField(required=False, min_value=-180, max_value=180)
+    radius_km = serializers.FloatField(required=False)
+    min_lat = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    min_lng = serializers.FloatField(required=False, min_value=-180, max_value=180)
+    max_lat = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    max_lng = serializers.FloatField(required=False, min_value=-180, max_value=180)
+
+    def validate(self, attrs):
+        check_in = attrs.get('check_in')
+        check_out = attrs.get('check_out')
+
+        if bool(check_in) != bool(check_out):
+            raise serializers.ValidationError(
+                'Both check_in and check_out are required to filter by availability.'
+            )
+        if check_in and check_out <= check_in:
+            raise serializers.ValidationError({
+                'check_out': 'Check-out must be after check-in.'
+            })
+
+        geo_errors = geo_param_errors(attrs)
+        if geo_errors:
+            raise serializers.ValidationError(geo_errors)
+
+        return attrs
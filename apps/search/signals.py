@@ -0,0 +1,125 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.common.cache import (
+    TAG_SEARCH_CITIES,
+    invalidate_tags,
+    response_cache_enabled,
+    search_band_tag,
+)
+from apps.common.models import Location
+from apps.listings.models import Listing
+
+from .catalog import invalidate_catalog
+from .models import ListingSearchTerm
+from .results import listing_search_tags, price_bands
+
+# Поля, від яких залежить пошуковий індекс
+INDEXED_LISTING_FIELDS = {'title', 'description', 'location'}
+
+
+@receiver(post_save, sender=Listing)
+def index_listing(sender, instance, update_fields=None, **kwargs):
+    """✅ Оновити пошуковий індекс оголошення після збереження"""
+    if update_fields is not None and not INDEXED_LISTING_FIELDS & set(update_fields):
+        return
+    ListingSearchTerm.reindex([instance])
+
+
+@receiver(post_save, sender=Location)
+def index_location_listings(sender, instance, created, **kwargs):
+    """✅ Зміна міста/адреси змінює терміни всіх оголошень з цією локацією"""
+    if created:
+        return
+    ListingSearchTerm.reindex(instance.listings.select_related('location'))
+
+
+@receiver(post_delete, sender=Listing)
+def drop_deleted_listing_from_catalog(sender, instance, **kwargs):
+    """✅ Видалений рядок не видно за updated_at - знімок перезавантажується"""
+    invalidate_catalog()
+
+
+@receiver(post_save, sender=Location)
+def refresh_catalog_locations(sender, instance, created, **kwargs):
+    """✅ Місто і координати зберігаються в знімку - зміна локації його перезавантажує"""
+    if not created:
+        invalidate_catalog()
+
+
+# ============================================
+# ІНВАЛІДАЦІЯ КЕШУ РЕЗУЛЬТАТІВ ПОШУКУ (results.py)
+# ============================================
+
+def _city(location_id):
+    return Location.objects.filter(pk=location_id).values_list('city', flat=True).first()
+
+
+@receiver(pre_save, sender=Listing)
+def store_search_state(sender, instance, **kwargs):
+    """Ціна і локація до збереження - запит тільки для об'єкта без знімка TimeModel"""
+    instance._search_previous = None
+    if not response_cache_enabled() or instance._state.adding or instance.pk is None:
+        return
+    if instance.previous_values('price', 'location') is None:
+        instance._search_previous = Listing.objects.filter(pk=instance.pk).values(
+            'price', 'location'
+        ).first()
+
+
+@receiver(post_save, sender=Listing)
+@receiver(post_delete, sender=Listing)
+def invalidate_listing_searches(sender, instance, **kwargs):
+    """✅ Пошуки, які могло змінити оголошення: його місто і ціновий діапазон (до і після)"""
+    if not response_cache_enabled():
+        return
+
+    cities = {instance.location.city if instance.location_id else None}
+    prices = {instance.price}
+    previous = (
+        instance.previous_values('price', 'location')
+        or getattr(instance, '_search_previous', None)
+    )
+    if previous:
+        prices.add(previous['price'])
+        if previous['location'] != instance.location_id:
+            cities.add(_city(previous['location']))
+
+    invalidate_tags(*listing_search_tags(cities, prices))
+
+
+@receiver(post_save, sender=Location)
+def invalidate_location_searches(sender, instance, created, **kwargs):
+    """✅ Нове місто - усі пошуки з ?city=; зміна адреси - пошуки її оголошень"""
+    if not response_cache_enabled():
+        return
+    if created:
+        invalidate_tags(TAG_SEARCH_CITIES)
+        return
+
+    previous = instance.previous_values('city')
+    cities = {instance.city, previous['city'] if previous else None}
+    prices = set(instance.listings.values_list('price', flat=True))
+    tags = listing_search_tags(cities, prices)
+    if not previous or previous['city'] != instance.city:
+        tags.add(TAG_SEARCH_CITIES)
+    invalidate_tags(*tags)
+
+
+@receiver(m2m_changed, sender=Listing.amenities.through)
+def invalidate_amenity_searches(sender, instance, action, reverse, pk_set, **kwargs):
+    """✅ Зміна зручностей (маска оновлюється через UPDATE, без post_save)"""
+    if action not in ('post_add', 'post_remove', 'post_clear') or not response_cache_enabled():
+        return
+
+    if reverse and action == 'post_clear':
+        # Зв'язки вже видалено - невідомо, які оголошення мали цю зручність
+        invalidate_tags(TAG_SEARCH_CITIES, *map(search_band_tag, price_bands()))
+        return
+
+    rows = Listing.objects.filter(pk__in=pk_set if reverse else [instance.pk]).values_list(
+        'location__city', 'price'
+    )
+    cities = {city for city, _ in rows}
+    prices = {price for _, price in rows}
+    invalidate_tags(*listing_search_tags(cities, prices))
@@ -1,3 +1,576 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from array import array
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
 
-# Create your tests here.
+from django.db import connection
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.bookings.models import Booking
+from apps.common.enums import BookingStatus, CancellationPolicy, PropertyType, UserRole
+from apps.common.cache import cache_stats
+from apps.common.models import Location
+from apps.listings.models import Amenity, Listing, ListingPrice
+from apps.search.catalog import CatalogSnapshot, _RangeIndex, get_catalog, invalidate_catalog
+from apps.search.facets import queryset_facets
+from apps.search.indexing import tokenize
+from apps.search.models import ListingSearchTerm, SearchCatalogVersion, SearchHistory
+from apps.search.views import SearchViewSet
+from apps.users.models import User
+
+
+class SearchAvailabilityTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            username='search-owner',
+            email='search-owner@example.com',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+        self.customer = User.objects.create_user(
+            username='search-customer',
+            email='search-customer@example.com',
+            password='password123',
+            role=UserRole.CUSTOMER,
+        )
+        self.booked = self._create_listing('Booked loft', 'Search street 1')
+        self.free = self._create_listing('Free loft', 'Search street 2')
+
+        self.check_in = date.today() + timedelta(days=7)
+        price = ListingPrice.objects.create(listing=self.booked, amount=Decimal('90.00'))
+        Booking.objects.create(
+            customer=self.customer,
+            listing=self.booked,
+            location=self.booked.location,
+            check_in=self.check_in,
+            check_out=self.check_in + timedelta(days=2),
+            num_guests=1,
+            price_per_night=price,
+            num_nights=2,
+            base_price=Decimal('180.00'),
+            platform_fee=Decimal('18.00'),
+            total_price=Decimal('198.00'),
+            status=BookingStatus.PENDING,
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+
+    def _create_listing(self, title, address):
+        location = Location.objects.create(country='Germany', city='Berlin', address=address)
+        return Listing.objects.create(
+            owner=self.owner,
+            title=title,
+            description='Test listing',
+            property_type=PropertyType.LOFT,
+            location=location,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('90.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+
+    def test_search_excludes_listings_booked_for_dates(self):
+        response = self.client.get('/api/search/', {
+            'query': 'loft',
+            'check_in': self.check_in.isoformat(),
+            'check_out': (self.check_in + timedelta(days=1)).isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['id'], self.free.id)
+
+        history = SearchHistory.objects.first()
+        self.assertEqual(history.filters['check_in'], self.check_in.isoformat())
+
+    def test_search_requires_both_dates(self):
+        response = self.client.get('/api/search/', {'check_in': self.check_in.isoformat()})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            username='fts-owner',
+            email='fts-owner@example.com',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+        self.kyiv = self._create_listing(
+            'Світла квартира біля парку', 'Тиха квартира з балконом', 'Kyiv', 'вулиця Хрещатик 5'
+        )
+        self.berlin = self._create_listing(
+            'Altbau Wohnung', 'Ruhige Wohnung nahe Park', 'Berlin', 'Große Straße 12'
+        )
+        self.lviv = self._create_listing(
+            'Loft with park view', 'Sunny loft', 'Lviv', 'Rynok Square 1'
+        )
+
+    def _create_listing(self, title, description, city, address):
+        location = Location.objects.create(country='Ukraine', city=city, address=address)
+        return Listing.objects.create(
+            owner=self.owner,
+            title=title,
+            description=description,
+            property_type=PropertyType.APARTMENT,
+            location=location,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('80.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+
+    def _search_ids(self, query):
+        response = self.client.get('/api/search/', {'query': query})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['results']]
+
+    def test_normalization_reuses_address_rules(self):
+        self.assertEqual(tokenize('Вулиця Хрещатик, буд. 5'), tokenize('вул Хрещатик буд 5'))
+        self.assertEqual(tokenize('Große Straße'), ['grosse', 'strasse'])
+
+    def test_prefix_and_all_terms_must_match(self):
+        self.assertEqual(self._search_ids('kyi'), [self.kyiv.id])
+        self.assertEqual(self._search_ids('вулиця хрещ'), [self.kyiv.id])
+        self.assertEqual(self._search_ids('grosse strasse'), [self.berlin.id])
+        self.assertEqual(self._search_ids('loft berlin'), [])
+
+    def test_query_without_terms_matches_nothing(self):
+        self.assertEqual(self._search_ids('a'), [])
+        self.assertEqual(self._search_ids('a , b'), [])
+
+        response = self.client.get('/api/listings/', {'search': 'a'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_results_are_ranked_by_field_weight(self):
+        self._create_listing('Cozy studio', 'Near the park and a small loft', 'Lviv', 'Rynok Square 2')
+
+        ids = self._search_ids('loft')
+        self.assertEqual(ids[0], self.lviv.id)
+        self.assertEqual(len(ids), 2)
+
+    def test_index_follows_listing_and_location_updates(self):
+        self.lviv.title = 'Penthouse with terrace'
+        self.lviv.save()
+        self.assertIn(self.lviv.id, self._search_ids('penthouse'))
+
+        location = self.lviv.location
+        location.city = 'Odesa'
+        location.save()
+        self.assertEqual(self._search_ids('odesa'), [self.lviv.id])
+        self.assertFalse(ListingSearchTerm.objects.filter(listing=self.lviv, term='lviv').exists())
+
+    def test_listing_search_param_uses_index(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/listings/', {'search': 'wohn'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.berlin.id])
+        self.assertFalse([q for q in ctx.captured_queries if 'LIKE' in q['sql']])
+
+
+class GeoSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            username='geo-owner',
+            email='geo-owner@example.com',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+        # Берлін: центр, Кройцберг (~3 км), Потсдам (~27 км); Мюнхен далеко
+        self.mitte = self._create_listing('Mitte flat', 'Berlin', '52.520008', '13.404954')
+        self.kreuzberg = self._create_listing('Kreuzberg flat', 'Berlin', '52.497800', '13.411300')
+        self.potsdam = self._create_listing('Potsdam flat', 'Potsdam', '52.390600', '13.064500')
+        self.munich = self._create_listing('Munich flat', 'Munich', '48.137154', '11.576124')
+
+    def _create_listing(self, title, city, latitude, longitude):
+        location = Location.objects.create(
+            country='Germany', city=city, address=f'{title} street 1',
+            latitude=latitude, longitude=longitude,
+        )
+        return Listing.objects.create(
+            owner=self.owner,
+            title=title,
+            description='Test listing',
+            property_type=PropertyType.APARTMENT,
+            location=location,
+            num_rooms=1,
+            num_bathrooms=1,
+            max_guests=2,
+            price=Decimal('80.00'),
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+
+    def test_search_radius_orders_by_distance(self):
+        response = self.client.get('/api/search/', {'lat': 52.52, 'lng': 13.405, 'radius_km': 10})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [self.mitte.id, self.kreuzberg.id],
+        )
+
+        response = self.client.get('/api/search/', {'lat': 52.52, 'lng': 13.405, 'radius_km': 40})
+        self.assertEqual(response.data['count'], 3)
+
+    def test_listings_bbox_viewport(self):
+        response = self.client.get('/api/listings/', {
+            'min_lat': 52.3, 'min_lng': 13.0, 'max_lat': 52.45, 'max_lng': 13.2,
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.potsdam.id])
+
+    def test_listings_radius_combines_with_other_filters(self):
+        response = self.client.get('/api/listings/', {
+            'lat': 52.52, 'lng': 13.405, 'radius_km': 50, 'city': 'Potsdam',
+        })
+
+        self.assertEqual([item['id'] for item in response.data['results']], [self.potsdam.id])
+
+    def test_geo_params_are_validated(self):
+        self.assertEqual(self.client.get('/api/search/', {'lat': 52.52}).status_code, 400)
+        self.assertEqual(
+            self.client.get('/api/search/', {'lat': 52.52, 'lng': 13.4, 'radius_km': 500}).status_code,
+            400,
+        )
+        self.assertEqual(self.client.get('/api/listings/', {'min_lat': 52.3}).status_code, 400)
+
+
+CATALOG_ON = {**settings.SEARCH_CATALOG, 'ENABLED': True, 'REFRESH_INTERVAL': 0}
+
+
+class SearchListingsMixin:
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            username='catalog-owner',
+            email='catalog-owner@example.com',
+            password='password123',
+            role=UserRole.OWNER,
+        )
+        self.berlin_loft = self._create_listing(
+            'Berlin loft', 'Berlin', Decimal('90.00'), PropertyType.LOFT, rooms=1, guests=2,
+            latitude='52.520008', longitude='13.404954',
+        )
+        self.berlin_house = self._create_listing(
+            'Berlin house', 'Berlin', Decimal('250.00'), PropertyType.HOUSE, rooms=4, guests=8,
+            latitude='52.497800', longitude='13.411300',
+        )
+        self.munich_flat = self._create_listing(
+            'Munich flat', 'München', Decimal('120.00'), PropertyType.APARTMENT, rooms=2, guests=4,
+            latitude='48.137154', longitude='11.576124',
+        )
+        self.wifi = Amenity.objects.create(name='Wi-Fi')
+        self.pool = Amenity.objects.create(name='Pool')
+        self.berlin_house.amenities.set([self.wifi, self.pool])
+        self.munich_flat.amenities.set([self.wifi])
+
+    def _create_listing(self, title, city, price, property_type, rooms, guests,
+                        latitude=None, longitude=None):
+        location = Location.objects.create(
+            country='Germany', city=city, address=f'{title} street 1',
+            latitude=latitude, longitude=longitude,
+        )
+        return Listing.objects.create(
+            owner=self.owner,
+            title=title,
+            description='Test listing',
+            property_type=property_type,
+            location=location,
+            num_rooms=rooms,
+            num_bathrooms=1,
+            max_guests=guests,
+            price=price,
+            cancellation_policy=CancellationPolicy.FLEXIBLE,
+        )
+
+    def _ids(self, params):
+        response = self.client.get('/api/search/', params)
+        self.assertEqual(response.status_code, 200)
+        ids = [item['id'] for item in response.data['results']]
+        self.assertEqual(response.data['count'], len(ids))
+        return ids
+
+
+
+@override_settings(SEARCH_CATALOG=CATALOG_ON)
+class SearchCatalogTests(SearchListingsMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        get_catalog().refresh(force=True)
+
+    def test_catalog_matches_database_filters(self):
+        cases = [
+            {},
+            {'min_price': '100'},
+            {'max_price': '120', 'city': 'berl'},
+            {'rooms': 4},
+            {'property_type': PropertyType.APARTMENT},
+            {'guests': 3, 'max_price': '200'},
+            {'city': 'nowhere'},
+            {'min_lat': 52.0, 'min_lng': 13.0, 'max_lat': 53.0, 'max_lng': 14.0},
+            {'lat': 52.52, 'lng': 13.405, 'radius_km': 10},
+            {'amenities': [self.wifi.pk]},
+            {'amenities': [self.wifi.pk, self.pool.pk], 'city': 'Berlin'},
+        ]
+        for params in cases:
+            with self.subTest(params=params):
+                catalog_ids = self._ids(params)
+                with override_settings(SEARCH_CATALOG={**CATALOG_ON, 'ENABLED': False}):
+                    self.assertEqual(catalog_ids, self._ids(params))
+
+    def test_facets_counted_for_current_filters(self):
+        params = {'max_price': '200', 'facets': 'true'}
+        response = self.client.get('/api/search/', params)
+
+        self.assertEqual(response.status_code, 200)
+        facets = response.data['facets']
+        self.assertEqual(facets['city'], [
+            {'value': 'Berlin', 'count': 1},
+            {'value': 'München', 'count': 1},
+        ])
+        self.assertEqual(facets['price'], [
+            {'value': '50-100', 'min': 50, 'max': 100, 'count': 1},
+            {'value': '100-200', 'min': 100, 'max': 200, 'count': 1},
+        ])
+        self.assertEqual(facets['guests'], [{'value': 2, 'count': 1}, {'value': 4, 'count': 1}])
+        self.assertEqual(sum(item['count'] for item in facets['property_type']), 2)
+
+        with override_settings(SEARCH_CATALOG={**CATALOG_ON, 'ENABLED': False}):
+            with self.assertNumQueries(2):
+                # COUNT і один GROUP BY для всіх фасетів (без вибірки результатів)
+                listings = SearchViewSet().filter_listings('', {'max_price': Decimal('200')})
+                listings.count()
+                self.assertEqual(queryset_facets(listings), facets)
+
+    def test_facets_with_text_query_and_opt_in(self):
+        response = self.client.get('/api/search/', {'query': 'berlin', 'facets': 'true'})
+
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(response.data['facets']['city'], [{'value': 'Berlin', 'count': 2}])
+        self.assertEqual(
+            response.data['facets']['price'][-1],
+            {'value': '200-500', 'min': 200, 'max': 500, 'count': 1},
+        )
+        self.assertNotIn('facets', self.client.get('/api/search/').data)
+
+    def test_only_matching_ids_reach_database(self):
+        with CaptureQueriesContext(connection) as ctx:
+            ids = self._ids({'city': 'Berlin', 'min_price': '100'})
+
+        self.assertEqual(ids, [self.berlin_house.id])
+        listing_queries = [q['sql'] for q in ctx.captured_queries if 'listings_listing' in q['sql']]
+        self.assertFalse([sql for sql in listing_queries if 'LIKE' in sql or 'COUNT(' in sql])
+
+    def test_incremental_refresh_follows_listing_changes(self):
+        self.munich_flat.price = Decimal('300.00')
+        self.munich_flat.save()
+        self.berlin_loft.is_active = False
+        self.berlin_loft.save()
+        self.berlin_loft.amenities.add(self.pool)
+        self.munich_flat.amenities.add(self.pool)
+        new_flat = self._create_listing(
+            'Munich studio', 'München', Decimal('310.00'), PropertyType.STUDIO, rooms=1, guests=1,
+        )
+
+        self.assertEqual(self._ids({'min_price': '260'}), [new_flat.id, self.munich_flat.id])
+        self.assertNotIn(self.berlin_loft.id, self._ids({}))
+        self.assertEqual(
+            self._ids({'amenities': [self.pool.pk]}), [self.munich_flat.id, self.berlin_house.id]
+        )
+
+    def test_location_change_reloads_catalog(self):
+        location = self.munich_flat.location
+        location.city = 'Berlin'
+        location.save()
+
+        self.assertIn(self.munich_flat.id, self._ids({'city': 'Berlin'}))
+
+    def test_rebuild_runs_in_background_and_swaps_snapshot(self):
+        catalog = get_catalog()
+        old_snapshot = catalog.snapshot
+        old_ids = self._ids({})
+
+        invalidate_catalog()
+        new_snapshot = CatalogSnapshot.load(SearchCatalogVersion.current())
+        release = threading.Event()
+
+        def slow_load(version):
+            release.wait(5)
+            return new_snapshot
+
+        background = {**CATALOG_ON, 'BACKGROUND_REBUILD': True}
+        with override_settings(SEARCH_CATALOG=background), \
+                patch.object(CatalogSnapshot, 'load', side_effect=slow_load):
+            # Поки новий знімок будується, пошук іде по поточному
+            self.assertEqual(self._ids({}), old_ids)
+            self.assertIs(catalog.snapshot, old_snapshot)
+
+            release.set()
+            deadline = time.monotonic() + 5
+            while catalog.snapshot is old_snapshot and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        self.assertIs(catalog.snapshot, new_snapshot)
+
+    def test_range_index_matches_full_scan(self):
+        column = array('d', [float(value % 97) for value in range(0, 1000, 7)] + [float('nan')])
+        index = _RangeIndex(column, buckets=8)
+
+        for low, high in [(None, 10.0), (13.0, None), (20.0, 20.0), (5.5, 60.2), (90.0, 10.0)]:
+            with self.subTest(low=low, high=high):
+                mask = index.query(column, low, high).to_bytes(len(column), 'little')
+                expected = [
+                    row for row, value in enumerate(column)
+                    if (low is None or value >= low) and (high is None or value <= high)
+                ]
+                self.assertEqual([row for row, flag in enumerate(mask) if flag], expected)
+
+    def test_text_query_uses_database(self):
+        self.assertIsNone(get_catalog().search({'query': 'loft'}))
+        self.assertEqual(get_catalog().search({'city': 'Berlin'}, facets=False)[1], None)
+        self.assertEqual(self._ids({'query': 'loft'}), [self.berlin_loft.id])
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': True, 'ALIAS': 'default', 'KEY_PREFIX': 'test-search'})
+class SearchResultCacheTests(SearchListingsMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        super().setUp()
+
+    def _hits(self):
+        return cache_stats().get('search-results', {}).get('hits', 0)
+
+    def test_repeated_search_skips_text_search_and_count(self):
+        first = self._ids({'query': 'Berlin', 'max_price': '300'})
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = self._ids({'query': ' berlin ', 'max_price': '300.00'})
+
+        self.assertEqual(first, second)
+        self.assertEqual(self._hits(), 1)
+        self.assertFalse([
+            q for q in ctx.captured_queries
+            if 'search_terms' in q['sql'] or 'listingsearchterm' in q['sql'] or 'COUNT(' in q['sql']
+        ])
+
+    def test_change_in_other_city_keeps_entry(self):
+        self.assertEqual(self._ids({'city': 'münchen'}), [self.munich_flat.id])
+
+        self.berlin_house.price = Decimal('130.00')
+        self.berlin_house.save()
+        self.assertEqual(self._ids({'city': 'münchen'}), [self.munich_flat.id])
+        self.assertEqual(self._hits(), 1)
+
+        self.munich_flat.is_active = False
+        self.munich_flat.save()
+        self.assertEqual(self._ids({'city': 'münchen'}), [])
+
+    def test_change_in_other_price_band_keeps_entry(self):
+        self.assertEqual(self._ids({'max_price': '100'}), [self.berlin_loft.id])
+
+        self.berlin_house.price = Decimal('260.00')
+        self.berlin_house.save()
+        self.assertEqual(self._ids({'max_price': '100'}), [self.berlin_loft.id])
+        self.assertEqual(self._hits(), 1)
+
+        self.berlin_house.price = Decimal('95.00')
+        self.berlin_house.save()
+        self.assertEqual(self._ids({'max_price': '100'}), [self.berlin_house.id, self.berlin_loft.id])
+
+    def test_large_result_is_not_materialized(self):
+        with patch('apps.search.views.SEARCH_RESULT_CACHE_MAX_IDS', 2):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get('/api/search/', {'limit': 1})
+            self.assertEqual(response.data['count'], 3)
+            self.assertEqual(len(response.data['results']), 1)
+            # id читаються з LIMIT max + 1, далі - сторінка живим запитом
+            self.assertTrue(any('LIMIT 3' in q['sql'] for q in ctx.captured_queries))
+
+            # У кеші лишилася позначка - id повторно не читаються
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get('/api/search/', {'limit': 1, 'offset': 1})
+            self.assertFalse(any('LIMIT 3' in q['sql'] for q in ctx.captured_queries))
+            self.assertEqual(self._hits(), 1)
+
+    def test_new_city_and_amenity_changes_invalidate(self):
+        self.assertEqual(self._ids({'city': 'berl'}), [self.berlin_house.id, self.berlin_loft.id])
+        self.assertEqual(self._ids({'amenities': [self.pool.pk]}), [self.berlin_house.id])
+
+        spandau = self._create_listing(
+            'Spandau flat', 'Berlin-Spandau', Decimal('70.00'), PropertyType.APARTMENT,
+            rooms=1, guests=2,
+        )
+        self.munich_flat.amenities.add(self.pool)
+
+        self.assertEqual(self._ids({'city': 'berl'})[0], spandau.id)
+        self.assertEqual(
+            self._ids({'amenities': [self.pool.pk]}), [self.munich_flat.id, self.berlin_house.id]
+        )
+        self.assertEqual(self._hits(), 0)
+
+
+class SearchPaginationTests(SearchListingsMixin, TestCase):
+    def _stream(self, params):
+        response = self.client.get('/api/search/', {**params, 'stream': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        return int(response['X-Total-Count']), [json.loads(line)['id'] for line in lines]
+
+    def test_results_are_paginated(self):
+        all_ids = self._ids({'limit': 10})
+
+        response = self.client.get('/api/search/', {'limit': 2})
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual([item['id'] for item in response.data['results']], all_ids[:2])
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get('/api/search/', {'limit': 2, 'offset': 2})
+        self.assertEqual([item['id'] for item in response.data['results']], all_ids[2:])
+        self.assertIsNone(response.data['next'])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/search/', {'query': 'berlin', 'limit': 1})
+        selects = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT "listings_listing"."id"') and 'COUNT(' not in q['sql']
+        ]
+        self.assertTrue(selects)
+        self.assertTrue(all('LIMIT 1' in sql for sql in selects))
+
+    @patch('apps.search.views.SEARCH_STREAM_CHUNK_SIZE', 2)
+    def test_stream_returns_every_match_in_chunks(self):
+        expected = self._ids({'limit': 10})
+
+        self.assertEqual(self._stream({}), (3, expected))
+        self.assertEqual(
+            self._stream({'query': 'berlin'}),
+            (2, [self.berlin_house.id, self.berlin_loft.id]),
+        )
+
+    @override_settings(SEARCH_CATALOG=CATALOG_ON)
+    @patch('apps.search.views.SEARCH_STREAM_CHUNK_SIZE', 2)
+    def test_stream_and_pages_from_catalog(self):
+        get_catalog().refresh(force=True)
+
+        self.assertEqual(
+            self._stream({'max_price': '200'}), (2, [self.munich_flat.id, self.berlin_loft.id])
+        )
+        response = self.client.get('/api/search/', {'max_price': '200', 'limit': 1, 'offset': 1})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.berlin_loft.id])
@@ -1,11 +1,31 @@
+import json
+from itertools import islice
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.utils.encoders import JSONEncoder
 from django.db.models import Count, Q, Avg
+from django.http import StreamingHttpResponse
 
 from .models import SearchHistory
 from .serializers import SearchQuerySerializer, SearchHistorySerializer, SearchSerializer
+from apps.analytics.events import record_search
+from apps.common.cache import TAG_SEARCH_QUERIES, cached_response, response_cache_enabled
+from apps.common.constants import (
+    CACHE_TTL_SHORT,
+    MAX_SEARCH_RESULTS,
+    SEARCH_RESULT_CACHE_MAX_IDS,
+    SEARCH_STREAM_CHUNK_SIZE,
+)
+from apps.common.geo import apply_geo_filters
+from apps.listings.filters import filter_amenities, filter_available
+from .catalog import catalog_enabled, get_catalog
+from .facets import queryset_facets
+from .results import cached_search, is_cacheable
+from .indexing import search_listings
 from apps.listings.models import Listing
 from apps.listings.serializers import ListingListSerializer
 
@@ -14,6 +34,8 @@ class SearchQueryViewSet(viewsets.ViewSet):
     """ViewSet для популярних запитів"""
     permission_classes = [AllowAny]
 
+    @cached_response('search-queries', CACHE_TTL_SHORT,
+                     tags=lambda request, kwargs: [TAG_SEARCH_QUERIES])
     def list(self, request):
         """Повертає найпопулярніші пошукові запити"""
         from django.db import models
@@ -47,9 +69,26 @@ class SearchHistoryViewSet(viewsets.ModelViewSet):
         })
 
 
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+
+class SearchPagination(LimitOffsetPagination):
+    """?limit=&offset= (за замовчуванням PAGE_SIZE, не більше MAX_SEARCH_RESULTS)"""
+    max_limit = MAX_SEARCH_RESULTS
+
+
 class SearchViewSet(viewsets.ViewSet):
-    """Головний ViewSet для пошуку"""
+    """
+    Головний ViewSet для пошуку
+
+    ✅ Відповідь посторінкова (limit/offset). ?stream=true віддає всі результати
+    як NDJSON (один рядок JSON на оголошення), читаючи їх з БД пачками.
+    """
     permission_classes = [AllowAny]
+    pagination_class = SearchPagination
+
+    # Параметри відповіді, а не фільтри (не зберігаються в історії)
+    RESPONSE_PARAMS = ('query', 'facets', 'stream')
 
     def list(self, request):
         """Пошук оголошень"""
@@ -59,20 +98,125 @@ class SearchViewSet(viewsets.ViewSet):
         query = serializer.validated_data.get('query', '').strip()
         filters = serializer.validated_data
 
-        # Базовий queryset
-        listings = Listing.objects.filter(
+        stream = filters.get('stream', False)
+        with_facets = filters.get('facets', False) and not stream
+
+        # ✅ Структурні фільтри - по колонковому знімку в пам'яті, без SQL
+        found = get_catalog().search(filters, facets=with_facets) if catalog_enabled() else None
+
+        # ✅ Повторний пошук - id і кількість з кешу (без текстового пошуку і COUNT)
+        # Забагато результатів - живий запит з пагінацією (ids=None)
+        if found is None and response_cache_enabled() and is_cacheable(filters):
+            result = cached_search(
+                filters, lambda: self.find_ids(query, filters, with_facets)
+            )
+            if result['ids'] is not None:
+                found = result['ids'], result['facets']
+
+        # Джерело результатів: впорядковані id або queryset
+        if found is None:
+            source = self.filter_listings(query, filters)
+            facets = queryset_facets(source) if with_facets else None
+        else:
+            source, facets = found
+
+        if stream:
+            results_count = len(source) if found is not None else source.count()
+            self.record(request, query, filters, results_count)
+            response = StreamingHttpResponse(
+                self.stream_listings(request, source),
+                content_type=NDJSON_CONTENT_TYPE,
+            )
+            response['X-Total-Count'] = results_count
+            return response
+
+        # ✅ До серіалізатора потрапляє тільки сторінка
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(source, request, view=self)
+        if found is not None:
+            page = self.fetch_listings(page)
+        self.record(request, query, filters, paginator.count)
+
+        serializer = ListingListSerializer(page, many=True, context={'request': request})
+        response = paginator.get_paginated_response(serializer.data)
+        if with_facets:
+            response.data['facets'] = facets
+        return response
+
+    def record(self, request, query, filters, results_count):
+        """✅ Один запис на пошук, в черзі аналітики (без INSERT у read-запиті)"""
+        # Зберегти в історію кожен пошук (включаючи анонімних користувачів)
+        # JSON-сумісне представлення (дати та Decimal -> рядки)
+        filters_data = {
+            k: v for k, v in SearchSerializer(filters).data.items()
+            if k not in self.RESPONSE_PARAMS and v not in (None, '', [])
+        }
+        record_search(
+            user=request.user if request.user.is_authenticated else None,
+            query=query,
+            filters=filters_data,
+            results_count=results_count,
+        )
+
+    def get_queryset(self):
+        return Listing.objects.filter(
             is_active=True,
             is_deleted=False
+        ).select_related('location', 'owner', 'rating_stats').prefetch_related(
+            Listing.main_photo_prefetch()
         )
 
-        # Пошук по тексту
-        if query:
-            listings = listings.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query) |
-                Q(location__city__icontains=query) |
-                Q(location__address__icontains=query)
+    def fetch_listings(self, ids) -> list:
+        """Оголошення за id у тому самому порядку (один запит)"""
+        position = {pk: index for index, pk in enumerate(ids)}
+        return sorted(
+            self.get_queryset().filter(pk__in=ids),
+            key=lambda listing: position[listing.pk],
+        )
+
+    def stream_listings(self, request, source):
+        """
+        Рядки NDJSON пачками по SEARCH_STREAM_CHUNK_SIZE
+
+        У пам'яті - тільки поточна пачка оголошень, незалежно від кількості результатів.
+        """
+        if isinstance(source, list):
+            chunks = (
+                self.fetch_listings(source[start:start + SEARCH_STREAM_CHUNK_SIZE])
+                for start in range(0, len(source), SEARCH_STREAM_CHUNK_SIZE)
             )
+        else:
+            rows = source.iterator(chunk_size=SEARCH_STREAM_CHUNK_SIZE)
+            chunks = iter(lambda: list(islice(rows, SEARCH_STREAM_CHUNK_SIZE)), [])
+
+        for chunk in chunks:
+            serializer = ListingListSerializer(chunk, many=True, context={'request': request})
+            for item in serializer.data:
+                yield json.dumps(item, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+    def find_ids(self, query, filters, with_facets=False) -> dict:
+        """
+        Впорядковані id результатів (і фасети) через ORM - значення для кешу
+
+        Читається не більше SEARCH_RESULT_CACHE_MAX_IDS + 1 id; якщо результатів
+        більше - ids=None (у кеші лишається тільки ця позначка).
+        """
+        listings = self.filter_listings(query, filters)
+        ids = list(listings.values_list('pk', flat=True)[:SEARCH_RESULT_CACHE_MAX_IDS + 1])
+        if len(ids) > SEARCH_RESULT_CACHE_MAX_IDS:
+            return {'ids': None, 'facets': None}
+        return {
+            'ids': ids,
+            'facets': queryset_facets(listings) if with_facets else None,
+        }
+
+    def filter_listings(self, query, filters):
+        """Усі фільтри пошуку через ORM (текст, дати та інше)"""
+        listings = self.get_queryset()
+
+        # ✅ Пошук по тексту через інвертований індекс (з релевантністю)
+        if query:
+            listings = search_listings(listings, query).order_by('-search_rank', '-created_at')
 
         # Фільтри
         if filters.get('min_price'):
@@ -82,35 +226,21 @@ class SearchViewSet(viewsets.ViewSet):
         if filters.get('city'):
             listings = listings.filter(location__city__icontains=filters['city'])
         if filters.get('rooms'):
-            listings = listings.filter(rooms=filters['rooms'])
+            listings = listings.filter(num_rooms=filters['rooms'])
         if filters.get('property_type'):
             listings = listings.filter(property_type=filters['property_type'])
-
-        results_count = listings.count()
-
-        # Зберегти в історію кожен пошук (включаючи анонімних користувачів)
-        filters_data = {
-            k: v for k, v in filters.items()
-            if k != 'query' and v not in (None, '', [])
-        }
-
-        if query or filters_data:
-            SearchHistory.objects.create(
-                user=request.user if request.user.is_authenticated else None,
-                query=query,
-                filters=filters_data,
-                results_count=results_count,
-            )
-        SearchHistory.objects.create(
-            user=request.user if request.user.is_authenticated else None,
-            query=query,
-            filters={k: v for k, v in filters.items() if k != 'query'},
-            results_count=results_count
-        )
-
-        # Результат
-        serializer = ListingListSerializer(listings, many=True, context={'request': request})
-        return Response({
-            'count': results_count,
-            'results': serializer.data
-        })
+        if filters.get('guests'):
+            listings = listings.filter(max_guests__gte=filters['guests'])
+        if filters.get('min_rating'):
+            listings = listings.filter(rating_stats__average_rating__gte=filters['min_rating'])
+        if filters.get('amenities'):
+            listings = filter_amenities(listings, filters['amenities'])
+        if filters.get('check_in') and filters.get('check_out'):
+            listings = filter_available(listings, filters['check_in'], filters['check_out'])
+
+        # ✅ Гео-пошук (geohash-кандидати + haversine), найближчі - першими
+        listings = apply_geo_filters(listings, filters)
+        if not query and filters.get('lat') is not None:
+            listings = listings.order_by('distance_km')
+
+        return listings
@@ -0,0 +1,23 @@
+import logging
+
+from apps.jobs.outbox import consumer
+from apps.notifications.models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+@consumer("user.created")
+def notify_user_created(payloads):
+    """Системні повідомлення про створених користувачів (один bulk_create)"""
+    notifications = []
+    for payload in payloads:
+        title = f"User {payload['display_name']} створений"
+        notifications.append(Notification(
+            user_id=payload["user_id"],
+            title=title,
+            message=title,
+            notification_type="SYSTEM",
+        ))
+
+    Notification.objects.bulk_create(notifications)
+    logger.info("User notifications created. count=%s", len(notifications))
@@ -82,8 +82,12 @@ class UserProfile(TimeModel):
 
     @property
     def rating(self):
+        # ✅ Через зворотний зв'язок: працює з select_related('user__owner_rating_stats')
         from apps.reviews.models import OwnerRating
-        stats = OwnerRating.objects.filter(owner=self.user).first()
+        try:
+            stats = self.user.owner_rating_stats
+        except OwnerRating.DoesNotExist:
+            stats = None
         avg = stats.average_rating if stats else 0.0
         return round(float(avg), 2)
 
@@ -5,10 +5,11 @@ from django.dispatch import receiver
 from django.contrib.auth.models import Group
 from django.apps import apps
 
+from apps.jobs.outbox import emit
+
 logger = logging.getLogger(__name__)
 
 User = apps.get_model("users", "User")
-Notification = apps.get_model("notifications", "Notification")
 
 
 @receiver(post_save, sender=User)
@@ -38,7 +39,7 @@ def add_default_group(sender, instance, created, **kwargs):
 @receiver(post_save, sender=User)
 def create_user_creation_notification(sender, instance, created, **kwargs):
     """
-    Створює системне повідомлення про створення користувача.
+    Подія user.created в outbox (системне повідомлення створить споживач).
     """
     if not created:
         return
@@ -46,18 +47,4 @@ def create_user_creation_notification(sender, instance, created, **kwargs):
     full_name = f"{(instance.first_name or '').strip()} {(instance.last_name or '').strip()}".strip()
     display_name = full_name or getattr(instance, "email", "") or f"id={instance.id}"
 
-    title = f"User {display_name} створений"
-
-    notif = Notification.objects.create(
-        user=instance,
-        title=title,
-        message=title,
-        notification_type="SYSTEM",
-    )
-
-    logger.info(
-        "Notification created. notification_id=%s user_id=%s title=%s",
-        notif.id,
-        instance.id,
-        title,
-    )
+    emit("user.created", user_id=instance.id, display_name=display_name)
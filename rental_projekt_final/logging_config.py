@@ -227,6 +227,13 @@ LOGGING = {
             'propagate': False,
         },
 
+        # Фонові задачі з БД (apps.jobs, run_workers) - у той самий файл
+        'apps.jobs': {
+            'handlers': ['console', 'file_celery', 'file_error'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+
         # Custom app logger
         'app': {
             'handlers': ['console', 'file_all', 'file_error', 'file_warning'],
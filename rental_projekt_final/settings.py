@@ -5,6 +5,7 @@ Django settings for rental_projekt_final project.
 from pathlib import Path
 import environ
 import os
+import sys
 from .logging_config import get_logging_config
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
     'apps.search.apps.SearchConfig',
     'apps.common.apps.CommonConfig',
     'apps.analytics.apps.AnalyticsConfig',
+    'apps.jobs.apps.JobsConfig',
 ]
 
 AUTH_USER_MODEL = 'users.User'
@@ -97,6 +99,11 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Скільки чекати блокування БД на запис (паралельні бронювання)
+            'OPTIONS': {'timeout': 20},
+            # Тестова БД у файлі: in-memory shared cache не чекає блокувань,
+            # а одразу повертає "database table is locked" (паралельні тести)
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
@@ -164,3 +171,75 @@ SPECTACULAR_SETTINGS = {
 }
 
 
+# Аналітика: буферизований запис SearchHistory / ListingView (apps/analytics/events.py)
+# Під час тестів події пишуться одразу (без фонового потоку і спулу)
+TESTING = sys.argv[1:2] == ['test']
+
+ANALYTICS_BUFFER = {
+    'SPOOL_PATH': None if TESTING else env(
+        'ANALYTICS_SPOOL_PATH', default=str(BASE_DIR / 'var' / 'analytics_spool.sqlite3')
+    ),
+    'BATCH_SIZE': 1 if TESTING else env.int('ANALYTICS_BATCH_SIZE', default=200),
+    'FLUSH_INTERVAL': env.int('ANALYTICS_FLUSH_INTERVAL', default=5),
+    'BACKGROUND_FLUSH': not TESTING and env.bool('ANALYTICS_BACKGROUND_FLUSH', default=True),
+}
+
+
+# Кеш: locmem за замовчуванням, файловий - якщо задано CACHE_DIR (спільний для процесів)
+CACHE_DIR = env('CACHE_DIR', default='')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+    } if CACHE_DIR else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'rental-default',
+    },
+}
+
+# Кеш відповідей публічних ендпоінтів (apps/common/cache.py)
+# Під час тестів вимкнено: БД відкочується між тестами, а кеш - ні
+# Інвалідація доходить тільки до свого кешу: locmem - окремий у кожного процесу
+# (gunicorn workers, run_workers), тому за замовчуванням кеш увімкнено лише
+# зі спільним бекендом (CACHE_DIR або інший спільний CACHES['default'])
+RESPONSE_CACHE = {
+    'ENABLED': not TESTING and env.bool('RESPONSE_CACHE_ENABLED', default=bool(CACHE_DIR)),
+    'ALIAS': 'default',
+    'KEY_PREFIX': 'respcache',
+}
+
+# Статистика бронювань власника/клієнта з матеріалізованих рядків BookingStats
+BOOKING_STATS_SNAPSHOTS = env.bool('BOOKING_STATS_SNAPSHOTS', default=True)
+
+# Фонові задачі в БД (apps/jobs, воркери: python manage.py run_workers)
+# EAGER - виконувати задачу одразу при .delay() (у тестах)
+JOBS = {
+    'EAGER': TESTING or env.bool('JOBS_EAGER', default=False),
+    'PROCESSES': env.int('JOBS_PROCESSES', default=2),
+    'BATCH_SIZE': env.int('JOBS_BATCH_SIZE', default=10),
+    'POLL_INTERVAL': env.float('JOBS_POLL_INTERVAL', default=1.0),
+    # Періодичні задачі воркерів: ім'я задачі -> інтервал (секунди)
+    'PERIODIC': {
+        'apps.bookings.tasks.advance_bookings': env.int('BOOKING_ADVANCE_INTERVAL', default=600),
+        'apps.reviews.tasks.purge_applied_rating_changes': 24 * 60 * 60,
+    },
+}
+
+# Outbox доменних подій (apps/jobs/outbox.py) - доставляє run_workers
+# EAGER - доставляти подію одразу при emit() (у тестах)
+OUTBOX = {
+    'EAGER': TESTING or env.bool('OUTBOX_EAGER', default=False),
+    'BATCH_SIZE': env.int('OUTBOX_BATCH_SIZE', default=100),
+}
+
+# Колонковий знімок оголошень для пошуку (apps/search/catalog.py), один на процес
+# REFRESH_INTERVAL - як часто підтягувати змінені оголошення (сек)
+# REBUILD_INTERVAL - повне перезавантаження (рейтинги, видалення), сек
+# BACKGROUND_REBUILD - перезавантажувати у фоновому потоці (у тестах - одразу)
+SEARCH_CATALOG = {
+    'ENABLED': not TESTING and env.bool('SEARCH_CATALOG_ENABLED', default=True),
+    'REFRESH_INTERVAL': env.float('SEARCH_CATALOG_REFRESH_INTERVAL', default=2.0),
+    'REBUILD_INTERVAL': env.float('SEARCH_CATALOG_REBUILD_INTERVAL', default=300.0),
+    'BACKGROUND_REBUILD': not TESTING,
+}
@@ -40,6 +40,7 @@ urlpatterns = [
     path('api/', include('apps.payments.urls')),
     path('api/', include('apps.search.urls')),
     path('api/', include('apps.analytics.urls')),
+    path('api/', include('apps.common.urls')),
 ]
 
 if settings.DEBUG: